@@ -1,7 +1,8 @@
 """
 Bruce Helper WebSocket Server
 Handles encryption/decryption of accession numbers for Bruce browser app
-Monitors DICOM state file and pushes study updates to connected clients
+Subscribes to the dicom-service state channel (falling back to watching the
+DICOM state file) and pushes study updates to connected clients
 """
 
 import asyncio
@@ -64,12 +65,23 @@ def _resolve_state_file():
 
 
 STATE_FILE = _resolve_state_file()
+# Written by dicom-service when its loopback state channel is listening
+STATE_CHANNEL_PORT_FILE = os.path.join(os.path.dirname(STATE_FILE), 'state_channel.port')
+STATE_CHANNEL_RETRY_SECS = 5
 PID_FILE   = os.path.join(data_dir, "server.pid")
 log_file = os.path.join(log_dir, 'websocket-server.log')
 
 # Connected clients (for broadcasting)
 connected_clients = set()
 
+# True while subscribed to the dicom-service state channel; the file watcher
+# stays idle then so each change is broadcast once
+state_channel_connected = False
+
+# Gen of the last state broadcast; watchdog reports one current_study.json
+# replace as several modified events, so file events skip repeats
+last_broadcast_gen = None
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s',
@@ -204,7 +216,7 @@ def get_study_metadata(accession: str) -> dict:
             with open(STATE_FILE, 'r', encoding='utf-8-sig') as f:
                 dicom_data = json.load(f)
 
-            if dicom_data and any(dicom_data.values()):
+            if dicom_data and dicom_data.get("Acc"):
                 request_core = _extract_core_acc(accession)
                 dicom_core   = _extract_core_acc(dicom_data.get("Acc", ""))
 
@@ -252,36 +264,51 @@ class StudyFileHandler(FileSystemEventHandler):
 
     def on_modified(self, event):
         logger.info(f"File modified event: {event.src_path}")
-        if event.src_path.endswith("current_study.json"):
+        if state_channel_connected:
+            logger.debug("State channel connected - ignoring file event")
+        elif event.src_path.endswith("current_study.json"):
             logger.info("current_study.json modified - triggering broadcast")
             # Schedule broadcast in the event loop
             asyncio.run_coroutine_threadsafe(
-                broadcast_study_update(),
+                broadcast_study_update(dedupe=True),
                 self.loop
             )
         else:
             logger.debug(f"Ignoring modification to: {event.src_path}")
 
 
-async def broadcast_study_update():
-    """Read current_study.json and broadcast to all connected clients"""
+async def broadcast_study_update(dicom_data=None, dedupe=False):
+    """Broadcast the current study to all connected clients
+
+    dicom_data is the state pushed by the state channel; when omitted,
+    current_study.json is read instead.  With dedupe, a state whose Gen was
+    already broadcast is skipped.
+    """
+    global last_broadcast_gen
     try:
         logger.info(f"broadcast_study_update called, connected clients: {len(connected_clients)}")
 
-        if not os.path.exists(STATE_FILE):
-            logger.info("State file does not exist - sending study_cleared")
-            await broadcast_study_cleared()
-            return
+        if dicom_data is None:
+            if not os.path.exists(STATE_FILE):
+                logger.info("State file does not exist - sending study_cleared")
+                await broadcast_study_cleared()
+                return
 
-        # Read DICOM state file (use utf-8-sig to handle BOM if present)
-        with open(STATE_FILE, 'r', encoding='utf-8-sig') as f:
-            dicom_data = json.load(f)
+            # Read DICOM state file (use utf-8-sig to handle BOM if present)
+            with open(STATE_FILE, 'r', encoding='utf-8-sig') as f:
+                dicom_data = json.load(f)
 
         logger.info(f"Read DICOM data: {dicom_data}")
 
+        gen = dicom_data.get("Gen")
+        if dedupe and gen is not None and gen == last_broadcast_gen:
+            logger.debug(f"State generation {gen} already broadcast - skipping")
+            return
+        last_broadcast_gen = gen
+
         # Check if we have valid study data
         accession = dicom_data.get("Acc", "")
-        if not accession or not any(dicom_data.values()):
+        if not accession:
             # No study or empty data - send study_cleared
             logger.info("No valid accession in data - sending study_cleared")
             await broadcast_study_cleared()
@@ -351,6 +378,44 @@ async def broadcast_study_cleared():
         logger.error(f"Broadcast study_cleared failed: {e}")
 
 
+async def subscribe_state_channel():
+    """Receive study state pushed by dicom-service and broadcast it
+
+    Reconnects whenever the service restarts; while disconnected the
+    current_study.json watcher handles updates.
+    """
+    global state_channel_connected
+    while True:
+        writer = None
+        try:
+            with open(STATE_CHANNEL_PORT_FILE, 'r', encoding='utf-8') as f:
+                port = int(f.read().strip())
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            logger.info(f"Subscribed to dicom-service state channel on port {port}")
+            state_channel_connected = True
+            last_seq = 0  # seq 0 is the service's initial empty state
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                message = json.loads(line)
+                seq = message.get("seq", 0)
+                if seq <= last_seq:
+                    continue
+                if last_seq and seq != last_seq + 1:
+                    logger.debug(f"State channel skipped {seq - last_seq - 1} superseded updates")
+                last_seq = seq
+                await broadcast_study_update(message.get("state") or {})
+            logger.info("dicom-service state channel closed - falling back to file watching")
+        except (OSError, ValueError) as e:
+            logger.debug(f"State channel unavailable: {e}")
+        finally:
+            state_channel_connected = False
+            if writer is not None:
+                writer.close()
+        await asyncio.sleep(STATE_CHANNEL_RETRY_SECS)
+
+
 async def handle_message(websocket, message_text):
     """Handle incoming WebSocket messages"""
     try:
@@ -511,11 +576,15 @@ async def main():
     observer.start()
     logger.info(f"Watching for study updates: {STATE_FILE}")
 
+    # Push updates from dicom-service; the file watcher is the fallback
+    channel_task = asyncio.create_task(subscribe_state_channel())
+
     try:
         async with websockets.serve(handler, "localhost", PORT):
             logger.info(f"Server ready - listening on port {PORT}")
             await asyncio.Future()  # Run forever
     finally:
+        channel_task.cancel()
         observer.stop()
         observer.join()
 
@@ -0,0 +1,98 @@
+"""Benchmark: full readlines() scan vs incremental tail of PSOnePerf.log.
+
+Builds a synthetic PSOnePerf.log (50 MB by default), then times what one
+watchdog ``on_modified`` costs after a single appended line:
+
+  * ``readlines``: the old approach — read and reverse-scan the whole file
+  * ``tail``:      :class:`_PSOneLogTail` — decode only the appended bytes
+
+Usage (from dicom-service/)::
+
+    python bench/bench_psone_log.py [--size-mb 50] [--appends 200]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from dicom_monitor import _PSOneLogTail, _accession_from_lines
+
+
+def build_log(path, size_mb):
+    """Write ~*size_mb* MB of PSOne-style lines; accessions are sparse."""
+    target = size_mb * 1024 * 1024
+    filler = ("2025-01-15 10:00:00.123 INFO  PerfCounter UIRefresh "
+              "elapsed=12ms thread=7 -\n")
+    written = 0
+    n = 0
+    with open(path, "w", encoding="utf-8") as fh:
+        while written < target:
+            if n % 5000 == 0:
+                line = (f"2025-01-15 10:00:00.123 INFO  OpenReport "
+                        f"SingleAccession RAD-{n}-CT\n")
+            else:
+                line = filler
+            fh.write(line)
+            written += len(line)
+            n += 1
+
+
+def readlines_baseline(path):
+    with open(path, encoding="utf-8", errors="replace") as fh:
+        lines = fh.readlines()
+    return _accession_from_lines(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=50)
+    parser.add_argument("--appends", type=int, default=200)
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "PSOnePerf.log")
+        t0 = time.perf_counter()
+        build_log(path, args.size_mb)
+        print(f"Built {os.path.getsize(path) / 1e6:.1f} MB log "
+              f"in {time.perf_counter() - t0:.1f} s")
+
+        tail = _PSOneLogTail(path)
+        t0 = time.perf_counter()
+        tail.poll()
+        print(f"tail first poll (backward scan): "
+              f"{(time.perf_counter() - t0) * 1000:.2f} ms, "
+              f"{tail.bytes_read} bytes")
+
+        base_total = tail_total = 0.0
+        bytes_before = tail.bytes_read
+        for i in range(args.appends):
+            with open(path, "a", encoding="utf-8") as fh:
+                fh.write(f"2025-01-15 11:00:00.000 INFO  OpenReport "
+                         f"SingleAccession RAD-9{i}-MR\n")
+
+            t0 = time.perf_counter()
+            acc = tail.poll()
+            tail_total += time.perf_counter() - t0
+
+            if i < 5:  # the baseline is slow; a few samples are enough
+                t0 = time.perf_counter()
+                assert readlines_baseline(path) == acc
+                base_total += time.perf_counter() - t0
+
+        base_ms = base_total / min(5, args.appends) * 1000
+        tail_ms = tail_total / args.appends * 1000
+        print(f"readlines per change: {base_ms:9.3f} ms")
+        print(f"tail per change:      {tail_ms:9.3f} ms "
+              f"({(tail.bytes_read - bytes_before) / args.appends:.0f} bytes)")
+        print(f"speed-up:             {base_ms / tail_ms:9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
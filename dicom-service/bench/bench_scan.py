@@ -0,0 +1,333 @@
+"""Benchmark suite: DICOM cache scanning at several cache sizes.
+
+For each cache size a synthetic cache is built (see synthetic_cache.py) and
+these are timed:
+
+  * ``find_recent``:  ``_find_in_recent_folders`` for targets at several
+                      newest-first ranks plus a miss, cold (fresh monitor)
+                      and warm (header memo populated), serial and parallel
+  * ``parse_first``:  ``_parse_first_dicom_in_folder`` over sampled folders
+  * ``psone_log``:    ``_parse_psone_log`` on a large PSOnePerf.log, and one
+                      incremental poll after an append
+  * ``lock``:         a full ``continue_search`` lock, ticking on a virtual
+                      clock so the deepening schedule plays out instantly;
+                      also with a fully built study index
+
+Results are written as JSON so runs can be compared across versions
+(``--compare`` prints the ratio against an earlier results file).  Timings
+are taken with the OS page cache warm.
+
+Usage (from dicom-service/)::
+
+    python bench/bench_scan.py [--sizes 250,1000,4000] [--work-dir DIR]
+                               [--out results.json] [--compare old.json]
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+_BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(_BENCH_DIR, ".."))
+sys.path.insert(0, _BENCH_DIR)
+
+from bench_psone_log import build_log
+from dicom_monitor import DicomMonitor
+from study_index import StudyIndex
+from synthetic_cache import build_cache, load_manifest
+
+# Newest-first ranks of the study searched for
+_RANKS = (0, 10, 40)
+
+
+def _timed(func, repeat):
+    """Run *func* *repeat* times; return (last result, summary in ms)."""
+    samples = []
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = func()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return result, _summary(samples)
+
+
+def _summary(samples):
+    ordered = sorted(samples)
+    return {
+        "n": len(ordered),
+        "min_ms": round(ordered[0], 3),
+        "median_ms": round(statistics.median(ordered), 3),
+        "p90_ms": round(ordered[min(len(ordered) - 1, int(0.9 * len(ordered)))], 3),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+
+def _target(manifest, rank):
+    """Return the first findable study at or after *rank* (newest first)."""
+    studies = manifest["studies"]
+    for entry in studies[rank:]:
+        if entry["clinical"] and not entry["partial"]:
+            return entry
+    return None
+
+
+def _monitor(cache_dir, data_dir, **kwargs):
+    return DicomMonitor(cache_dir=cache_dir, data_dir=data_dir, **kwargs)
+
+
+# ----------------------------------------------------------------------
+# Benchmarks
+# ----------------------------------------------------------------------
+
+def bench_find_recent(manifest, data_dir, repeat):
+    root = manifest["root"]
+    results = {}
+    targets = [(f"rank{r}", _target(manifest, r)) for r in _RANKS]
+    targets.append(("miss", {"core": "RAD-0-CT"}))
+    for workers in (1, 4):
+        for label, entry in targets:
+            if entry is None:
+                continue
+
+            def _cold():
+                m = _monitor(root, data_dir, probe_workers=workers)
+                try:
+                    return m._find_in_recent_folders(entry["core"]), m
+                finally:
+                    m.close()
+
+            (found, m), cold = _timed(_cold, repeat)
+            cold["probes"] = m.probe_stats["probes"]
+            cold["bytes"] = m.probe_stats["bytes"]
+            cold["found"] = found is not None
+
+            m = _monitor(root, data_dir, probe_workers=workers)
+            m._find_in_recent_folders(entry["core"])
+            _, warm = _timed(lambda: m._find_in_recent_folders(entry["core"]),
+                             repeat)
+            m.close()
+            results[f"{label}/workers{workers}/cold"] = cold
+            results[f"{label}/workers{workers}/warm"] = warm
+    return results
+
+
+def bench_parse_first(manifest, data_dir, samples):
+    m = _monitor(manifest["root"], data_dir)
+    step = max(1, len(manifest["studies"]) // samples)
+    times = []
+    for entry in manifest["studies"][::step][:samples]:
+        folder = os.path.join(manifest["root"], entry["uid"])
+        t0 = time.perf_counter()
+        m._parse_first_dicom_in_folder(folder)
+        times.append((time.perf_counter() - t0) * 1000)
+    result = _summary(times)
+    result["bytes_per_folder"] = round(m.probe_stats["bytes"] / len(times))
+    result["probes_per_folder"] = round(m.probe_stats["probes"] / len(times), 2)
+    return result
+
+
+def bench_psone_log(log_path, repeat):
+    _, full = _timed(lambda: DicomMonitor._parse_psone_log(log_path), repeat)
+
+    from dicom_monitor import _PSOneLogTail
+    tail = _PSOneLogTail(log_path)
+    tail.poll()
+    samples = []
+    for i in range(max(repeat, 20)):
+        with open(log_path, "a", encoding="utf-8") as fh:
+            fh.write(f"2025-01-15 11:00:00.000 INFO  OpenReport "
+                     f"SingleAccession RAD-9{i}-MR\n")
+        t0 = time.perf_counter()
+        tail.poll()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return {"first_poll": full, "incremental_poll": _summary(samples),
+            "log_bytes": os.path.getsize(log_path)}
+
+
+def _lock(m, core, tick):
+    """Run one search to completion on a virtual clock."""
+    m._start_search(core)
+    ticks = 0
+    wall = 0.0
+    while m.search_active:
+        if ticks:
+            m.search_start -= tick  # advance virtual time one tick
+        t0 = time.perf_counter()
+        m.continue_search()
+        wall += time.perf_counter() - t0
+        ticks += 1
+    return {"ticks": ticks, "virtual_s": round((ticks - 1) * tick, 1),
+            "wall_ms": round(wall * 1000, 3),
+            "locked": m.current_locked_acc == core}
+
+
+def bench_lock(manifest, data_dir, tick):
+    root = manifest["root"]
+    results = {}
+    for rank in _RANKS + (100,):
+        entry = _target(manifest, rank)
+        if entry is None:
+            continue
+        m = _monitor(root, data_dir, probe_workers=4)
+        results[f"rank{rank}"] = _lock(m, entry["core"], tick)
+        m.close()
+
+    # Study index fully built (steady state after the idle indexer ran)
+    index = StudyIndex(os.path.join(data_dir, "bench_index.json"))
+    m = _monitor(root, data_dir, index=index)
+    t0 = time.perf_counter()
+    while m.update_index(batch=500):
+        pass
+    build_s = time.perf_counter() - t0
+    entry = _target(manifest, len(manifest["studies"]) - 1) or _target(manifest, 0)
+    result = _lock(m, entry["core"], tick)
+    result["index_build_s"] = round(build_s, 2)
+    result["index_studies"] = len(index)
+    results["indexed_oldest"] = result
+    m.close()
+    return results
+
+
+# ----------------------------------------------------------------------
+# Driver
+# ----------------------------------------------------------------------
+
+def _cache_for(work_dir, studies, seed):
+    root = os.path.join(work_dir, f"cache-{studies}-s{seed}")
+    manifest = load_manifest(root)
+    if manifest is not None and len(manifest["studies"]) == studies:
+        print(f"Reusing {root}")
+        return manifest
+    shutil.rmtree(root, ignore_errors=True)
+    t0 = time.perf_counter()
+    manifest = build_cache(root, studies, seed=seed)
+    print(f"Built {studies} studies in {time.perf_counter() - t0:.1f} s")
+    return manifest
+
+
+def _meta(args):
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                             cwd=_BENCH_DIR, capture_output=True, text=True,
+                             timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        rev = ""
+    try:
+        import pydicom
+        pydicom_version = pydicom.__version__
+    except ImportError:
+        pydicom_version = ""
+    return {
+        "git_rev": rev,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "pydicom": pydicom_version,
+        "args": vars(args),
+    }
+
+
+def _flatten(node, prefix=""):
+    """Yield ``(path, median_ms)`` for every timing summary in *node*."""
+    if isinstance(node, dict):
+        if "median_ms" in node:
+            yield prefix, node["median_ms"]
+        elif "wall_ms" in node:
+            yield prefix, node["wall_ms"]
+        else:
+            for key, value in node.items():
+                yield from _flatten(value, f"{prefix}/{key}" if prefix else key)
+
+
+def compare(old, new):
+    """Print new/old timing ratios for every benchmark present in both."""
+    def _by_size(report):
+        return {str(r["cache_size"]): dict(_flatten(r["benchmarks"]))
+                for r in report["results"]}
+
+    old_sizes, new_sizes = _by_size(old), _by_size(new)
+    print(f"\nvs {old['meta'].get('git_rev') or '?'} "
+          f"({old['meta'].get('timestamp', '?')}):")
+    for size, timings in new_sizes.items():
+        before = old_sizes.get(size, {})
+        for key, value in timings.items():
+            if key in before and before[key] > 0:
+                print(f"  {size:>6} {key:<45} {before[key]:10.3f} -> "
+                      f"{value:10.3f} ms  x{value / before[key]:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="250,1000,4000",
+                        help="comma-separated study-folder counts")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--parse-samples", type=int, default=200)
+    parser.add_argument("--log-mb", type=int, default=20)
+    parser.add_argument("--tick", type=float, default=1.0,
+                        help="virtual seconds per search tick")
+    parser.add_argument("--work-dir", default="",
+                        help="keep synthetic caches here for reuse "
+                             "(default: a temporary directory)")
+    parser.add_argument("--out", default="")
+    parser.add_argument("--compare", default="",
+                        help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="dicom-bench-")
+    os.makedirs(work_dir, exist_ok=True)
+    report = {"meta": _meta(args), "results": []}
+    try:
+        log_path = os.path.join(work_dir, "PSOnePerf.log")
+        if not os.path.isfile(log_path) or \
+                os.path.getsize(log_path) < args.log_mb * 1024 * 1024:
+            build_log(log_path, args.log_mb)
+        psone = bench_psone_log(log_path, args.repeat)
+        print(f"psone_log first poll {psone['first_poll']['median_ms']:.3f} ms, "
+              f"incremental {psone['incremental_poll']['median_ms']:.3f} ms")
+
+        for size in sizes:
+            manifest = _cache_for(work_dir, size, args.seed)
+            with tempfile.TemporaryDirectory() as data_dir:
+                benchmarks = {
+                    "find_recent": bench_find_recent(manifest, data_dir, args.repeat),
+                    "parse_first": bench_parse_first(manifest, data_dir,
+                                                     args.parse_samples),
+                    "lock": bench_lock(manifest, data_dir, args.tick),
+                    "psone_log": psone,
+                }
+            report["results"].append({"cache_size": size, "benchmarks": benchmarks})
+
+            print(f"\n== {size} studies ==")
+            for key, value in _flatten(benchmarks):
+                print(f"  {key:<45} {value:10.3f} ms")
+    finally:
+        if not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    out = args.out or os.path.join(
+        _BENCH_DIR, "results", f"bench_scan-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=1)
+    print(f"\nResults written to {out}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            compare(json.load(fh), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,403 @@
+"""Replay a recorded trace through DicomMonitor on a virtual clock.
+
+Takes a trace written by ``trace_recorder.TraceRecorder`` (psone / window /
+folder events) and rebuilds the workload on Linux:
+
+  * a synthetic DICOM cache: ``--background`` older studies plus one folder
+    per traced folder, created and touched at the traced times (folders
+    linked to a study get that study's accession; studies reopened from
+    before the trace are hidden among the background folders)
+  * a PSOnePerf.log that gets one accession line per ``psone`` event
+  * a stub WindowMonitor whose title follows the ``window`` events
+
+The service's jobs (window check, PSOne poll, search tick, idle indexing,
+debounced prefetch) run on the service Scheduler with a virtual clock, so a
+day-long trace replays in minutes.  Real time spent inside jobs is charged
+to the virtual clock, so scan cost shows up in lock latency.  The
+monitor's wall clock follows the virtual one, and speculative lookups run
+inline, so a replay is deterministic.  With
+``--speed N`` the replay is paced at N x real time instead of as fast as
+possible.
+
+Lock latency is measured from each psone event to the matching lock.
+
+Usage (from dicom-service/)::
+
+    python bench/replay_trace.py data/traces/trace-....jsonl
+                                 [--speed 50] [--background 2000]
+                                 [--no-watchdog] [--out replay.json]
+"""
+
+import argparse
+import heapq
+import json
+import logging
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import Future
+
+_BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(_BENCH_DIR, ".."))
+sys.path.insert(0, _BENCH_DIR)
+
+from dicom_monitor import DicomMonitor
+from scheduler import Scheduler
+from study_index import StudyIndex
+from synthetic_cache import build_cache, make_dataset
+from trace_recorder import load_trace
+from window_monitor import WindowMonitor
+
+
+class VirtualClock:
+    """Monotonic clock the replay advances explicitly."""
+
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def advance_to(self, t):
+        self.now = max(self.now, t)
+
+
+class InlineExecutor:
+    """Executor that runs each task in submit(), keeping the replay on one thread."""
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as exc:
+            future.set_exception(exc)
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+
+class StubWindowMonitor(WindowMonitor):
+    """WindowMonitor whose patient title is set by the replay."""
+
+    def __init__(self):
+        super().__init__()
+        self.title = ""
+
+    def get_patient_title(self):
+        return self.title
+
+
+def _patient_name(patient):
+    # Fixed width so one pseudonym is never a substring of another
+    return f"P{patient:05d}X^REPLAY" if patient else "UNKNOWN^REPLAY"
+
+
+def _accession(study, mod):
+    return f"TRC-{study}-{mod or 'CT'}"
+
+
+class _Workload:
+    """Trace events resolved into the files the replay creates."""
+
+    def __init__(self, events):
+        self.events = events
+        self.links = {}          # folder -> (study, mod)
+        self.study_patient = {}  # study -> patient shown when it was opened
+        self.study_mod = {}
+        folders = set()
+        window = None
+        waiting = []             # studies opened with no patient window
+        for event in events:
+            kind = event["type"]
+            if kind == "link":
+                self.links.setdefault(event["folder"], (event["study"], event["mod"]))
+                self.study_mod.setdefault(event["study"], event["mod"])
+            elif kind == "folder":
+                folders.add(event["folder"])
+            elif kind == "window":
+                window = event["patient"]
+                if window:
+                    for study in waiting:
+                        self.study_patient.setdefault(study, window)
+                    waiting = []
+            elif kind == "psone":
+                self.study_mod.setdefault(event["study"], event["mod"])
+                if window:
+                    self.study_patient.setdefault(event["study"], window)
+                else:
+                    waiting.append(event["study"])
+
+        linked = {study for study, _ in self.links.values()}
+        opened = {e["study"] for e in events if e["type"] == "psone"}
+        # Opened during the trace but never written during it: already cached
+        self.preexisting = sorted(opened - linked)
+        self.folders = folders
+
+
+class Replay:
+    """Drive DicomMonitor through one trace."""
+
+    def __init__(self, trace_path, work_dir, *, background=1000, speed=0.0,
+                 watchdog=True, prefetch=None, index=True, seed=1,
+                 monitor_kwargs=None):
+        self.header, self.events = load_trace(trace_path)
+        self.work = _Workload(self.events)
+        self.work_dir = work_dir
+        self.background = background
+        self.speed = speed
+        self.watchdog = watchdog
+        config = self.header.get("config", {})
+        self.prefetch = config.get("prefetch_enabled", True) if prefetch is None else prefetch
+        self.debounce = config.get("prefetch_debounce", 1.5)
+        self.timer_interval = config.get("timer_interval", 2.0)
+        self.search_interval = config.get("search_interval", 1.0)
+        self.rng = random.Random(seed)
+
+        self.clock = VirtualClock()
+        self.cache_dir = os.path.join(work_dir, "cache")
+        self.data_dir = os.path.join(work_dir, "data")
+        self.log_path = os.path.join(work_dir, "PSOnePerf.log")
+        # File mtimes and the monitor's wall clock: virtual t maps onto
+        # wall-clock nanoseconds after "now"
+        self._epoch_ns = time.time_ns()
+
+        kwargs = {key: config[key] for key in
+                  ("search_timeout", "cache_size", "max_scan_folders")
+                  if key in config}
+        kwargs.update(monitor_kwargs or {})
+        self.index = StudyIndex(os.path.join(self.data_dir, "study_index.json")) \
+            if index else None
+        self.monitor = DicomMonitor(cache_dir=self.cache_dir, data_dir=self.data_dir,
+                                    index=self.index, clock=self.clock,
+                                    wall_clock=self._wall_clock,
+                                    spec_executor=InlineExecutor(),
+                                    psone_log_path=self.log_path, **kwargs)
+        self.window = StubWindowMonitor()
+        self.monitor.window_monitor = self.window
+        self.scheduler = Scheduler(clock=self.clock, max_sleep=60.0)
+
+        self.latencies = []
+        self.unlocked = 0
+        self._opened = {}       # core accession -> virtual time of psone event
+        self._prefetch = []     # heap of (due, folder path)
+        self._folder_paths = {}
+
+    # ------------------------------------------------------------------
+    # Setup
+    # ------------------------------------------------------------------
+
+    def prepare(self):
+        os.makedirs(self.data_dir, exist_ok=True)
+        open(self.log_path, "w").close()
+        count = min(self.background, self.header.get("cache_folders") or self.background)
+        manifest = build_cache(self.cache_dir, count, seed=self.rng.randrange(1 << 30),
+                               max_pad_kb=4)
+        mtimes = [e["mtime_ns"] for e in manifest["studies"]] or [self._epoch_ns]
+        # Reopened studies sit at random ranks among the background folders
+        for study in self.work.preexisting:
+            mtime_ns = self.rng.choice(mtimes) - 1
+            self._write_study(f"pre-{study}", study, mtime_ns)
+
+        m = self.monitor
+        self.scheduler.add_job("window",
+                               lambda: self.window.check_patient_safety(m),
+                               self.timer_interval)
+        self.scheduler.add_job("psone", self._psone_job, self.timer_interval,
+                               idle_interval=10.0 if self.watchdog else None)
+        self.scheduler.add_job("search", self._search_job, self.search_interval,
+                               idle_interval=10.0)
+        if self.index is not None:
+            self.scheduler.add_job("index", lambda: m.update_index(10) > 0,
+                                   self.timer_interval, idle_interval=10.0)
+
+    def _write_study(self, name, study, mtime_ns, patient=None):
+        mod = self.work.study_mod.get(study, "CT")
+        if patient is None:
+            patient = self.work.study_patient.get(study)
+        folder = os.path.join(self.cache_dir, f"1.2.999.{name}")
+        path = os.path.join(folder, "1.2.999.1", "0000.dcm")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        ds = make_dataset(_accession(study, mod), mod, _patient_name(patient),
+                          "O", "050Y", 2048)
+        ds.save_as(path, enforce_file_format=True)
+        os.utime(folder, ns=(mtime_ns, mtime_ns))
+        return folder
+
+    # ------------------------------------------------------------------
+    # Jobs (mirror dicom_service.main)
+    # ------------------------------------------------------------------
+
+    def _psone_job(self):
+        before = self.monitor.search_target_acc
+        self.monitor.on_psone_log_changed()
+        started = self.monitor.search_active and self.monitor.search_target_acc != before
+        if started:
+            self.scheduler.wake("search")
+        return started
+
+    def _search_job(self):
+        self.monitor.continue_search()
+        return self.monitor.search_active or bool(self.monitor.pending_targets)
+
+    # ------------------------------------------------------------------
+    # Events
+    # ------------------------------------------------------------------
+
+    def _apply(self, event):
+        kind = event["type"]
+        t = event["t"]
+        if kind == "window":
+            self.window.title = _patient_name(event["patient"]) if event["patient"] else ""
+        elif kind == "psone":
+            acc = _accession(event["study"], event["mod"])
+            with open(self.log_path, "a", encoding="utf-8") as fh:
+                fh.write(f"{t:.3f} INFO  OpenReport SingleAccession {acc}\n")
+            mtime_ns = self._epoch_ns + int(t * 1e9)
+            os.utime(self.log_path, ns=(mtime_ns, mtime_ns))
+            self._opened.setdefault(acc, t)
+            if self.watchdog:
+                self.scheduler.wake("psone")
+        elif kind == "folder":
+            ident = event["folder"]
+            mtime_ns = self._epoch_ns + int(t * 1e9)
+            folder = self._folder_paths.get(ident)
+            if folder is None:
+                study, _ = self.work.links.get(ident, (None, None))
+                if study is None:
+                    # Some other study we never learned the accession of
+                    study = -ident
+                folder = self._folder_paths[ident] = self._write_study(
+                    f"f{ident}", study, mtime_ns)
+            else:
+                os.utime(folder, ns=(mtime_ns, mtime_ns))
+            if self.prefetch:
+                heapq.heappush(self._prefetch, (t + self.debounce, folder))
+
+    def _wall_clock(self):
+        """Epoch seconds on the virtual timeline (file mtimes use the same)."""
+        return self._epoch_ns / 1e9 + self.clock.now
+
+    def _check_lock(self):
+        acc = self.monitor.current_locked_acc
+        opened = self._opened.pop(acc, None)
+        if opened is not None:
+            self.latencies.append(self.clock.now - opened)
+
+    # ------------------------------------------------------------------
+    # Main loop
+    # ------------------------------------------------------------------
+
+    def run(self):
+        events = self.events
+        n = len(events)
+        i = 0
+        wall0 = time.perf_counter()
+        while True:
+            t0 = time.perf_counter()
+            delay = self.scheduler.run_pending()
+            spent = time.perf_counter() - t0
+            self.clock.advance_to(self.clock.now + spent)
+            self._check_lock()
+
+            if i >= n and not self.monitor.search_active and not self._prefetch:
+                break
+            next_t = self.clock.now + delay
+            if i < n:
+                next_t = min(next_t, events[i]["t"])
+            if self._prefetch:
+                next_t = min(next_t, self._prefetch[0][0])
+            if self.speed > 0 and next_t > self.clock.now:
+                time.sleep((next_t - self.clock.now) / self.speed)
+            self.clock.advance_to(next_t)
+
+            while i < n and events[i]["t"] <= self.clock.now:
+                self._apply(events[i])
+                i += 1
+            while self._prefetch and self._prefetch[0][0] <= self.clock.now:
+                _, folder = heapq.heappop(self._prefetch)
+                self.monitor.prefetch_folder(folder)
+
+        self.unlocked = len(self._opened)
+        self.monitor.close()
+        return self.report(time.perf_counter() - wall0)
+
+    def report(self, wall_s):
+        lat = sorted(self.latencies)
+
+        def _pct(p):
+            return round(lat[min(len(lat) - 1, int(p / 100 * len(lat)))], 3) if lat else None
+
+        virtual_s = self.clock.now
+        return {
+            "events": len(self.events),
+            "virtual_s": round(virtual_s, 1),
+            "wall_s": round(wall_s, 2),
+            "speedup": round(virtual_s / wall_s, 1) if wall_s else None,
+            "locks": len(lat),
+            "unlocked": self.unlocked,
+            "latency_s": {
+                "p50": _pct(50), "p90": _pct(90), "p99": _pct(99),
+                "max": round(lat[-1], 3) if lat else None,
+                "mean": round(statistics.mean(lat), 3) if lat else None,
+            },
+            "counters": dict(sorted(self.monitor.metrics.counters.items())),
+            "scheduler": self.scheduler.stats(),
+        }
+
+
+def replay(trace_path, work_dir=None, **kwargs):
+    """Replay *trace_path* in *work_dir* (a temporary one by default)."""
+    own = work_dir is None
+    work_dir = work_dir or tempfile.mkdtemp(prefix="dicom-replay-")
+    try:
+        r = Replay(trace_path, work_dir, **kwargs)
+        r.prepare()
+        return r.run()
+    finally:
+        if own:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("trace")
+    parser.add_argument("--speed", type=float, default=0.0,
+                        help="pace at N x real time (default: as fast as possible)")
+    parser.add_argument("--background", type=int, default=1000,
+                        help="older study folders in the synthetic cache")
+    parser.add_argument("--no-watchdog", action="store_true",
+                        help="PSOne changes only seen by the fallback poll")
+    parser.add_argument("--no-prefetch", action="store_true")
+    parser.add_argument("--no-index", action="store_true")
+    parser.add_argument("--no-speculate", action="store_true",
+                        help="no name-triggered lookup on window changes")
+    parser.add_argument("--probe-workers", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", default="")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+
+    result = replay(args.trace, background=args.background, speed=args.speed,
+                    watchdog=not args.no_watchdog,
+                    prefetch=False if args.no_prefetch else None,
+                    index=not args.no_index, seed=args.seed,
+                    monitor_kwargs={"probe_workers": args.probe_workers,
+                                    "speculate_max": 0 if args.no_speculate else 2})
+    result["trace"] = os.path.abspath(args.trace)
+    result["args"] = vars(args)
+    print(json.dumps({k: result[k] for k in
+                      ("events", "virtual_s", "wall_s", "speedup", "locks",
+                       "unlocked", "latency_s")}, indent=1))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump(result, fh, indent=1)
+
+
+if __name__ == "__main__":
+    main()
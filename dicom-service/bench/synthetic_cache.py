@@ -0,0 +1,174 @@
+"""Synthetic InteleViewer DICOM cache for benchmarks.
+
+Builds a cache that looks like a busy workstation's::
+
+    <root>/
+      InteleViewerDicomSpool/          named containers (never scanned)
+      <study_uid>/                     one per study, mtimes spread over days
+        <series_uid>/*.dcm             1-4 series, mixed file sizes
+        <series_uid>/Thumbs.db         non-DICOM junk
+        <series_uid>/*.part            partially written files
+
+A fraction of studies are still "being written": their only image files
+are truncated mid-header.  Study mtimes are set explicitly so newest-first
+order is deterministic for a given seed.
+
+Everything is pure Python + pydicom; no Windows APIs.
+
+Usage (from dicom-service/)::
+
+    python bench/synthetic_cache.py <root> [--studies 2000] [--seed 1]
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+
+try:
+    from pydicom.dataset import Dataset, FileMetaDataset
+    from pydicom.uid import ExplicitVRLittleEndian, generate_uid
+except ImportError:
+    Dataset = None
+
+_MODALITIES = ("CT", "MR", "US", "DX", "CR", "MG", "PT", "NM", "XA")
+_NON_CLINICAL = ("SR", "PR", "REG", "KO")
+_LAST_NAMES = ("SMITH", "JONES", "TAYLOR", "BROWN", "WILSON", "NGUYEN",
+               "PATEL", "KELLY", "MARTIN", "WHITE")
+_FIRST_NAMES = ("ALEX", "SAM", "JO", "CHRIS", "PAT", "ROBIN", "LEE", "KIM")
+_DESCRIPTIONS = {"CT": "CT CHEST", "MR": "MR BRAIN", "US": "US ABDOMEN",
+                 "DX": "XR CHEST", "CR": "XR HAND", "MG": "MAMMOGRAM",
+                 "PT": "PET CT", "NM": "NM BONE", "XA": "ANGIOGRAM"}
+
+MANIFEST_NAME = "synthetic_cache.json"
+
+
+def _uid(rng):
+    # Deterministic UID-shaped names (generate_uid() is random)
+    return "1.2.826.0.1.3680043.8.498." + ".".join(
+        str(rng.randrange(1, 10 ** 9)) for _ in range(3))
+
+
+def make_dataset(acc, modality, name, sex, age, pad_bytes):
+    meta = FileMetaDataset()
+    meta.MediaStorageSOPClassUID = "1.2.840.10008.5.1.4.1.1.2"
+    meta.MediaStorageSOPInstanceUID = generate_uid()
+    meta.TransferSyntaxUID = ExplicitVRLittleEndian
+
+    ds = Dataset()
+    ds.file_meta = meta
+    ds.SOPClassUID = meta.MediaStorageSOPClassUID
+    ds.SOPInstanceUID = meta.MediaStorageSOPInstanceUID
+    ds.SpecificCharacterSet = "ISO_IR 100"
+    ds.AccessionNumber = acc
+    ds.Modality = modality
+    ds.StudyDescription = _DESCRIPTIONS.get(modality, "STUDY")
+    ds.PatientName = name
+    ds.PatientSex = sex
+    ds.PatientAge = age
+    # Stand-in for private groups / pixel data after the header tags
+    ds.add_new(0x7FE00010, "OB", b"\0" * pad_bytes)
+    return ds
+
+
+def build_cache(root, studies=2000, *, seed=1, partial_ratio=0.03,
+                junk_ratio=0.2, non_clinical_ratio=0.05, days=14,
+                max_pad_kb=32):
+    """Populate *root* with *studies* study folders; return the manifest.
+
+    The manifest lists studies newest first::
+
+        {"root": ..., "seed": ..., "studies": [
+            {"uid", "acc", "core", "name", "mtime_ns", "partial"}, ...]}
+    """
+    if Dataset is None:
+        raise RuntimeError("pydicom is required to build a synthetic cache")
+
+    rng = random.Random(seed)
+    os.makedirs(root, exist_ok=True)
+    os.makedirs(os.path.join(root, "InteleViewerDicomSpool"), exist_ok=True)
+    os.makedirs(os.path.join(root, "InteleViewerDicom"), exist_ok=True)
+
+    now_ns = time.time_ns()
+    span_ns = days * 86400 * 10 ** 9
+    entries = []
+    for n in range(studies):
+        modality = rng.choice(_NON_CLINICAL if rng.random() < non_clinical_ratio
+                              else _MODALITIES)
+        core = f"RAD-{100000 + n}-{modality if modality in _MODALITIES else 'CT'}"
+        acc = core + (f"_{rng.randint(1, 3)}" if rng.random() < 0.1 else "")
+        name = f"{rng.choice(_LAST_NAMES)}^{rng.choice(_FIRST_NAMES)}"
+        sex = rng.choice("MFO")
+        age = f"{rng.randint(1, 99):03d}Y"
+        partial = rng.random() < partial_ratio
+
+        uid = _uid(rng)
+        study_dir = os.path.join(root, uid)
+        for _ in range(rng.randint(1, 4)):
+            series_dir = os.path.join(study_dir, _uid(rng))
+            os.makedirs(series_dir, exist_ok=True)
+            for i in range(rng.randint(1, 6)):
+                pad = rng.randint(1, max_pad_kb) * 1024
+                ds = make_dataset(acc, modality, name, sex, age, pad)
+                path = os.path.join(series_dir, f"{i:04d}.dcm")
+                ds.save_as(path, enforce_file_format=True)
+                if partial:
+                    # InteleViewer still writing: header cut short
+                    with open(path, "r+b") as fh:
+                        fh.truncate(rng.randint(200, 400))
+                    os.replace(path, path[:-4] + ".part")
+            if rng.random() < junk_ratio:
+                with open(os.path.join(series_dir, "Thumbs.db"), "wb") as fh:
+                    fh.write(os.urandom(rng.randint(2048, 8192)))
+            if rng.random() < junk_ratio:
+                with open(os.path.join(series_dir, "index.lck"), "wb") as fh:
+                    fh.write(b"lock")
+
+        mtime_ns = now_ns - span_ns + rng.randrange(span_ns)
+        os.utime(study_dir, ns=(mtime_ns, mtime_ns))
+        entries.append({"uid": uid, "acc": acc, "core": core, "name": name,
+                        "mtime_ns": mtime_ns, "partial": partial,
+                        "clinical": modality in _MODALITIES})
+
+    entries.sort(key=lambda e: e["mtime_ns"], reverse=True)
+    manifest = {"root": os.path.abspath(root), "seed": seed, "studies": entries}
+    with open(os.path.join(root, MANIFEST_NAME), "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh)
+    return manifest
+
+
+def load_manifest(root):
+    """Return the manifest of a cache built earlier, or *None*."""
+    try:
+        with open(os.path.join(root, MANIFEST_NAME), encoding="utf-8") as fh:
+            manifest = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    # Folder mtimes drift if anything touched them; trust the filesystem
+    for entry in manifest["studies"]:
+        try:
+            entry["mtime_ns"] = os.stat(os.path.join(root, entry["uid"])).st_mtime_ns
+        except OSError:
+            return None
+    manifest["studies"].sort(key=lambda e: e["mtime_ns"], reverse=True)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("root")
+    parser.add_argument("--studies", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--max-pad-kb", type=int, default=32)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    manifest = build_cache(args.root, args.studies, seed=args.seed,
+                           max_pad_kb=args.max_pad_kb)
+    print(f"Built {len(manifest['studies'])} studies in {args.root} "
+          f"({time.perf_counter() - t0:.1f} s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+"""
+Control API — loopback HTTP endpoint for host apps to drive the service.
+
+Host apps (report-check, bruce-helper) used to coordinate with the service
+through files: a ``data/heartbeat`` timestamp the service stat()ed every
+tick, and ``data/service.lock`` whose PID they checked with OpenProcess.
+This module serves the same coordination as cheap loopback calls::
+
+    GET    /ping                        {"ok": true, "pid": ..., "uptime_s": ...}
+    POST   /lease?client=NAME&ttl=30    keep-alive lease for one host app
+    DELETE /lease?client=NAME           release it (host app exiting)
+    GET    /status                      uptime, search state, leases, metrics
+    POST   /search?acc=ACCESSION        start a search now
+    POST   /reset                       clear search/lock state
+    POST   /shutdown                    stop the service gracefully
+
+Every host app holds its own lease; the service keeps running while any
+lease is live (see :class:`Leases`).  Responses are JSON.  Requests must
+carry the ``X-Control-Token`` header from ``data/control.json`` (written on
+start, removed on shutdown, alongside the port and PID) — a browser page
+can't set it, so a web page can't drive the service via 127.0.0.1.
+
+Anything that touches the monitor (search, reset, and the search state
+in status) is queued and run on the service's main loop by
+:meth:`ControlServer.run_pending`, since the monitor isn't thread-safe;
+ping and lease are answered on the request thread so they stay fast while
+a search is sweeping.
+
+The file heartbeat and PID lock stay in place as the fallback for host
+apps that don't use the API.
+
+PRIVACY: no endpoint returns patient names.
+"""
+
+import http.client
+import json
+import logging
+import os
+import secrets
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+log = logging.getLogger(__name__)
+
+CONTROL_FILE_NAME = "control.json"
+TOKEN_HEADER = "X-Control-Token"
+
+# Lease length when the client doesn't ask for one, and the longest allowed
+DEFAULT_LEASE_SECS = 30.0
+MAX_LEASE_SECS = 600.0
+
+# How long a request waits for the main loop to run its command
+_COMMAND_TIMEOUT_SECS = 10.0
+
+
+class Leases:
+    """Per-client keep-alive leases.  Thread-safe."""
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.renewals = 0
+        self._expiry = {}  # client -> monotonic expiry
+        self._lock = threading.Lock()
+
+    def renew(self, client, ttl=DEFAULT_LEASE_SECS):
+        """Grant or extend *client*'s lease by *ttl* seconds; return the ttl used."""
+        ttl = min(max(1.0, float(ttl)), MAX_LEASE_SECS)
+        with self._lock:
+            if client not in self._expiry:
+                log.info("Host app %s took a lease (%.0f s)", client, ttl)
+            self._expiry[client] = self.clock() + ttl
+            self.renewals += 1
+        return ttl
+
+    def release(self, client):
+        """Drop *client*'s lease; return True if it held one."""
+        with self._lock:
+            held = self._expiry.pop(client, None) is not None
+        if held:
+            log.info("Host app %s released its lease", client)
+        return held
+
+    def active(self):
+        """Clients with a live lease -> seconds left (expired ones are dropped)."""
+        now = self.clock()
+        with self._lock:
+            for client in [c for c, t in self._expiry.items() if t <= now]:
+                del self._expiry[client]
+                log.info("Lease of host app %s expired", client)
+            return {c: round(t - now, 1) for c, t in self._expiry.items()}
+
+
+class ControlServer:
+    """Loopback HTTP control endpoint (see module docstring).
+
+    *commands* maps ``"search"``, ``"reset"`` and ``"shutdown"`` to
+    callables run on the main loop; *status*, whose dict is merged into
+    ``GET /status``, runs there too.  *wake* is called
+    (from the request thread) whenever a command is queued, so the main
+    loop can run :meth:`run_pending` without waiting out a tick.
+    """
+
+    def __init__(self, data_dir, *, commands, status=None, wake=None,
+                 host="127.0.0.1", port=0, clock=time.monotonic):
+        self.data_dir = data_dir
+        self.control_file = os.path.join(data_dir, CONTROL_FILE_NAME)
+        self.host = host
+        self.port = port
+        self.commands = dict(commands)
+        if status is not None:
+            self.commands["status"] = status
+        self.wake = wake
+        self.clock = clock
+        self.token = secrets.token_hex(16)
+        self.leases = Leases(clock=clock)
+
+        self.requests = 0
+        self.rejected = 0
+        self._queue = []  # (name, kwargs, Future) waiting for the main loop
+        self._queue_lock = threading.Lock()
+        self._server = None
+        self._started = clock()
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Bind the loopback port, start serving and publish control.json."""
+        server = ThreadingHTTPServer((self.host, self.port), _Handler)
+        server.daemon_threads = True
+        server.control = self
+        self._server = server
+        self.port = server.server_address[1]
+        threading.Thread(target=server.serve_forever, name="control-api",
+                         daemon=True).start()
+        self._write_control_file()
+        log.info("Control API listening on %s:%d", self.host, self.port)
+
+    def stop(self):
+        if self._server is None:
+            return
+        server, self._server = self._server, None
+        server.shutdown()
+        server.server_close()
+        try:
+            os.unlink(self.control_file)
+        except OSError:
+            pass
+        # Fail anything the main loop will never run now
+        with self._queue_lock:
+            queued, self._queue = self._queue, []
+        for _, _, future in queued:
+            future.set_exception(RuntimeError("service stopping"))
+        log.info("Control API stopped: %s", self.stats())
+
+    # ------------------------------------------------------------------
+    # Main-loop commands
+    # ------------------------------------------------------------------
+
+    def submit(self, name, **kwargs):
+        """Queue command *name* for the main loop; return its Future."""
+        future = Future()
+        with self._queue_lock:
+            self._queue.append((name, kwargs, future))
+        if self.wake is not None:
+            self.wake()
+        return future
+
+    def run_pending(self):
+        """Run queued commands (main loop); return how many ran."""
+        with self._queue_lock:
+            queued, self._queue = self._queue, []
+        for name, kwargs, future in queued:
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(self.commands[name](**kwargs))
+            except Exception as exc:
+                log.exception("Control command %s failed", name)
+                future.set_exception(exc)
+        return len(queued)
+
+    # ------------------------------------------------------------------
+    # Request dispatch (request threads)
+    # ------------------------------------------------------------------
+
+    def handle(self, method, path, query):
+        """Return ``(http_status, payload)`` for one request."""
+        self.requests += 1
+        route = (method, path.rstrip("/") or "/")
+
+        if route == ("GET", "/ping"):
+            return 200, {"ok": True, "pid": os.getpid(),
+                         "uptime_s": round(self.clock() - self._started, 1)}
+
+        if route in (("POST", "/lease"), ("DELETE", "/lease")):
+            client = query.get("client", "").strip()
+            if not client:
+                return 400, {"ok": False, "error": "client required"}
+            if method == "DELETE":
+                return 200, {"ok": True, "released": self.leases.release(client)}
+            try:
+                ttl = self.leases.renew(client, query.get("ttl", DEFAULT_LEASE_SECS))
+            except ValueError:
+                return 400, {"ok": False, "error": "bad ttl"}
+            return 200, {"ok": True, "ttl": ttl, "clients": len(self.leases.active())}
+
+        if route == ("GET", "/status"):
+            payload = {"ok": True, "pid": os.getpid(),
+                       "uptime_s": round(self.clock() - self._started, 1),
+                       "leases": self.leases.active()}
+            if "status" in self.commands:
+                try:
+                    payload.update(self.submit("status").result(_COMMAND_TIMEOUT_SECS))
+                except Exception as exc:
+                    return 503, {"ok": False, "error": str(exc) or type(exc).__name__}
+            return 200, payload
+
+        command = {("POST", "/search"): "search", ("POST", "/reset"): "reset",
+                   ("POST", "/shutdown"): "shutdown"}.get(route)
+        if command is None:
+            return 404, {"ok": False, "error": "unknown endpoint"}
+        kwargs = {}
+        if command == "search":
+            acc = query.get("acc", "").strip()
+            if not acc:
+                return 400, {"ok": False, "error": "acc required"}
+            kwargs["accession"] = acc
+        try:
+            result = self.submit(command, **kwargs).result(_COMMAND_TIMEOUT_SECS)
+        except Exception as exc:
+            return 503, {"ok": False, "error": str(exc) or type(exc).__name__}
+        return 200, {"ok": True, "result": result}
+
+    def stats(self):
+        return {"requests": self.requests, "rejected": self.rejected,
+                "renewals": self.leases.renewals,
+                "leases": len(self.leases.active())}
+
+    def _write_control_file(self):
+        os.makedirs(self.data_dir, exist_ok=True)
+        tmp_fd, tmp_path = tempfile.mkstemp(dir=self.data_dir, suffix=".tmp")
+        try:
+            with os.fdopen(tmp_fd, "w", encoding="utf-8") as fh:
+                json.dump({"port": self.port, "pid": os.getpid(),
+                           "token": self.token}, fh)
+            os.replace(tmp_path, self.control_file)
+        except OSError:
+            log.warning("Failed to write control file", exc_info=True)
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Token check and JSON framing around :meth:`ControlServer.handle`."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self._dispatch()
+
+    def do_POST(self):
+        self._dispatch()
+
+    def do_DELETE(self):
+        self._dispatch()
+
+    def _dispatch(self):
+        control = self.server.control
+        # Drain any body so keep-alive connections stay in sync
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length > 0:
+            self.rfile.read(length)
+        if length < 0:
+            # Can't tell where the body ends: answer and drop the connection
+            self.close_connection = True
+            status, payload = 400, {"ok": False, "error": "bad Content-Length"}
+        elif not secrets.compare_digest(self.headers.get(TOKEN_HEADER, ""),
+                                        control.token):
+            control.rejected += 1
+            status, payload = 403, {"ok": False, "error": "bad token"}
+        else:
+            url = urlsplit(self.path)
+            query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            status, payload = control.handle(self.command, url.path, query)
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        log.debug("Control %s", format % args)
+
+
+def read_control_file(data_dir):
+    """Return ``{"port", "pid", "token"}`` from *data_dir*, or *None*."""
+    try:
+        with open(os.path.join(data_dir, CONTROL_FILE_NAME), encoding="utf-8") as fh:
+            info = json.load(fh)
+        return info if isinstance(info, dict) and info.get("port") else None
+    except (OSError, ValueError):
+        return None
+
+
+def call(info, method, path, timeout=2.0):
+    """Call a running service's control API; return the JSON reply or *None*.
+
+    *info* is :func:`read_control_file`'s result.  Used by a second service
+    instance to find out whether the first is really alive.
+    """
+    conn = http.client.HTTPConnection("127.0.0.1", int(info["port"]), timeout=timeout)
+    try:
+        conn.request(method, path, headers={TOKEN_HEADER: info.get("token", "")})
+        response = conn.getresponse()
+        payload = json.loads(response.read() or b"{}")
+        return payload if response.status == 200 else None
+    except (OSError, ValueError):
+        return None
+    finally:
+        conn.close()
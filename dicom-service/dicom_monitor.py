@@ -7,16 +7,23 @@ polling).  The main loop still calls :meth:`continue_search` every 2 s to
 handle cases where the DICOM file hasn't appeared yet.
 """
 
+import contextlib
+import heapq
 import json
 import logging
 import os
 import re
 import tempfile
+import threading
 import time
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
 
 from watchdog.events import FileSystemEventHandler
 
+from search_metrics import SearchMetrics
+from study_cache import StudyCache, StudyRecord
+
 try:
     import pydicom
 except ImportError:
@@ -29,6 +36,24 @@ log = logging.getLogger(__name__)
 _CLINICAL_MODALITIES = {"CT", "MR", "US", "DX", "CR", "MG", "PT", "NM", "XA"}
 _CLINICAL_RE = re.compile(r"^(" + "|".join(_CLINICAL_MODALITIES) + r")$")
 _ACC_MOD_RE = re.compile(r"-(" + "|".join(_CLINICAL_MODALITIES) + r")(?:[_-]|$)")
+_PSONE_ACC_RE = re.compile(r"^[A-Z]{2,3}-\d+-[A-Z]{2}$")
+
+# Header probe: files smaller than this are skipped without opening, and
+# only these tags are parsed.  Parsing stops past the highest one
+# (PatientAge, 0010,1010) so large private groups and pixel data are never
+# read.
+_MIN_DICOM_SIZE = 1024
+_PREAMBLE_LEN = 132  # 128-byte preamble + b"DICM"
+_HEADER_TAGS = (
+    0x00080005,  # SpecificCharacterSet (needed to decode PatientName)
+    0x00080050,  # AccessionNumber
+    0x00080060,  # Modality
+    0x00081030,  # StudyDescription
+    0x00100010,  # PatientName
+    0x00100040,  # PatientSex
+    0x00101010,  # PatientAge
+)
+_LAST_HEADER_TAG = max(_HEADER_TAGS)
 
 
 # ======================================================================
@@ -36,11 +61,17 @@ _ACC_MOD_RE = re.compile(r"-(" + "|".join(_CLINICAL_MODALITIES) + r")(?:[_-]|$)"
 # ======================================================================
 
 class PSOnePerfHandler(FileSystemEventHandler):
-    """watchdog handler that fires when PSOnePerf.log is modified."""
+    """watchdog handler that fires when PSOnePerf.log is modified.
+
+    With *wake* (the service scheduler), the log is parsed on the main loop
+    thread, which the callback wakes immediately; otherwise it is parsed
+    directly on the watchdog thread.
+    """
 
-    def __init__(self, monitor):
+    def __init__(self, monitor, wake=None):
         super().__init__()
         self.monitor = monitor
+        self.wake = wake
 
     def on_modified(self, event):
         if event.is_directory:
@@ -49,7 +80,461 @@ class PSOnePerfHandler(FileSystemEventHandler):
         if os.path.basename(event.src_path) != "PSOnePerf.log":
             return
         log.debug("PSOnePerf.log modified (watchdog)")
-        self.monitor.on_psone_log_changed()
+        if self.wake is not None:
+            self.wake()
+        else:
+            self.monitor.on_psone_log_changed()
+
+
+# ======================================================================
+# PSOnePerf.log tail reader
+# ======================================================================
+
+class _PSOneLogTail:
+    """Incremental reader for PSOnePerf.log.
+
+    The log grows all day, so rather than re-reading it on every change
+    this remembers the byte offset and file identity (device, inode) and
+    decodes only the bytes appended since the last poll.  The first poll —
+    and any poll after truncation or rotation — scans backwards from the end
+    in ``block_size`` chunks until an accession is found.
+
+    Changes are detected by ``(size, mtime_ns)`` rather than a float mtime,
+    so two appends within the filesystem's mtime resolution still register.
+    """
+
+    def __init__(self, path, block_size=64 * 1024):
+        self.path = path
+        self.block_size = block_size
+        self.last_acc = ""
+        self.bytes_read = 0
+
+        self._identity = None
+        self._offset = 0
+        self._partial = b""      # trailing bytes of an unterminated last line
+        self._change_key = None  # (size, mtime_ns) at the last poll
+        self._lock = threading.Lock()
+
+    @property
+    def mtime_ns(self):
+        """Log mtime at the last poll that saw a change (0 if none)."""
+        return self._change_key[1] if self._change_key else 0
+
+    def forget_change(self):
+        """Make the next :meth:`poll` report :attr:`last_acc` again."""
+        with self._lock:
+            self._change_key = None
+
+    def poll(self):
+        """Return the most recent accession, or *None* if nothing changed.
+
+        ``""`` means the log changed but holds no accession yet.
+        """
+        with self._lock:
+            try:
+                st = os.stat(self.path)
+            except OSError:
+                return None
+
+            key = (st.st_size, st.st_mtime_ns)
+            if key == self._change_key:
+                return None
+            self._change_key = key
+
+            identity = (st.st_dev, st.st_ino)
+            try:
+                if identity != self._identity or st.st_size < self._offset:
+                    if self._identity is not None:
+                        log.debug("PSOnePerf.log rotated or truncated")
+                    self._identity = identity
+                    self.last_acc = self._scan_backwards(st.st_size)
+                elif st.st_size > self._offset:
+                    acc = self._read_appended(st.st_size)
+                    if acc:
+                        self.last_acc = acc
+            except OSError:
+                self._change_key = None
+                return None
+            return self.last_acc
+
+    def _read_appended(self, size):
+        with open(self.path, "rb") as fh:
+            fh.seek(self._offset)
+            new = fh.read(size - self._offset)
+        self.bytes_read += len(new)
+        self._offset += len(new)
+
+        buf = self._partial + new
+        nl = buf.rfind(b"\n")
+        # Scan the unterminated tail too, but keep it for the next read
+        self._partial = buf[nl + 1:]
+        return _accession_from_lines(_decode_lines(buf))
+
+    def _scan_backwards(self, size):
+        self._offset = size
+        self._partial = b""
+        pos = size
+        carry = b""  # start of a line that continues in the previous block
+        first = True
+        with open(self.path, "rb") as fh:
+            while pos > 0:
+                start = max(0, pos - self.block_size)
+                fh.seek(start)
+                chunk = fh.read(pos - start)
+                self.bytes_read += len(chunk)
+                pos = start
+
+                buf = chunk + carry
+                if first:
+                    self._partial = buf[buf.rfind(b"\n") + 1:]
+                    first = False
+                if pos > 0:
+                    nl = buf.find(b"\n")
+                    if nl < 0:
+                        carry = buf
+                        continue
+                    carry, buf = buf[:nl], buf[nl + 1:]
+                acc = _accession_from_lines(_decode_lines(buf))
+                if acc:
+                    return acc
+        return ""
+
+
+# ======================================================================
+# Cache snapshot — study folders under the cache root, tick to tick
+# ======================================================================
+
+class _CacheSnapshot:
+    """``os.scandir`` snapshot of the UID folders directly under *root*.
+
+    Each :meth:`refresh` lists the root once, using the ``DirEntry`` stat
+    results (free on Windows, where a network-mounted cache would otherwise
+    pay a round trip per folder), and returns the delta against the
+    previous snapshot.  The newest-first ordering is only rebuilt when
+    something changed, and top-N selection uses a heap rather than a full
+    sort.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.folders = {}  # uid -> (mtime_ns, path)
+        self._ranked = {}  # n -> [(mtime_ns, uid, path)], valid until a change
+
+    def __len__(self):
+        return len(self.folders)
+
+    def refresh(self):
+        """Rescan the root.
+
+        Returns ``(added, removed, touched)`` sets of folder uids, or *None*
+        if the root can't be listed (the previous snapshot is kept).
+        """
+        return self.apply(self.scan())
+
+    def scan(self):
+        """List the root: ``{uid: (mtime_ns, path)}``, or *None* on error.
+
+        Touches no state, so it can run on a root's lister thread.
+        """
+        current = {}
+        try:
+            with os.scandir(self.root) as it:
+                for entry in it:
+                    if not _looks_like_uid(entry.name):
+                        continue
+                    try:
+                        if not entry.is_dir():
+                            continue
+                        current[entry.name] = (entry.stat().st_mtime_ns, entry.path)
+                    except OSError:
+                        continue
+        except OSError:
+            return None
+        return current
+
+    def apply(self, current):
+        """Replace the snapshot with a :meth:`scan` result; return the delta."""
+        if current is None:
+            return None
+        previous = self.folders
+        added = current.keys() - previous.keys()
+        removed = previous.keys() - current.keys()
+        touched = {uid for uid in current.keys() & previous.keys()
+                   if current[uid][0] != previous[uid][0]}
+
+        self.folders = current
+        if added or removed or touched:
+            self._ranked = {}
+        return added, removed, touched
+
+    def top(self, n=None):
+        """Return up to *n* ``(mtime_ns, uid, path)`` tuples, newest first.
+
+        ``n=None`` returns every folder.
+        """
+        ranked = self._ranked.get(n)
+        if ranked is None:
+            items = ((mtime, uid, path)
+                     for uid, (mtime, path) in self.folders.items())
+            if n is None:
+                ranked = sorted(items, reverse=True)
+            else:
+                ranked = heapq.nlargest(n, items)
+            self._ranked[n] = ranked
+        return ranked
+
+
+class _CacheRoot:
+    """One cache root: its snapshot, optional lister thread and health."""
+
+    def __init__(self, path, threaded):
+        self.path = path
+        self.prefix = os.path.join(os.path.abspath(path), "")
+        self.snapshot = _CacheSnapshot(path)
+        self.executor = (ThreadPoolExecutor(max_workers=1, thread_name_prefix="root")
+                         if threaded else None)
+        self.listing = None     # in-flight scan on the lister thread
+        self.healthy = True     # last listing succeeded in time
+        self.slow_until = 0.0   # skipped for probing until then
+        self.stats = {"listings": 0, "failures": 0, "timeouts": 0,
+                      "list_ms": 0.0, "list_ms_max": 0.0,
+                      "probes": 0, "probe_ms": 0.0, "probe_ms_max": 0.0,
+                      "slow": 0}
+
+    def timed_scan(self):
+        t0 = time.perf_counter()
+        current = self.snapshot.scan()
+        return current, time.perf_counter() - t0
+
+
+class _CacheRoots:
+    """Snapshot over one or more cache roots, ranked as a single cache.
+
+    Same interface as :class:`_CacheSnapshot` (``folders``, :meth:`refresh`,
+    :meth:`top`).  Each root is listed independently — with *threaded*, on
+    its own thread, and a listing that takes longer than *list_timeout* is
+    left running while the root's previous snapshot stands in.  Roots
+    whose listing failed or timed out, or whose last header probe took
+    longer than *slow_probe* seconds (for *cooldown* seconds), drop out of
+    :meth:`top`, so a slow or unreachable root can't hold up a lock on a
+    fast one.  A uid present under several roots ranks by its newest copy.
+    """
+
+    def __init__(self, paths, *, threaded=False, list_timeout=0.5,
+                 slow_probe=1.0, cooldown=30.0, clock=time.monotonic):
+        self.paths = list(paths)
+        self.roots = [_CacheRoot(path, threaded) for path in self.paths]
+        self.list_timeout = list_timeout
+        self.slow_probe = slow_probe
+        self.cooldown = cooldown
+        self.clock = clock
+        self.folders = {}  # uid -> (mtime_ns, path), newest copy across roots
+        self._ranked = {}  # (n, usable roots) -> ranking, valid until a change
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.folders)
+
+    def refresh(self):
+        """Rescan every root; return the merged delta like :class:`_CacheSnapshot`.
+
+        Returns *None* only if no root could be listed.
+        """
+        if not self._list_roots():
+            return None
+        current = {}
+        for root in self.roots:
+            for uid, entry in root.snapshot.folders.items():
+                if uid not in current or entry[0] > current[uid][0]:
+                    current[uid] = entry
+
+        previous = self.folders
+        added = current.keys() - previous.keys()
+        removed = previous.keys() - current.keys()
+        touched = {uid for uid in current.keys() & previous.keys()
+                   if current[uid] != previous[uid]}
+        self.folders = current
+        if added or removed or touched:
+            self._ranked = {}
+        return added, removed, touched
+
+    def _list_roots(self):
+        threaded = [root for root in self.roots if root.executor is not None]
+        for root in threaded:
+            if root.listing is None:
+                root.listing = root.executor.submit(root.timed_scan)
+        if threaded:
+            wait([root.listing for root in threaded], timeout=self.list_timeout)
+
+        listed = 0
+        for root in self.roots:
+            if root.executor is None:
+                current, seconds = root.timed_scan()
+            elif root.listing.done():
+                current, seconds = root.listing.result()
+                root.listing = None
+            else:
+                root.stats["timeouts"] += 1
+                self._set_health(root, False, "listing timed out")
+                continue
+            stats = root.stats
+            stats["list_ms"] = round(seconds * 1000, 1)
+            stats["list_ms_max"] = max(stats["list_ms_max"], stats["list_ms"])
+            if current is None:
+                stats["failures"] += 1
+                self._set_health(root, False, "can't be listed")
+                continue
+            stats["listings"] += 1
+            root.snapshot.apply(current)
+            self._set_health(root, True)
+            listed += 1
+        return listed
+
+    def _set_health(self, root, healthy, reason=""):
+        if root.healthy != healthy:
+            if healthy:
+                log.info("Cache root %s is back", root.path)
+            else:
+                log.warning("Cache root %s %s — skipping it", root.path, reason)
+            root.healthy = healthy
+
+    def top(self, n=None):
+        """Up to *n* ``(mtime_ns, uid, path)`` from usable roots, newest first."""
+        now = self.clock()
+        usable = tuple(i for i, root in enumerate(self.roots)
+                       if root.healthy and root.slow_until <= now)
+        key = (n, usable)
+        ranked = self._ranked.get(key)
+        if ranked is None:
+            if len(self.roots) == 1:
+                ranked = self.roots[0].snapshot.top(n) if usable else []
+            else:
+                ranked = []
+                seen = set()
+                streams = [self.roots[i].snapshot.top(n) for i in usable]
+                for item in heapq.merge(*streams, reverse=True):
+                    if item[1] in seen:
+                        continue
+                    seen.add(item[1])
+                    ranked.append(item)
+                    if n is not None and len(ranked) >= n:
+                        break
+            self._ranked[key] = ranked
+        return ranked
+
+    def usable(self, path):
+        """False if *path* lies under a root that is currently skipped."""
+        root = self._root_of(path)
+        return root is None or (root.healthy and root.slow_until <= self.clock())
+
+    def record_probe(self, folder, seconds):
+        """Account one folder header parse to its root (any thread)."""
+        root = self._root_of(folder)
+        if root is None:
+            return
+        with self._lock:
+            stats = root.stats
+            stats["probes"] += 1
+            ms = seconds * 1000
+            stats["probe_ms"] += ms
+            stats["probe_ms_max"] = max(stats["probe_ms_max"], round(ms, 1))
+            if seconds > self.slow_probe and len(self.roots) > 1:
+                stats["slow"] += 1
+                root.slow_until = self.clock() + self.cooldown
+                log.warning("Cache root %s slow (%.1f s header read) — "
+                            "skipping it for %.0f s", root.path, seconds,
+                            self.cooldown)
+
+    def _root_of(self, path):
+        path = os.path.abspath(path)
+        for root in self.roots:
+            if path.startswith(root.prefix):
+                return root
+        return None
+
+    def stats(self):
+        """Per-root health and listing/probe latency."""
+        now = self.clock()
+        out = {}
+        with self._lock:
+            for root in self.roots:
+                stats = dict(root.stats)
+                probes = stats.pop("probe_ms")
+                stats["probe_ms_mean"] = round(probes / stats["probes"], 1) \
+                    if stats["probes"] else 0.0
+                stats["healthy"] = root.healthy and root.slow_until <= now
+                stats["folders"] = len(root.snapshot)
+                out[root.path] = stats
+        return out
+
+    def close(self):
+        for root in self.roots:
+            if root.executor is not None:
+                root.executor.shutdown(wait=False, cancel_futures=True)
+
+
+# ======================================================================
+# Header memo — parsed folder headers keyed by (path, mtime_ns)
+# ======================================================================
+
+# Marker for folders that were probed but held no usable DICOM header
+_NO_HEADER = object()
+
+
+class _HeaderMemo:
+    """Bounded LRU memo of folder header parses.
+
+    Keyed by ``(folder_path, mtime_ns)`` so a folder is only re-parsed when
+    InteleViewer changes it.  Values are :class:`StudyRecord` (immutable, so
+    shared with callers) or :data:`_NO_HEADER`.
+
+    A study folder's mtime does not change when files land in an existing
+    series subfolder, so :data:`_NO_HEADER` entries expire after
+    *negative_ttl* seconds and the folder is probed again.
+    """
+
+    def __init__(self, max_entries=2000, negative_ttl=10.0, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.negative_ttl = negative_ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (value, stored_at)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, folder, mtime_ns):
+        """Return the memoised value, or *None* on a miss."""
+        key = (folder, mtime_ns)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is _NO_HEADER \
+                    and self.clock() - entry[1] > self.negative_ttl:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, folder, mtime_ns, data):
+        key = (folder, mtime_ns)
+        value = StudyRecord.from_fields(data) if data else _NO_HEADER
+        with self._lock:
+            self._entries[key] = (value, self.clock())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions, "size": len(self._entries)}
 
 
 # ======================================================================
@@ -60,29 +545,130 @@ class DicomMonitor:
     """Core DICOM monitoring logic."""
 
     def __init__(self, *, cache_dir, data_dir, search_timeout=120,
-                 cache_size=5, max_scan_folders=50):
-        self.cache_dir = cache_dir
+                 cache_size=5, cache_max_bytes=4 * 1024 * 1024,
+                 cache_ttl=12 * 3600.0, max_scan_folders=50, index=None,
+                 header_memo_size=2000, probe_workers=1, max_open_files=2,
+                 search_depths=None, depth_step=4.0, full_sweep_max=500,
+                 full_sweep_lead=10.0, max_targets=3, speculate_max=2,
+                 speculate_depth=None, io_governor=None, root_threads=None,
+                 root_list_timeout=0.5, root_slow_probe=1.0,
+                 clock=time.monotonic, wall_clock=time.time, spec_executor=None,
+                 psone_log_path=""):
+        # One cache root or several (e.g. local cache plus a network cache);
+        # cache_dir stays the first for single-root callers
+        self.cache_dirs = ([cache_dir] if isinstance(cache_dir, (str, os.PathLike))
+                           else list(cache_dir))
+        self.cache_dir = self.cache_dirs[0]
         self.data_dir = data_dir
         self.state_file = os.path.join(data_dir, "current_study.json")
         self.search_timeout = search_timeout
         self.cache_size = cache_size
         self.max_scan_folders = max_scan_folders
+        # Injectable for trace replay (see bench/replay_trace); defaults are
+        # live.  wall_clock is compared with file mtimes and written to the
+        # state file; clock times everything else.
+        self.clock = clock
+        self.wall_clock = wall_clock
+        self.psone_log_path = psone_log_path
+
+        # Iterative deepening: scan only the newest few folders at first and
+        # widen every depth_step seconds; one bounded full sweep runs
+        # full_sweep_lead seconds before the search times out.
+        self.search_depths = sorted(search_depths or _default_depths(max_scan_folders))
+        self.depth_step = depth_step
+        self.full_sweep_max = full_sweep_max
+        self.full_sweep_lead = full_sweep_lead
+        self.depth_stats = {}  # depth label -> {"locks", "total", "max"}
 
         # Search state
         self.search_active = False
         self.search_start = 0.0
+        self._swept = False
         self.search_target_acc = ""
         self.current_locked_acc = ""
 
-        # PSOne log state
-        self._last_psone_mtime = 0.0
-
-        # LRU cache: accession -> parsed dict
-        self._cache = OrderedDict()
+        # Earlier accessions still unresolved when a newer one arrived
+        # (comparisons, split accessions): core accession -> search start.
+        # They ride along on the current target's folder sweep and land in
+        # the LRU cache; at most max_targets - 1, each with its own deadline.
+        self.max_targets = max(1, max_targets)
+        self._pending = OrderedDict()
+
+        # PSOne log state (incremental reader, created on first poll)
+        self._psone_tail = None
+        # Epoch of the last reset_state: an accession re-reported after a
+        # reset was triggered by the reset, not by the (older) log write
+        self._reset_time = 0.0
+
+        # LRU cache: core accession -> StudyRecord, bounded by count, bytes
+        # and age (see study_cache).  _cache_lock serialises compound
+        # updates from prefetch and speculation threads.
+        self._cache = StudyCache(cache_size, max_bytes=cache_max_bytes,
+                                 ttl=cache_ttl, clock=clock)
+        self._cache_lock = threading.RLock()
+
+        # Parallel folder probing (probe_workers > 1).  Open DICOM files are
+        # capped separately so a wide pool can't starve InteleViewer's I/O.
+        self.probe_workers = max(1, probe_workers)
+        self._executor = None
+        self._file_slots = threading.BoundedSemaphore(max(1, max_open_files))
+
+        # Optional file/byte budget shared by every probe (see io_governor)
+        self.io_governor = io_governor
+
+        # Name-triggered speculative lookup (see speculate): one background
+        # thread unless spec_executor is given (replay runs it inline);
+        # bumping _spec_gen cancels whatever it is doing
+        self.speculate_max = max(0, speculate_max)
+        self.speculate_depth = speculate_depth or max_scan_folders
+        self._spec_executor = spec_executor
+        self._spec_future = None
+        self._spec_gen = 0
+        self._speculated = set()  # accessions cached for the current patient
+
+        # Header probe accounting (see _probe)
+        self.probe_stats = {"probes": 0, "rejected": 0, "bytes": 0, "seconds": 0.0}
+        self._stats_lock = threading.Lock()
+
+        # Search-funnel counters and histograms (see search_metrics)
+        self.metrics = SearchMetrics(clock=clock)
+        self.metrics.info.update(cache_size=cache_size,
+                                 max_scan_folders=max_scan_folders,
+                                 search_timeout=search_timeout,
+                                 max_targets=self.max_targets,
+                                 probe_workers=self.probe_workers)
+
+        # Parsed folder headers, so repeated ticks only parse new/changed folders
+        self._memo = _HeaderMemo(header_memo_size, clock=clock)
+
+        # Persistent accession -> study-folder index (optional, see study_index)
+        self.index = index
+        self._unindexable = {}  # uid -> mtime_ns of folders with no usable header
+        self._index_backlog = set()  # uids new or changed since last indexed
+
+        # Study folders under the cache roots, refreshed tick to tick.  With
+        # several roots each is listed on its own thread by default.
+        self.root_threads = (len(self.cache_dirs) > 1 if root_threads is None
+                             else bool(root_threads))
+        self.root_list_timeout = root_list_timeout
+        self.root_slow_probe = root_slow_probe
+        self._snapshot = None
+        self._snapshot_primed = False
 
         # Reference to the window monitor (set by main loop)
         self.window_monitor = None
 
+        # Optional push channel for state changes (set by main loop)
+        self.state_channel = None
+
+        # State-file writes: last fields written (None = nothing yet, so the
+        # first write always lands) and the generation counter
+        self._last_state = None
+        self._state_gen = None
+        self.state_writes = 0
+        self.state_writes_skipped = 0
+        self._started = clock()
+
     # ------------------------------------------------------------------
     # PSOne log change (called by watchdog handler AND by fallback poll)
     # ------------------------------------------------------------------
@@ -93,67 +679,207 @@ class DicomMonitor:
         if self.window_monitor and not self.window_monitor.last_patient_title:
             return
 
-        log_path = _psone_log_path()
-        if not log_path or not os.path.isfile(log_path):
-            return
-
-        try:
-            mtime = os.path.getmtime(log_path)
-        except OSError:
-            return
-
-        if mtime == self._last_psone_mtime:
+        log_path = self.psone_log_path or _psone_log_path()
+        if not log_path:
             return
-        self._last_psone_mtime = mtime
+        if self._psone_tail is None or self._psone_tail.path != log_path:
+            self._psone_tail = _PSOneLogTail(log_path)
 
-        acc = self._parse_psone_log(log_path)
+        # None = file missing or unchanged since the last poll
+        acc = self._psone_tail.poll()
         if acc and acc != self.search_target_acc and acc != self.current_locked_acc:
-            self._start_search(acc)
+            # Delay since PowerScribe wrote the line (watchdog or fallback
+            # poll), or since the reset that made it count again
+            since = max(self._psone_tail.mtime_ns / 1e9, self._reset_time)
+            trigger = self.wall_clock() - since
+            self._start_search(acc, trigger)
 
     # ------------------------------------------------------------------
     # Search lifecycle
     # ------------------------------------------------------------------
 
-    def _start_search(self, accession):
+    def _start_search(self, accession, trigger_seconds=None):
         log.info("Starting DICOM search for %s", accession)
+        if self.search_active and self.search_target_acc != accession:
+            self._defer_target(self.search_target_acc, self.search_start)
+        self._pending.pop(accession, None)
+        if self.io_governor is not None:
+            self.io_governor.set_foreground(True)
+        self.metrics.search_started(trigger_seconds)
         self.search_active = True
-        self.search_start = time.monotonic()
+        self.search_start = self.clock()
+        self._swept = False
         self.search_target_acc = accession
         self.current_locked_acc = ""
         self._write_state({})
 
     def continue_search(self):
-        """Called from the main loop every timer tick while a search is active."""
-        if not self.search_active:
-            return
+        """Called from the main loop every tick while a search or deferred target is active.
 
-        elapsed = time.monotonic() - self.search_start
-        if elapsed > self.search_timeout:
-            log.warning("Search timed out for %s (%.1f s)",
-                        self.search_target_acc, elapsed)
-            self._stop_search()
-            return
+        Deferred targets (see :meth:`_defer_target`) are looked up by the
+        same folder sweep, which goes as deep as the deepest of them needs.
+        """
+        pending_depth = self._update_pending()
+        if self.search_active:
+            elapsed = self.clock() - self.search_start
+            if elapsed > self.search_timeout:
+                log.warning("Search timed out for %s (%.1f s)",
+                            self.search_target_acc, elapsed)
+                self.metrics.search_ended("timeout", elapsed)
+                self._stop_search()
+            else:
+                depth, label = self._search_depth(elapsed)
+                result = self._try_match(self.search_target_acc,
+                                         max(depth, pending_depth))
+                if result is None:
+                    # No match: the sweep covered the deferred targets too
+                    if pending_depth:
+                        self._update_pending()
+                    return
+                source = result.get("_source", "?")
+                # Cache/index hits don't depend on the scan depth
+                depth_label = label if source == "recent_folders" else source
+                log.info("DICOM lock for %s (%.1f s, source=%s, depth=%s)",
+                         self.search_target_acc, elapsed, source, depth_label)
+                self._record_lock_latency(depth_label, elapsed)
+                self.metrics.search_ended("lock", elapsed, source)
+                self.current_locked_acc = self.search_target_acc
+                self._write_state(result)
+                self._stop_search()
+
+        if pending_depth:
+            # Nothing current, or it locked before the sweep reached the
+            # deferred targets: finish it for them (folders already read
+            # this tick are header-memo hits)
+            self._find_in_recent_folders("", pending_depth)
+            self._update_pending()
+
+    def _search_depth(self, elapsed):
+        """Return ``(folders to scan, depth label)`` for a search *elapsed* s old."""
+        if not self._swept and elapsed >= self.search_timeout - self.full_sweep_lead:
+            self._swept = True
+            log.debug("Full sweep for %s (up to %d folders)",
+                      self.search_target_acc, self.full_sweep_max)
+            return self.full_sweep_max, "sweep"
+        depth = self._deepening(elapsed)
+        return depth, str(depth)
+
+    def _deepening(self, elapsed):
+        step = int(elapsed // self.depth_step) if self.depth_step > 0 else len(self.search_depths)
+        return self.search_depths[min(step, len(self.search_depths) - 1)]
+
+    def _record_lock_latency(self, label, elapsed):
+        stats = self.depth_stats.setdefault(label, {"locks": 0, "total": 0.0, "max": 0.0})
+        stats["locks"] += 1
+        stats["total"] += elapsed
+        stats["max"] = max(stats["max"], elapsed)
+        log.debug("Lock latency by depth: %s", ", ".join(
+            f"{k}: n={v['locks']} mean={v['total'] / v['locks']:.2f}s max={v['max']:.2f}s"
+            for k, v in sorted(self.depth_stats.items())))
 
-        result = self._try_match(self.search_target_acc)
-        if result is not None:
-            log.info("DICOM lock for %s (%.1f s, source=%s)",
-                     self.search_target_acc, elapsed, result.get("_source", "?"))
-            self.current_locked_acc = self.search_target_acc
-            self._write_state(result)
-            self._stop_search()
+    # ------------------------------------------------------------------
+    # Deferred targets
+    # ------------------------------------------------------------------
+
+    @property
+    def pending_targets(self):
+        """Deferred accessions still being looked up, oldest first."""
+        return list(self._pending)
+
+    def _defer_target(self, accession, started):
+        """Keep looking for *accession* after a newer one took over."""
+        self._pending[accession] = started
+        self._pending.move_to_end(accession)
+        self.metrics.incr("targets_deferred")
+        while len(self._pending) >= self.max_targets:
+            dropped, _ = self._pending.popitem(last=False)
+            self.metrics.incr("targets_dropped")
+            log.debug("Dropped deferred target %s", dropped)
+
+    def _pending_cached(self):
+        """True once every deferred target is in the LRU cache."""
+        with self._cache_lock:
+            return all(acc in self._cache for acc in self._pending)
+
+    def _update_pending(self):
+        """Settle deferred targets; return the sweep depth the rest need.
+
+        Targets in the LRU cache (from an earlier sweep, the index or
+        prefetch) are done and expired ones are dropped.  Returns 0 when
+        nothing is pending.
+        """
+        now = self.clock()
+        depth = 0
+        for acc, started in list(self._pending.items()):
+            with self._cache_lock:
+                cached = acc in self._cache
+            if not cached:
+                data = self._find_in_index(acc)
+                if data is not None:
+                    self._add_to_cache(acc, data)
+                    cached = True
+            if cached:
+                del self._pending[acc]
+                self.metrics.incr("targets_resolved")
+                log.info("Deferred target %s cached (%.1f s)", acc, now - started)
+            elif now - started > self.search_timeout:
+                del self._pending[acc]
+                self.metrics.incr("targets_expired")
+                log.info("Deferred target %s timed out", acc)
+            else:
+                depth = max(depth, self._deepening(now - started))
+        return depth
 
     def _stop_search(self):
         self.search_active = False
         self.search_start = 0.0
+        if self.io_governor is not None:
+            self.io_governor.set_foreground(False)
+        log.debug("Header memo: %s", self._memo.stats())
+        log.debug("Header probes: %s", self.probe_stats)
+
+    def force_search(self, accession):
+        """Start a search for *accession* on request (see control_api).
+
+        Returns the core accession searched for, or ``""`` if *accession*
+        isn't usable.
+        """
+        core = _extract_core_acc(accession.strip())
+        if not core:
+            return ""
+        if core != self.current_locked_acc:
+            self._start_search(core)
+        return core
+
+    def status(self):
+        """Search state for the control API (no patient names; main loop only)."""
+        return {
+            "search_active": self.search_active,
+            "search_target": self.search_target_acc,
+            "search_elapsed_s": (round(self.clock() - self.search_start, 1)
+                                 if self.search_active else 0.0),
+            "locked": self.current_locked_acc,
+            "pending_targets": self.pending_targets,
+            "cache": self.cache_stats(),
+        }
 
     def reset_state(self, reason):
         """Clear all search/lock state and empty the state file."""
         was_active = self.search_active or self.current_locked_acc
+        if self.search_active:
+            self.metrics.search_ended("abandoned")
         self.search_active = False
         self.search_start = 0.0
+        if self.io_governor is not None:
+            self.io_governor.set_foreground(False)
         self.search_target_acc = ""
         self.current_locked_acc = ""
-        self._last_psone_mtime = 0.0
+        if self._pending:
+            self.metrics.incr("targets_dropped", len(self._pending))
+            self._pending.clear()
+        if self._psone_tail is not None:
+            self._psone_tail.forget_change()
+        self._reset_time = self.wall_clock()
         self._write_state({})
         if was_active:
             log.info("State reset (%s)", reason)
@@ -162,9 +888,10 @@ class DicomMonitor:
     # DICOM matching
     # ------------------------------------------------------------------
 
-    def _try_match(self, target_acc):
+    def _try_match(self, target_acc, depth=None):
         """Try to find a DICOM study matching *target_acc*.
 
+        *depth* limits the recent-folder scan (default ``max_scan_folders``).
         Returns a demographics dict on success, or *None*.
         """
         window_patient = ""
@@ -173,37 +900,133 @@ class DicomMonitor:
         window_last = _extract_last_name(window_patient)
 
         # 1) Check LRU cache
-        if target_acc in self._cache:
-            data = self._cache[target_acc]
-            dicom_last = _extract_last_name(data.get("_Name", ""))
-            if not window_last or window_last.upper() in (data.get("_Name", "")).upper():
-                # Move to end (most recently used)
-                self._cache.move_to_end(target_acc)
+        record = self._cache.get(target_acc)
+        if record is not None:
+            self.metrics.incr("cache_hits")
+            if target_acc in self._speculated:
+                self.metrics.incr("speculative_hits")
+            if not window_last or window_last.upper() in record.name.upper():
                 log.debug("Cache hit for %s", target_acc)
-                data["_source"] = "cache"
-                return data
+                return record.with_source("cache")
             else:
                 log.warning("Cache hit but name mismatch: dicom=%s window=%s",
-                            data.get("_Name", ""), window_patient)
+                            record.name, window_patient)
+                self.metrics.incr("name_mismatch")
                 return None
+        self.metrics.incr("cache_misses")
 
-        # 2) Scan recent folders
-        data = self._find_in_recent_folders(target_acc)
+        # 2) Persistent index, then 3) scan recent folders
+        data = self._find_in_index(target_acc)
+        if data is None:
+            data = self._find_in_recent_folders(target_acc, depth)
         if data is None:
             return None
 
-        dicom_last = _extract_last_name(data.get("_Name", ""))
-        self._add_to_cache(target_acc, data)
-
-        if not window_last or window_last.upper() in (data.get("_Name", "")).upper():
-            data["_source"] = "recent_folders"
-            return data
+        record = self._add_to_cache(target_acc, data)
+        if not window_last or window_last.upper() in record.name.upper():
+            return record.with_source(data.get("_source") or "recent_folders")
 
         log.warning("Accession match but name mismatch: dicom=%s window=%s",
-                    data.get("_Name", ""), window_patient)
+                    record.name, window_patient)
+        self.metrics.incr("name_mismatch")
         return None
 
-    def _find_in_recent_folders(self, target_acc):
+    def _find_in_index(self, target_acc):
+        """Resolve *target_acc* through the persistent study index.
+
+        The indexed folder is re-parsed once to confirm the accession (and to
+        get the patient name, which the index never stores).  Stale entries
+        are dropped so the caller falls back to a folder scan.
+        """
+        if self.index is None:
+            return None
+        uid = self.index.lookup(target_acc)
+        if not uid:
+            self.metrics.incr("index_misses")
+            return None
+
+        folder, mtime_ns = self._locate_folder(uid)
+        if folder is None:
+            self.index.forget(uid)
+            return None
+
+        data = self._read_folder_header(folder, mtime_ns)
+        if not data:
+            self.index.forget(uid)
+            return None
+        core = _extract_core_acc(data.get("Acc", ""))
+        self.index.record(uid, mtime_ns, core, data)
+        if core != target_acc or data.get("_Name", "") == "Unknown":
+            return None
+
+        self.metrics.incr("index_hits")
+        log.debug("Index hit for %s", target_acc)
+        return data.with_source("index")
+
+    def _locate_folder(self, uid):
+        """Return ``(path, mtime_ns)`` of study folder *uid*, or ``(None, 0)``.
+
+        Known folders resolve through the snapshot; otherwise each usable
+        root is tried in order.
+        """
+        entry = self._snapshot.folders.get(uid) if self._snapshot else None
+        if entry is not None:
+            paths = [entry[1]]
+        else:
+            paths = [os.path.join(root, uid) for root in self.cache_dirs]
+        for folder in paths:
+            if self._snapshot is not None and not self._snapshot.usable(folder):
+                continue
+            try:
+                return folder, os.stat(folder).st_mtime_ns
+            except OSError:
+                continue
+        return None, 0
+
+    def _refresh_snapshot(self):
+        """Refresh the cache snapshot and apply its delta to the index.
+
+        Returns ``(added, removed, touched)`` or *None* if the cache
+        directory can't be listed (with several roots: none of them can).
+        """
+        if self._snapshot is None or self._snapshot.paths != self.cache_dirs:
+            if self._snapshot is not None:
+                self._snapshot.close()
+            self._snapshot = _CacheRoots(
+                self.cache_dirs, threaded=self.root_threads,
+                list_timeout=self.root_list_timeout,
+                slow_probe=self.root_slow_probe, clock=self.clock)
+            self._snapshot_primed = False
+        delta = self._snapshot.refresh()
+        if delta is None:
+            return None
+        self.metrics.incr("listings")
+        self.metrics.incr("folders_listed", len(self._snapshot))
+
+        added, removed, touched = delta
+        if not self._snapshot_primed:
+            # Everything is new to us; update_index skips what's already current
+            self._snapshot_primed = True
+            self._index_backlog = set(self._snapshot.folders)
+            if self.index is not None:
+                pruned = self.index.prune(self._snapshot.folders)
+                if pruned:
+                    log.debug("Pruned %d vanished folders from study index", pruned)
+            return delta
+
+        for uid in removed:
+            self._unindexable.pop(uid, None)
+            self._index_backlog.discard(uid)
+            if self.index is not None:
+                self.index.forget(uid)
+        self._index_backlog |= added | touched
+
+        if added or removed or touched:
+            log.debug("Cache delta: +%d -%d ~%d (%d folders)",
+                      len(added), len(removed), len(touched), len(self._snapshot))
+        return delta
+
+    def _find_in_recent_folders(self, target_acc, limit=None):
         """Scan the top N most-recently-modified study folders in the DICOM cache.
 
         InteleViewer stores studies as UID-named folders directly under the
@@ -216,72 +1039,344 @@ class DicomMonitor:
         Only UID-named folders (starting with a digit) are considered.
         Named directories like ``InteleViewerDicomSpool`` are skipped.
         One DICOM file per folder is enough since all files in a study
-        share the same accession.
+        share the same accession.  Folders already in the study index with
+        an unchanged mtime hold some other accession and are skipped.
+
+        *limit* overrides N (``max_scan_folders``); see :meth:`_search_depth`.
+        Deferred targets met on the way are cached (see :meth:`_check_folder`);
+        an empty *target_acc* sweeps for them alone.
         """
-        if not os.path.isdir(self.cache_dir):
+        if self._refresh_snapshot() is None:
             return None
 
-        entries = []  # (mtime, path)
-        try:
-            for child in os.listdir(self.cache_dir):
-                if not _looks_like_uid(child):
-                    continue
-                child_path = os.path.join(self.cache_dir, child)
-                if not os.path.isdir(child_path):
-                    continue
-                try:
-                    entries.append((os.path.getmtime(child_path), child_path))
-                except OSError:
-                    pass
-        except OSError:
-            return None
+        candidates = [
+            (mtime_ns, uid, folder)
+            for mtime_ns, uid, folder in self._snapshot.top(limit or self.max_scan_folders)
+            if self.index is None or not self.index.is_current(uid, mtime_ns)
+        ]
+        if self.probe_workers > 1 and len(candidates) > 1:
+            return self._probe_parallel(candidates, target_acc)
+
+        for mtime_ns, uid, folder in candidates:
+            data = self._check_folder(mtime_ns, uid, folder, target_acc)
+            if data is not None:
+                return data
+            if not target_acc and self._pending_cached():
+                break
 
-        entries.sort(reverse=True)
-        entries = entries[:self.max_scan_folders]
+        return None
+
+    def _check_folder(self, mtime_ns, uid, folder, target_acc):
+        """Read *folder*'s header; return it if its core accession matches."""
+        data = self._read_folder_header(folder, mtime_ns)
+        if data and data.get("_Name", "") != "Unknown":
+            dicom_acc = _extract_core_acc(data.get("Acc", ""))
+            if self.index is not None:
+                self.index.record(uid, mtime_ns, dicom_acc, data)
+            # target_acc is "" on a deferred-only sweep: nothing matches it
+            if target_acc and dicom_acc == target_acc:
+                return data
+            if dicom_acc in self._pending:
+                # Shared sweep: a deferred target; _update_pending settles it
+                self._add_to_cache(dicom_acc, data)
+        return None
 
-        for _, folder in entries:
-            data = self._parse_first_dicom_in_folder(folder)
+    def _probe_parallel(self, candidates, target_acc):
+        """Probe *candidates* on the worker pool; same result as the serial scan.
+
+        Folders are submitted newest first and results are consumed in that
+        order, so the match returned is the first one the serial loop would
+        have found.  Once a folder matches, every later-ranked task that
+        hasn't started is skipped and the rest are cancelled.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.probe_workers, thread_name_prefix="probe")
+
+        best = [len(candidates)]  # rank of the earliest match so far
+        best_lock = threading.Lock()
+
+        def _task(rank, candidate):
+            with best_lock:
+                if rank > best[0]:
+                    return None
+            data = self._check_folder(*candidate, target_acc)
+            if data is not None:
+                with best_lock:
+                    best[0] = min(best[0], rank)
+            return data
+
+        futures = [self._executor.submit(_task, rank, c)
+                   for rank, c in enumerate(candidates)]
+        result = None
+        for rank, fut in enumerate(futures):
+            try:
+                result = fut.result()
+            except Exception:
+                log.exception("Folder probe failed")
+                result = None
+            if result is not None:
+                for later in futures[rank + 1:]:
+                    later.cancel()
+                break
+        return result
+
+    def root_stats(self):
+        """Per-root health and listing/probe latency (empty before the first scan)."""
+        return self._snapshot.stats() if self._snapshot is not None else {}
+
+    def close(self):
+        """Shut down the probe, speculation and root lister threads."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._spec_gen += 1
+        if self._spec_executor is not None:
+            self._spec_executor.shutdown(wait=False, cancel_futures=True)
+            self._spec_executor = None
+        if self._snapshot is not None:
+            self._snapshot.close()
+
+    # ------------------------------------------------------------------
+    # Speculative lookup by patient name
+    # ------------------------------------------------------------------
+
+    def speculate(self, title):
+        """Pre-cache recent studies of the patient in window *title*.
+
+        Called when the InteleViewer patient title changes, usually seconds
+        before PowerScribe logs the accession.  The newest
+        ``speculate_depth`` folders are read on a background thread and up
+        to ``speculate_max`` studies whose patient last name matches are
+        added to the LRU cache, so the later search is a cache hit.
+
+        Any earlier speculation is cancelled; an empty *title* only cancels.
+        Nothing derived from the name is logged or written to the state
+        file.  Returns the background future, or *None*.
+        """
+        self._spec_gen += 1
+        gen = self._spec_gen
+        with self._cache_lock:
+            self._speculated.clear()
+        last = _extract_last_name(title).strip().upper()
+        if not last or not self.speculate_max:
+            return None
+        if self._refresh_snapshot() is None:
+            return None
+
+        # Snapshot is main-thread state; hand the worker a plain list
+        candidates = list(self._snapshot.top(self.speculate_depth))
+        if self._spec_executor is None:
+            self._spec_executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="speculate")
+        self.metrics.incr("speculative_runs")
+        self._spec_future = self._spec_executor.submit(
+            self._speculate, gen, last, candidates)
+        return self._spec_future
+
+    def _speculate(self, gen, last, candidates):
+        """Worker: cache studies in *candidates* whose last name is *last*."""
+        with self._background_io():
+            return self._speculate_folders(gen, last, candidates)
+
+    def _speculate_folders(self, gen, last, candidates):
+        t0 = self.clock()
+        read = cached = 0
+        for mtime_ns, uid, folder in candidates:
+            if gen != self._spec_gen:
+                self.metrics.incr("speculative_cancelled")
+                log.debug("Speculative lookup cancelled after %d folders", read)
+                return cached
+            read += 1
+            try:
+                data = self._read_folder_header(folder, mtime_ns)
+            except Exception:
+                log.exception("Speculative probe failed")
+                continue
+            if not data or data.get("_Name", "") == "Unknown":
+                continue
+            core = _extract_core_acc(data.get("Acc", ""))
+            if self.index is not None:
+                self.index.record(uid, mtime_ns, core, data)
+            if not core or _extract_last_name(data["_Name"]).strip().upper() != last:
+                continue
+            with self._cache_lock:
+                if gen != self._spec_gen:
+                    continue  # cancelled; caught at the top of the loop
+                self._add_to_cache(core, data)
+                self._speculated.add(core)
+            cached += 1
+            if cached >= self.speculate_max:
+                break
+        self.metrics.incr("speculative_cached", cached)
+        log.debug("Speculative lookup: %d cached from %d folders (%.2f s)",
+                  cached, read, self.clock() - t0)
+        return cached
+
+    def update_index(self, batch=10):
+        """Index up to *batch* new or changed study folders (newest first).
+
+        Called from the main loop while no search is active, so the index
+        converges on the whole cache over time without a startup crawl.
+        Only folders added or touched since they were last looked at are
+        considered; vanished folders are pruned by :meth:`_refresh_snapshot`.
+        """
+        if self.index is None or self.search_active:
+            return 0
+        if self._refresh_snapshot() is None:
+            return 0
+
+        folders = self._snapshot.folders
+        pending = []
+        for uid in list(self._index_backlog):
+            mtime_ns = folders[uid][0]
+            if (self.index.is_current(uid, mtime_ns)
+                    or self._unindexable.get(uid) == mtime_ns):
+                self._index_backlog.discard(uid)
+            else:
+                pending.append((mtime_ns, uid))
+
+        indexed = 0
+        for mtime_ns, uid in heapq.nlargest(batch, pending):
+            # Runs on the main loop: stop rather than wait for I/O budget
+            if self.io_governor is not None and not self.io_governor.ready():
+                self.io_governor.skip()
+                break
+            folder = folders[uid][1]
+            if not self._snapshot.usable(folder):
+                continue  # slow or unreachable root: stays in the backlog
+            self._index_backlog.discard(uid)
+            indexed += 1
+            with self._background_io(wait=False):
+                data = self._read_folder_header(folder, mtime_ns)
             if data and data.get("_Name", "") != "Unknown":
-                dicom_acc = _extract_core_acc(data.get("Acc", ""))
-                if dicom_acc == target_acc:
-                    return data
+                self.index.record(uid, mtime_ns,
+                                  _extract_core_acc(data.get("Acc", "")), data)
+                self._unindexable.pop(uid, None)
+            else:
+                self._unindexable[uid] = mtime_ns
+        return indexed
 
-        return None
+    def prefetch_folder(self, folder):
+        """Parse a newly written study *folder* straight into the LRU cache.
+
+        Called from prefetch worker threads (see :mod:`study_prefetch`) so
+        the study is already cached when PowerScribe logs its accession.
+        Returns the core accession cached, or ``""``.
+        """
+        try:
+            mtime_ns = os.stat(folder).st_mtime_ns
+        except OSError:
+            return ""
+        with self._background_io():
+            data = self._read_folder_header(folder, mtime_ns, fresh=True)
+        if not data or data.get("_Name", "") == "Unknown":
+            return ""
+        core = _extract_core_acc(data.get("Acc", ""))
+        if not core:
+            return ""
+        if self.index is not None:
+            self.index.record(os.path.basename(folder), mtime_ns, core, data)
+        self._add_to_cache(core, data)
+        return core
+
+    def _read_folder_header(self, folder, mtime_ns, fresh=False):
+        """Return the header fields for *folder*, parsing only on a memo miss.
+
+        *fresh* skips the memo lookup (the result is still memoised).
+        """
+        if not fresh:
+            data = self._memo.get(folder, mtime_ns)
+            if data is not None:
+                return None if data is _NO_HEADER else data
+        self.metrics.incr("folders_probed")
+        t0 = time.perf_counter()
+        data = self._parse_first_dicom_in_folder(folder)
+        if self._snapshot is not None:
+            self._snapshot.record_probe(folder, time.perf_counter() - t0)
+        record = StudyRecord.from_fields(data) if data else None
+        self._memo.put(folder, mtime_ns, record)
+        return record
 
     def _parse_first_dicom_in_folder(self, folder):
-        """Find and parse the first valid DICOM file in *folder* using pydicom."""
+        """Find and parse the first valid DICOM file in *folder* using pydicom.
+
+        Files are walked lazily (``os.scandir``, depth-first) and the walk
+        stops at the first file whose header probe succeeds — see
+        :func:`_probe_dicom_header`.
+        """
         if pydicom is None:
             log.error("pydicom not installed")
             return None
 
-        for root, _dirs, files in os.walk(folder):
-            for fname in files:
-                path = os.path.join(root, fname)
-                try:
-                    if os.path.getsize(path) < 1024:
-                        continue
-                except OSError:
-                    continue
-                try:
-                    ds = pydicom.dcmread(path, stop_before_pixels=True, force=True)
-                except Exception:
+        for entry in _iter_files(folder):
+            try:
+                if entry.stat().st_size < _MIN_DICOM_SIZE:
                     continue
-                return _extract_fields(ds)
+            except OSError:
+                continue
+            data = self._probe(entry.path)
+            if data is not None:
+                return data
 
         return None
 
+    def _probe(self, path):
+        """Probe one file, accounting bytes read and time in probe_stats.
+
+        With an I/O governor the probe first waits for a file token and is
+        charged the bytes it read.
+        """
+        io = self.io_governor
+        if io is not None:
+            io.acquire()
+        with self._file_slots:
+            t0 = time.perf_counter()
+            try:
+                data, nbytes = _probe_dicom_header(path)
+            except OSError:
+                data, nbytes = None, 0
+            elapsed = time.perf_counter() - t0
+        if io is not None:
+            io.charge(nbytes)
+
+        with self._stats_lock:
+            stats = self.probe_stats
+            stats["probes"] += 1
+            stats["bytes"] += nbytes
+            stats["seconds"] += elapsed
+            if data is None:
+                stats["rejected"] += 1
+        self.metrics.probe(nbytes, elapsed)
+        return data
+
+    def _background_io(self, wait=True):
+        """Context for probes that must yield to the active search."""
+        if self.io_governor is None:
+            return contextlib.nullcontext()
+        return self.io_governor.background(wait)
+
     # ------------------------------------------------------------------
     # LRU cache
     # ------------------------------------------------------------------
 
     def _add_to_cache(self, accession, data):
-        if accession in self._cache:
-            self._cache.move_to_end(accession)
-        self._cache[accession] = data
-        while len(self._cache) > self.cache_size:
-            evicted_acc, _ = self._cache.popitem(last=False)
-            log.debug("Evicted %s from cache", evicted_acc)
-        log.debug("Cached %s (size=%d)", accession, len(self._cache))
+        """Cache *data* (a record or fields dict) under *accession*.
+
+        The lookup source isn't part of the cached record.  Returns the
+        record stored.
+        """
+        record = StudyRecord.from_fields(data, source="")
+        with self._cache_lock:
+            for evicted_acc in self._cache.put(accession, record):
+                log.debug("Evicted %s from cache", evicted_acc)
+            log.debug("Cached %s (size=%d)", accession, len(self._cache))
+        return record
+
+    def cache_stats(self):
+        """LRU cache size and hit/miss/eviction counters; drops expired entries."""
+        self._cache.purge_expired()
+        return self._cache.stats()
 
     # ------------------------------------------------------------------
     # PSOne log parsing
@@ -289,35 +1384,11 @@ class DicomMonitor:
 
     @staticmethod
     def _parse_psone_log(log_path):
-        """Read PSOnePerf.log and return the most recent core accession."""
-        try:
-            with open(log_path, encoding="utf-8", errors="replace") as fh:
-                lines = fh.readlines()
-        except OSError:
-            return ""
-
-        for line in reversed(lines):
-            fields = line.split()
-
-            # Try SingleAccession token first
-            for i, tok in enumerate(fields[:-1]):
-                if tok == "SingleAccession":
-                    raw = fields[i + 1]
-                    if raw and raw != "-":
-                        acc = _extract_core_acc(raw)
-                        log.info("PSOne accession: %s (raw=%s, type=SingleAccession)",
-                                 acc, raw)
-                        return acc
-                    break
-
-            # Try accession pattern in any field
-            for tok in fields:
-                if re.match(r"^[A-Z]{2,3}-\d+-[A-Z]{2}$", tok):
-                    acc = _extract_core_acc(tok)
-                    log.info("PSOne accession: %s (type=pattern_match)", acc)
-                    return acc
+        """Read PSOnePerf.log and return the most recent core accession.
 
-        return ""
+        Only the end of the file is read (see :class:`_PSOneLogTail`).
+        """
+        return _PSOneLogTail(log_path).poll() or ""
 
     # ------------------------------------------------------------------
     # State file I/O
@@ -326,10 +1397,13 @@ class DicomMonitor:
     def _write_state(self, data):
         """Write demographics to current_study.json atomically.
 
+        Skipped when the filtered fields equal the last ones written, so
+        repeated resets don't re-trigger every consumer.  Each write carries
+        a ``Gen`` number (increasing across restarts) and a ``Written``
+        epoch timestamp so consumers can drop duplicate or stale events.
+
         PRIVACY: patient name is never written.
         """
-        os.makedirs(self.data_dir, exist_ok=True)
-
         # Filter to only the allowed fields
         out = {}
         for key in ("Acc", "Sex", "Age", "Mod", "StudyDesc"):
@@ -338,17 +1412,53 @@ class DicomMonitor:
                 # Strip control characters
                 out[key] = re.sub(r"[\x00-\x1f]", "", str(val))
 
+        if out == self._last_state:
+            self.state_writes_skipped += 1
+            self.metrics.incr("state_writes_skipped")
+            return False
+
+        os.makedirs(self.data_dir, exist_ok=True)
+        if self._state_gen is None:
+            self._state_gen = _read_state_gen(self.state_file)
+        self._state_gen += 1
+        fields = out
+        out = dict(fields, Gen=self._state_gen, Written=round(self.wall_clock(), 3))
+
         tmp_fd, tmp_path = tempfile.mkstemp(dir=self.data_dir, suffix=".tmp")
         try:
             with os.fdopen(tmp_fd, "w", encoding="utf-8") as fh:
                 json.dump(out, fh)
             os.replace(tmp_path, self.state_file)
+            written = True
         except OSError:
             log.warning("Failed to write state file", exc_info=True)
             try:
                 os.unlink(tmp_path)
             except OSError:
                 pass
+            written = False
+
+        # Publish after the rename, so a subscriber that re-reads the file
+        # on the event never sees the previous study
+        if self.state_channel is not None:
+            self.state_channel.publish(out)
+        if not written:
+            return False
+
+        self._last_state = fields
+        self.state_writes += 1
+        self.metrics.incr("state_writes")
+        return True
+
+    def state_write_stats(self):
+        """State-file writes done and skipped, with the skip rate per hour."""
+        hours = max(self.clock() - self._started, 1.0) / 3600
+        return {
+            "written": self.state_writes,
+            "skipped": self.state_writes_skipped,
+            "skipped_per_hour": round(self.state_writes_skipped / hours, 1),
+            "gen": self._state_gen or 0,
+        }
 
 
 # ======================================================================
@@ -364,6 +1474,45 @@ def _looks_like_uid(name):
     return bool(name) and name[0].isdigit() and "." in name
 
 
+def _read_state_gen(state_file):
+    """Return the ``Gen`` stored in *state_file*, or 0."""
+    try:
+        with open(state_file, encoding="utf-8") as fh:
+            return int(json.load(fh).get("Gen", 0))
+    except (OSError, ValueError, TypeError, AttributeError):
+        return 0
+
+
+def _decode_lines(raw):
+    return raw.decode("utf-8", errors="replace").splitlines()
+
+
+def _accession_from_lines(lines):
+    """Return the most recent core accession in *lines* (scanned in reverse)."""
+    for line in reversed(lines):
+        fields = line.split()
+
+        # Try SingleAccession token first
+        for i, tok in enumerate(fields[:-1]):
+            if tok == "SingleAccession":
+                raw = fields[i + 1]
+                if raw and raw != "-":
+                    acc = _extract_core_acc(raw)
+                    log.info("PSOne accession: %s (raw=%s, type=SingleAccession)",
+                             acc, raw)
+                    return acc
+                break
+
+        # Try accession pattern in any field
+        for tok in fields:
+            if _PSONE_ACC_RE.match(tok):
+                acc = _extract_core_acc(tok)
+                log.info("PSOne accession: %s (type=pattern_match)", acc)
+                return acc
+
+    return ""
+
+
 def _psone_log_path():
     """Derive the PSOnePerf.log path from %USERPROFILE%."""
     profile = os.environ.get("USERPROFILE", "")
@@ -390,6 +1539,64 @@ def _extract_core_acc(acc):
     return re.sub(r"_\d+$", "", acc)
 
 
+def _default_depths(max_scan_folders):
+    """Default deepening schedule: a few folders first, up to 2x the maximum."""
+    top = max(1, max_scan_folders)
+    return sorted({d for d in (5, 10, 25, top, 2 * top) if d <= 2 * top})
+
+
+def _iter_files(folder):
+    """Yield file ``DirEntry``s under *folder*, depth-first and lazily.
+
+    Like ``os.walk`` (a directory's files before its subdirectories) but a
+    consumer that stops early never lists the rest of the tree.
+    """
+    try:
+        with os.scandir(folder) as it:
+            entries = list(it)
+    except OSError:
+        return
+    subdirs = []
+    for entry in entries:
+        try:
+            if entry.is_dir():
+                subdirs.append(entry.path)
+            elif entry.is_file():
+                yield entry
+        except OSError:
+            continue
+    for sub in subdirs:
+        yield from _iter_files(sub)
+
+
+def _stop_after_header_tags(tag, vr, length):
+    return tag > _LAST_HEADER_TAG
+
+
+def _probe_dicom_header(path):
+    """Read just enough of *path* to extract the demographic fields.
+
+    Rejects files without the ``DICM`` magic after the 128-byte preamble,
+    then parses only :data:`_HEADER_TAGS`, stopping at the first element
+    past PatientAge.  Returns ``(fields or None, bytes_consumed)``.
+    """
+    with open(path, "rb") as fh:
+        preamble = fh.read(_PREAMBLE_LEN)
+        if len(preamble) < _PREAMBLE_LEN or preamble[128:] != b"DICM":
+            return None, len(preamble)
+        fh.seek(0)
+        try:
+            ds = pydicom.filereader.read_partial(
+                fh,
+                stop_when=_stop_after_header_tags,
+                specific_tags=list(_HEADER_TAGS),
+            )
+            fields = _extract_fields(ds)
+        except Exception:
+            return None, fh.tell()
+        return fields, fh.tell()
+
+
 def _extract_last_name(full_name):
     if not full_name:
         return ""
@@ -397,10 +1604,10 @@ def _extract_last_name(full_name):
 
 
 def _extract_fields(ds):
-    """Pull demographics from a pydicom Dataset.
+    """Pull demographics from a pydicom Dataset into a :class:`StudyRecord`.
 
-    Returns a dict with the standard keys plus ``_Name`` (internal, never
-    written to the state file).
+    The record's ``name`` (``_Name``) is internal and never written to the
+    state file.
     """
     name_raw = str(getattr(ds, "PatientName", "Unknown")).strip()
     acc_raw = str(getattr(ds, "AccessionNumber", "N/A")).strip()
@@ -412,14 +1619,8 @@ def _extract_fields(ds):
     # Modality fallback chain
     mod = _resolve_modality(mod_raw, acc_raw, desc_raw)
 
-    return {
-        "_Name": name_raw,
-        "Acc": acc_raw,
-        "Sex": sex_raw,
-        "Age": age_raw,
-        "Mod": mod,
-        "StudyDesc": desc_raw,
-    }
+    return StudyRecord(acc=acc_raw, name=name_raw, sex=sex_raw, age=age_raw,
+                       mod=mod, study_desc=desc_raw)
 
 
 def _resolve_modality(mod_tag, accession, study_desc):
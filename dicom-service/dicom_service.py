@@ -36,6 +36,9 @@ DATA_DIR = os.path.join(SERVICE_DIR, "data")
 LOGS_DIR = os.path.join(SERVICE_DIR, "logs")
 LOCK_FILE = os.path.join(DATA_DIR, "service.lock")
 CONFIG_FILE = os.path.join(SERVICE_DIR, "config.ini")
+INDEX_FILE = os.path.join(DATA_DIR, "study_index.json")
+METRICS_FILE = os.path.join(DATA_DIR, "metrics.json")
+TRACE_DIR = os.path.join(DATA_DIR, "traces")
 
 # ---------------------------------------------------------------------------
 # Logging
@@ -84,6 +87,12 @@ def _acquire_lock():
     """Write our PID to the lock file.  Exit if another instance is running."""
     os.makedirs(DATA_DIR, exist_ok=True)
 
+    # A running instance answers on its control API; no PID guesswork
+    pid = _control_ping()
+    if pid:
+        print(f"Service already running (PID {pid}). Exiting.", file=sys.stderr)
+        sys.exit(0)
+
     if os.path.isfile(LOCK_FILE):
         try:
             with open(LOCK_FILE) as fh:
@@ -105,6 +114,17 @@ def _acquire_lock():
         fh.write(str(os.getpid()))
 
 
+def _control_ping():
+    """Return the PID of an instance answering on its control API, or 0."""
+    from control_api import call, read_control_file
+
+    info = read_control_file(DATA_DIR)
+    if info is None:
+        return 0
+    reply = call(info, "GET", "/ping", timeout=1.0)
+    return reply.get("pid", 0) if reply else 0
+
+
 def _release_lock():
     try:
         os.unlink(LOCK_FILE)
@@ -122,19 +142,67 @@ def _read_config(cache_dir_override=None):
 
     cfg = {
         "timer_interval": cp.getfloat("service", "timer_interval", fallback=2.0),
+        "search_interval": cp.getfloat("service", "search_interval", fallback=1.0),
+        "idle_interval": cp.getfloat("service", "idle_interval", fallback=10.0),
+        "heartbeat_interval": cp.getfloat("service", "heartbeat_interval", fallback=5.0),
         "dicom_cache_directory": cp.get(
             "service", "dicom_cache_directory",
             fallback=r"C:\Intelerad\InteleViewerDicom"),
+        "cache_root_threads": cp.getboolean("service", "cache_root_threads", fallback=True),
+        "cache_root_timeout": cp.getfloat("service", "cache_root_timeout", fallback=0.5),
         "search_timeout": cp.getint("service", "search_timeout", fallback=120),
-        "cache_size": cp.getint("service", "cache_size", fallback=5),
+        "max_targets": cp.getint("service", "max_targets", fallback=3),
+        "cache_size": cp.getint("service", "cache_size", fallback=200),
+        "cache_max_mb": cp.getfloat("service", "cache_max_mb", fallback=4.0),
+        "cache_ttl_hours": cp.getfloat("service", "cache_ttl_hours", fallback=12.0),
         "max_scan_folders": cp.getint("service", "max_scan_folders", fallback=50),
+        "index_batch": cp.getint("service", "index_batch", fallback=10),
+        "header_memo_size": cp.getint("service", "header_memo_size", fallback=2000),
+        "search_depths": _int_list(cp.get("service", "search_depths", fallback="")),
+        "depth_step": cp.getfloat("service", "depth_step", fallback=4.0),
+        "full_sweep_max": cp.getint("service", "full_sweep_max", fallback=500),
+        "full_sweep_lead": cp.getfloat("service", "full_sweep_lead", fallback=10.0),
+        "probe_workers": cp.getint("service", "probe_workers", fallback=4),
+        "max_open_files": cp.getint("service", "max_open_files", fallback=2),
+        "io_bytes_per_sec": cp.getint("service", "io_bytes_per_sec", fallback=16 * 1024 * 1024),
+        "io_files_per_tick": cp.getint("service", "io_files_per_tick", fallback=50),
+        "prefetch_enabled": cp.getboolean("service", "prefetch_enabled", fallback=True),
+        "prefetch_workers": cp.getint("service", "prefetch_workers", fallback=2),
+        "prefetch_debounce": cp.getfloat("service", "prefetch_debounce", fallback=1.5),
+        "speculate_max": cp.getint("service", "speculate_max", fallback=2),
+        "speculate_depth": cp.getint("service", "speculate_depth", fallback=0),
+        "state_channel_enabled": cp.getboolean("service", "state_channel_enabled", fallback=True),
+        "state_channel_port": cp.getint("service", "state_channel_port", fallback=0),
+        "control_api_enabled": cp.getboolean("service", "control_api_enabled", fallback=True),
+        "control_api_port": cp.getint("service", "control_api_port", fallback=0),
+        "metrics_interval": cp.getfloat("service", "metrics_interval", fallback=60.0),
+        "trace_enabled": cp.getboolean("service", "trace_enabled", fallback=False),
     }
 
+    cfg["window_interval"] = cp.getfloat(
+        "service", "window_interval", fallback=cfg["timer_interval"])
+
     if cache_dir_override:
         cfg["dicom_cache_directory"] = cache_dir_override
+    # Several cache roots may be given, separated by ";"
+    cfg["dicom_cache_directories"] = _path_list(cfg["dicom_cache_directory"])
 
     return cfg
 
+
+def _path_list(value):
+    """Parse ``"C:\\a; D:\\b"`` into ``["C:\\a", "D:\\b"]`` (at least one entry)."""
+    return [v.strip() for v in value.split(";") if v.strip()] or [value]
+
+
+def _int_list(value):
+    """Parse ``"5, 10, 25"`` into ``[5, 10, 25]``; empty or invalid -> ``None``."""
+    try:
+        items = [int(v) for v in value.replace(";", ",").split(",") if v.strip()]
+    except ValueError:
+        return None
+    return [v for v in items if v > 0] or None
+
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
@@ -157,26 +225,97 @@ def main():
 
     # Late imports so logging is ready
     from dicom_monitor import DicomMonitor, PSOnePerfHandler
+    from io_governor import IOGovernor
+    from scheduler import Scheduler
+    from study_index import StudyIndex
     from window_monitor import WindowMonitor
 
+    scheduler = Scheduler()
+
+    index = StudyIndex(INDEX_FILE)
+    index.load()
+
+    # Keep cache reads from competing with InteleViewer (0 = unlimited)
+    governor = IOGovernor(bytes_per_sec=cfg["io_bytes_per_sec"],
+                          files_per_tick=cfg["io_files_per_tick"],
+                          tick=cfg["search_interval"])
+
     monitor = DicomMonitor(
-        cache_dir=cfg["dicom_cache_directory"],
+        cache_dir=cfg["dicom_cache_directories"],
         data_dir=DATA_DIR,
         search_timeout=cfg["search_timeout"],
+        max_targets=cfg["max_targets"],
         cache_size=cfg["cache_size"],
+        cache_max_bytes=int(cfg["cache_max_mb"] * 1024 * 1024),
+        cache_ttl=cfg["cache_ttl_hours"] * 3600,
         max_scan_folders=cfg["max_scan_folders"],
+        index=index,
+        header_memo_size=cfg["header_memo_size"],
+        probe_workers=cfg["probe_workers"],
+        max_open_files=cfg["max_open_files"],
+        search_depths=cfg["search_depths"],
+        depth_step=cfg["depth_step"],
+        full_sweep_max=cfg["full_sweep_max"],
+        full_sweep_lead=cfg["full_sweep_lead"],
+        speculate_max=cfg["speculate_max"],
+        speculate_depth=cfg["speculate_depth"],
+        io_governor=governor,
+        root_threads=cfg["cache_root_threads"] and len(cfg["dicom_cache_directories"]) > 1,
+        root_list_timeout=cfg["cache_root_timeout"],
     )
 
     win_mon = WindowMonitor()
     monitor.window_monitor = win_mon
 
+    # Tuning knobs owned by the service, reported with the funnel metrics
+    monitor.metrics.info.update(
+        timer_interval=cfg["timer_interval"],
+        search_interval=cfg["search_interval"],
+        search_depths=monitor.search_depths,
+        prefetch_enabled=cfg["prefetch_enabled"],
+        speculate_max=monitor.speculate_max,
+        io_bytes_per_sec=governor.bytes_per_sec,
+        io_files_per_tick=governor.files_per_tick,
+        cache_roots=len(monitor.cache_dirs),
+    )
+
+    # Loopback push channel for state changes (current_study.json remains
+    # the fallback for consumers that don't subscribe)
+    channel = None
+    if cfg["state_channel_enabled"]:
+        from state_channel import StateChannel
+        channel = StateChannel(DATA_DIR, port=cfg["state_channel_port"])
+        try:
+            channel.start()
+            monitor.state_channel = channel
+        except OSError:
+            log.warning("State channel unavailable — file only", exc_info=True)
+            channel = None
+
+    # Optional trace of psone/window/folder events for offline replay
+    recorder = None
+    if cfg["trace_enabled"]:
+        from trace_recorder import TraceRecorder
+        recorder = TraceRecorder(
+            os.path.join(TRACE_DIR, time.strftime("trace-%Y%m%d-%H%M%S.jsonl")),
+            monitor=monitor)
+        monitor._refresh_snapshot()
+        recorder.start(
+            cache_folders=len(monitor._snapshot) if monitor._snapshot else 0,
+            config={key: cfg[key] for key in (
+                "timer_interval", "search_interval", "search_timeout",
+                "cache_size", "max_scan_folders", "prefetch_enabled",
+                "prefetch_debounce")})
+
     # watchdog: watch the PSOnePerf.log directory
     observer = None
     psone_log_dir = _psone_log_dir()
     if psone_log_dir and os.path.isdir(psone_log_dir):
         from watchdog.observers import Observer
         observer = Observer()
-        observer.schedule(PSOnePerfHandler(monitor), psone_log_dir, recursive=False)
+        observer.schedule(
+            PSOnePerfHandler(monitor, wake=lambda: scheduler.wake("psone")),
+            psone_log_dir, recursive=False)
         observer.daemon = True
         observer.start()
         log.info("Watching %s for PSOnePerf.log changes", psone_log_dir)
@@ -184,25 +323,92 @@ def main():
         log.warning("PSOnePerf.log directory not found: %s — falling back to polling",
                     psone_log_dir)
 
-    # Graceful shutdown
-    running = True
+    # watchdog: watch the DICOM cache roots and prefetch new study folders
+    # (and/or record folder events to the trace)
+    cache_observer = None
+    prefetcher = None
+    cache_dirs = [d for d in monitor.cache_dirs if os.path.isdir(d)]
+    for missing in set(monitor.cache_dirs) - set(cache_dirs):
+        log.warning("DICOM cache directory not found: %s — not watched", missing)
+    if (cfg["prefetch_enabled"] or recorder) and cache_dirs:
+        from watchdog.observers import Observer
+        from study_prefetch import CacheFolderHandler, StudyPrefetcher
+        cache_observer = Observer()
+        if cfg["prefetch_enabled"]:
+            prefetcher = StudyPrefetcher(
+                monitor,
+                workers=cfg["prefetch_workers"],
+                debounce=cfg["prefetch_debounce"],
+            )
+            prefetcher.start()
+        for cache_dir in cache_dirs:
+            if prefetcher is not None:
+                cache_observer.schedule(CacheFolderHandler(prefetcher, cache_dir),
+                                        cache_dir, recursive=True)
+                log.info("Watching %s for new study folders (%d prefetch workers)",
+                         cache_dir, prefetcher.workers)
+            if recorder is not None:
+                cache_observer.schedule(CacheFolderHandler(recorder, cache_dir),
+                                        cache_dir, recursive=True)
+        cache_observer.daemon = True
+        cache_observer.start()
+    elif cfg["prefetch_enabled"]:
+        log.warning("No DICOM cache directory found — prefetch disabled")
 
+    # Graceful shutdown
     def _shutdown(signum=None, frame=None):
-        nonlocal running
-        running = False
+        scheduler.stop()
 
     signal.signal(signal.SIGTERM, _shutdown)
     signal.signal(signal.SIGINT, _shutdown)
 
-    # Heartbeat: report-check writes a timestamp to data/heartbeat every
-    # 10 s.  If the file goes stale (>30 s), the host app is gone and we
+    # Loopback control API: host-app leases, status, force-search, reset
+    # and shutdown (data/control.json has the port and token)
+    control = None
+    if cfg["control_api_enabled"]:
+        from control_api import ControlServer
+
+        def _force_search(accession):
+            acc = monitor.force_search(accession)
+            if acc:
+                scheduler.wake("search")
+            return acc
+
+        def _control_shutdown():
+            log.info("Shutdown requested via control API")
+            scheduler.stop()
+
+        def _status():
+            return {"search": monitor.status(),
+                    "metrics": monitor.metrics.snapshot()["counters"],
+                    "scheduler": scheduler.stats()}
+
+        control = ControlServer(
+            DATA_DIR, port=cfg["control_api_port"],
+            commands={"search": _force_search,
+                      "reset": lambda: monitor.reset_state("control_api"),
+                      "shutdown": _control_shutdown},
+            status=_status,
+            wake=lambda: scheduler.wake("control"))
+        try:
+            control.start()
+        except OSError:
+            log.warning("Control API unavailable — file heartbeat only", exc_info=True)
+            control = None
+
+    # Heartbeat: host apps hold a lease on the control API, or (fallback)
+    # write a timestamp to data/heartbeat every 10 s.  If every lease has
+    # lapsed and the file goes stale (>30 s), the host app is gone and we
     # should exit so file locks on the embedded Python runtime are released.
     HEARTBEAT_FILE = os.path.join(DATA_DIR, "heartbeat")
     HEARTBEAT_STALE_SECS = 30
     heartbeat_missing_since = None
 
     def _check_heartbeat():
-        nonlocal running, heartbeat_missing_since
+        nonlocal heartbeat_missing_since
+        if control is not None and control.leases.active():
+            heartbeat_missing_since = None
+            return
         try:
             mtime = os.path.getmtime(HEARTBEAT_FILE)
             age = time.time() - mtime
@@ -211,7 +417,7 @@ def main():
                     heartbeat_missing_since = time.monotonic()
                 elif time.monotonic() - heartbeat_missing_since > HEARTBEAT_STALE_SECS:
                     log.info("Heartbeat stale (%.0f s) — host app gone, shutting down", age)
-                    running = False
+                    scheduler.stop()
             else:
                 heartbeat_missing_since = None
         except FileNotFoundError:
@@ -221,35 +427,110 @@ def main():
                 heartbeat_missing_since = time.monotonic()
             elif time.monotonic() - heartbeat_missing_since > 120:
                 log.info("No heartbeat file after 120 s — shutting down")
-                running = False
+                scheduler.stop()
         except OSError:
             pass
 
-    log.info("Entering main loop (interval=%.1f s)", cfg["timer_interval"])
+    # --- Jobs -------------------------------------------------------------
+
+    def _window_job():
+        win_mon.check_patient_safety(monitor)
+        if recorder is not None:
+            recorder.window(win_mon.last_patient_title)
+
+    def _psone_job():
+        # Fallback PSOne check (in case watchdog missed an event); watchdog
+        # events wake this job immediately.
+        if recorder is not None:
+            recorder.poll_psone()
+        before = monitor.search_target_acc
+        monitor.on_psone_log_changed()
+        started = monitor.search_active and monitor.search_target_acc != before
+        if started:
+            scheduler.wake("search")
+        return started
+
+    def _search_job():
+        # Continue any active DICOM search (and deferred targets)
+        monitor.continue_search()
+        return monitor.search_active or bool(monitor.pending_targets)
+
+    def _index_job():
+        # Idle: grow the study index a few folders at a time
+        indexed = monitor.update_index(cfg["index_batch"])
+        index.save()
+        return indexed > 0
+
+    def _metrics_job():
+        # Privacy-safe funnel snapshot (numbers only) for tuning
+        monitor.metrics.dump(METRICS_FILE)
+
+    io_throttled = 0
+
+    def _stats_job():
+        nonlocal io_throttled
+        log.debug("Scheduler: %s (wakeups=%d)", scheduler.stats(), scheduler.wakeups)
+        log.debug("State writes: %s", monitor.state_write_stats())
+        log.debug("Study cache: %s", monitor.cache_stats())
+        log.debug("Cache roots: %s", monitor.root_stats())
+        io = governor.snapshot()
+        throttled = io["throttled"] + io["throttled_background"] + io["skipped"]
+        if throttled != io_throttled:
+            log.info("I/O governor throttled %d reads since last report: %s",
+                     throttled - io_throttled, io)
+            io_throttled = throttled
+
+    # Window safety (polling — no filesystem event to hook)
+    scheduler.add_job("window", _window_job, cfg["window_interval"])
+    # Without a watchdog observer the fallback poll is the only trigger, so
+    # it must not back off.
+    scheduler.add_job("psone", _psone_job, cfg["timer_interval"],
+                      idle_interval=cfg["idle_interval"] if observer else None)
+    scheduler.add_job("search", _search_job, cfg["search_interval"],
+                      idle_interval=cfg["idle_interval"])
+    scheduler.add_job("index", _index_job, cfg["timer_interval"],
+                      idle_interval=cfg["idle_interval"])
+    # Shut down if the host app (report-check) is gone
+    scheduler.add_job("heartbeat", _check_heartbeat, cfg["heartbeat_interval"])
+    if control is not None:
+        # Woken by each queued control command; the interval is a backstop
+        scheduler.add_job("control", control.run_pending, cfg["timer_interval"],
+                          idle_interval=cfg["idle_interval"])
+    scheduler.add_job("stats", _stats_job, 300.0)
+    scheduler.add_job("metrics", _metrics_job, cfg["metrics_interval"])
+    if recorder is not None:
+        # Tie traced folders to studies once the index has parsed them
+        scheduler.add_job("trace", recorder.link_folders, 30.0)
+
+    log.info("Entering main loop (search=%.1f s, poll=%.1f s, idle<=%.1f s)",
+             cfg["search_interval"], cfg["timer_interval"], cfg["idle_interval"])
 
     try:
-        while running:
-            try:
-                # Window safety (polling — no filesystem event to hook)
-                win_mon.check_patient_safety(monitor)
-
-                # Fallback PSOne check (in case watchdog missed an event)
-                monitor.on_psone_log_changed()
-
-                # Continue any active DICOM search
-                monitor.continue_search()
-
-                # Shut down if the host app (report-check) is gone
-                _check_heartbeat()
-            except Exception:
-                log.exception("Error in main loop tick")
-
-            time.sleep(cfg["timer_interval"])
+        scheduler.run()
     finally:
         if observer is not None:
             observer.stop()
             observer.join(timeout=2)
+        if cache_observer is not None:
+            cache_observer.stop()
+            cache_observer.join(timeout=2)
+        if prefetcher is not None:
+            prefetcher.stop()
+        if control is not None:
+            control.stop()
         monitor.reset_state("shutdown")
+        if channel is not None:
+            channel.stop()
+        monitor.close()
+        index.save(force=True)
+        if recorder is not None:
+            recorder.close()
+        monitor.metrics.dump(METRICS_FILE, force=True)
+        log.info("Scheduler: %s", scheduler.stats())
+        log.info("State writes: %s", monitor.state_write_stats())
+        log.info("Study cache: %s", monitor.cache_stats())
+        log.info("Cache roots: %s", monitor.root_stats())
+        log.info("I/O governor: %s", governor.snapshot())
         log.info("Service stopped")
 
 
@@ -0,0 +1,178 @@
+"""
+I/O Governor — token-bucket budget for DICOM cache reads.
+
+The service shares the workstation with InteleViewer and PowerScribe, so a
+cold sweep of the cache must not compete with the radiologist opening
+images.  Every header probe takes a file token before opening the file and
+is charged the bytes it read afterwards:
+
+* ``files_per_tick`` files may be opened per ``tick`` seconds
+* ``bytes_per_sec`` bytes may be read per second (one second of burst)
+
+A zero budget is unlimited.  The active search has priority: while it
+runs, background readers (prefetch, indexing, speculative lookup — see
+:meth:`background`) leave ``reserve`` of each limited bucket to it, so
+they slow down rather than stop (a new study folder usually arrives
+mid-search).  An unlimited budget never holds them back.  The indexer on
+the main loop doesn't wait at all (it checks :meth:`ready` and stops its
+batch).
+"""
+
+import contextlib
+import threading
+import time
+
+
+class IOGovernor:
+    """Shared file/byte token buckets with foreground priority.
+
+    Thread-safe: probes run on the main loop, the probe pool, prefetch
+    workers and the speculation thread.
+    """
+
+    def __init__(self, *, bytes_per_sec=0, files_per_tick=0, tick=1.0,
+                 max_wait=None, reserve=0.5, clock=time.monotonic):
+        self.bytes_per_sec = max(0, bytes_per_sec)
+        self.files_per_tick = max(0, files_per_tick)
+        self.tick = tick if tick > 0 else 1.0
+        # A foreground wait never exceeds this (the search must progress)
+        self.max_wait = max_wait if max_wait is not None else self.tick
+        # Fraction of each bucket background readers leave to a search
+        self.reserve = min(max(reserve, 0.0), 1.0)
+        self.clock = clock
+
+        self._files = float(self.files_per_tick)
+        self._bytes = float(self.bytes_per_sec)
+        self._refilled = clock()
+        self._foreground = False
+        self._cond = threading.Condition()
+        self._local = threading.local()
+
+        self.stats = {"files": 0, "bytes": 0, "throttled": 0,
+                      "throttled_background": 0, "wait_s": 0.0, "skipped": 0}
+
+    @property
+    def limited(self):
+        return bool(self.bytes_per_sec or self.files_per_tick)
+
+    # ------------------------------------------------------------------
+    # Priority
+    # ------------------------------------------------------------------
+
+    def set_foreground(self, active):
+        """Mark a search as running (background readers leave it the reserve)."""
+        with self._cond:
+            self._foreground = bool(active)
+            self._cond.notify_all()
+
+    @contextlib.contextmanager
+    def background(self, wait=True):
+        """Run the block's probes as background work.
+
+        With *wait* false, :meth:`acquire` never blocks; the caller is
+        expected to check :meth:`ready` itself.
+        """
+        previous = getattr(self._local, "mode", None)
+        self._local.mode = "wait" if wait else "nowait"
+        try:
+            yield self
+        finally:
+            self._local.mode = previous
+
+    # ------------------------------------------------------------------
+    # Tokens
+    # ------------------------------------------------------------------
+
+    def ready(self):
+        """True if a background reader could open a file right now."""
+        with self._cond:
+            self._refill()
+            return self._delay(background=True) == 0.0
+
+    def acquire(self):
+        """Take a file token, waiting for the budget (and any search)."""
+        mode = getattr(self._local, "mode", None)
+        background = mode is not None
+        with self._cond:
+            self._refill()
+            if mode != "nowait":
+                waited = self._wait(background)
+                if waited:
+                    self.stats["wait_s"] += waited
+                    self.stats["throttled_background" if background
+                               else "throttled"] += 1
+            if self.files_per_tick:
+                self._files -= 1
+            self.stats["files"] += 1
+
+    def charge(self, nbytes):
+        """Account *nbytes* read by the probe that took the last token."""
+        with self._cond:
+            if self.bytes_per_sec:
+                self._bytes -= nbytes
+            self.stats["bytes"] += nbytes
+
+    def skip(self):
+        """Record background work deferred because :meth:`ready` was false."""
+        with self._cond:
+            self.stats["skipped"] += 1
+
+    def snapshot(self):
+        with self._cond:
+            stats = dict(self.stats)
+        stats["wait_s"] = round(stats["wait_s"], 3)
+        return stats
+
+    def _wait(self, background):
+        """Block until a token is free; return the seconds waited."""
+        if not self.limited:
+            return 0.0
+        start = self.clock()
+        waited = False
+        while True:
+            self._refill()
+            # Re-evaluated when set_foreground() wakes us
+            delay = self._delay(background)
+            if delay == 0.0:
+                break
+            if not background:
+                # Never stall the search past max_wait per file
+                remaining = self.max_wait - (self.clock() - start)
+                if remaining <= 0:
+                    break
+                delay = min(delay, remaining)
+            waited = True
+            self._cond.wait(timeout=delay)
+        return self.clock() - start if waited else 0.0
+
+    def _delay(self, background=False):
+        """Seconds until both buckets are positive again.
+
+        A background reader during a search also waits for the buckets to
+        refill past the reserve.
+        """
+        hold = self.reserve if background and self._foreground else 0.0
+        delay = 0.0
+        if self.files_per_tick:
+            needed = max(1.0, min(float(self.files_per_tick),
+                                  1 + hold * self.files_per_tick))
+            if self._files < needed:
+                delay = (needed - self._files) * self.tick / self.files_per_tick
+        if self.bytes_per_sec:
+            floor = hold * self.bytes_per_sec
+            if self._bytes <= floor:
+                delay = max(delay, (floor + 1 - self._bytes) / self.bytes_per_sec)
+        return delay
+
+    def _refill(self):
+        now = self.clock()
+        elapsed = now - self._refilled
+        if elapsed <= 0:
+            return
+        self._refilled = now
+        if self.files_per_tick:
+            self._files = min(float(self.files_per_tick),
+                              self._files + elapsed * self.files_per_tick / self.tick)
+        if self.bytes_per_sec:
+            self._bytes = min(float(self.bytes_per_sec),
+                              self._bytes + elapsed * self.bytes_per_sec)
@@ -0,0 +1,150 @@
+"""
+Scheduler — event-driven main loop for the DICOM service.
+
+Replaces the fixed ``time.sleep(timer_interval)`` loop.  Each periodic job
+has its own interval; the loop sleeps until the next job is due, and
+:meth:`Scheduler.wake` (called from watchdog threads) makes jobs due
+immediately so a PSOnePerf.log change is handled without waiting out a
+tick.
+
+Jobs that report no work back off: each idle run doubles the job's
+interval up to its ``idle_interval``; a run that did work, or a wake,
+resets it.
+"""
+
+import logging
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+
+class _Job:
+    __slots__ = ("name", "func", "interval", "idle_interval", "current",
+                 "next_due", "runs", "errors", "total", "max", "last")
+
+    def __init__(self, name, func, interval, idle_interval, now):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.idle_interval = max(idle_interval or interval, interval)
+        self.current = interval
+        self.next_due = now
+        self.runs = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+
+class Scheduler:
+    """Run periodic jobs on one thread, waking early on events."""
+
+    def __init__(self, *, clock=time.monotonic, max_sleep=5.0):
+        self.clock = clock
+        # Upper bound on a single wait so signals are still handled promptly
+        self.max_sleep = max_sleep
+        self.wakeups = 0
+
+        self._jobs = []
+        self._lock = threading.Lock()
+        self._event = threading.Event()
+        self._running = False
+
+    # ------------------------------------------------------------------
+    # Jobs
+    # ------------------------------------------------------------------
+
+    def add_job(self, name, func, interval, idle_interval=None):
+        """Register *func* to run every *interval* seconds.
+
+        If *idle_interval* is given, *func*'s return value matters: a falsy
+        result (no work done) doubles the interval, up to *idle_interval*.
+        Jobs run in registration order when several are due together.
+        """
+        with self._lock:
+            self._jobs.append(_Job(name, func, interval, idle_interval,
+                                   self.clock()))
+
+    def wake(self, *names):
+        """Make the named jobs (or all jobs) due now.  Thread-safe."""
+        now = self.clock()
+        with self._lock:
+            for job in self._jobs:
+                if not names or job.name in names:
+                    job.current = job.interval
+                    job.next_due = now
+        self._event.set()
+
+    def run_pending(self):
+        """Run every due job; return seconds until the next one is due."""
+        with self._lock:
+            now = self.clock()
+            due = [job for job in self._jobs if job.next_due <= now]
+
+        for job in due:
+            t0 = time.perf_counter()
+            try:
+                busy = job.func()
+            except Exception:
+                log.exception("Error in %s job", job.name)
+                job.errors += 1
+                busy = True
+            elapsed = time.perf_counter() - t0
+
+            with self._lock:
+                job.runs += 1
+                job.total += elapsed
+                job.last = elapsed
+                job.max = max(job.max, elapsed)
+                if job.idle_interval > job.interval:
+                    if busy:
+                        job.current = job.interval
+                    else:
+                        job.current = min(job.current * 2, job.idle_interval)
+                # A wake() during the run already made the job due again
+                if job.next_due <= now:
+                    job.next_due = self.clock() + job.current
+
+        with self._lock:
+            if not self._jobs:
+                return self.max_sleep
+            next_due = min(job.next_due for job in self._jobs)
+        return max(0.0, min(next_due - self.clock(), self.max_sleep))
+
+    # ------------------------------------------------------------------
+    # Loop
+    # ------------------------------------------------------------------
+
+    def run(self):
+        """Run jobs until :meth:`stop` is called."""
+        self._running = True
+        while self._running:
+            self._event.clear()
+            delay = self.run_pending()
+            if self._running and delay > 0:
+                if self._event.wait(timeout=delay):
+                    self.wakeups += 1
+
+    def stop(self):
+        self._running = False
+        self._event.set()
+
+    # ------------------------------------------------------------------
+    # Diagnostics
+    # ------------------------------------------------------------------
+
+    def stats(self):
+        """Per-job timing: runs, errors, mean/max/last duration (ms), interval."""
+        with self._lock:
+            return {
+                job.name: {
+                    "runs": job.runs,
+                    "errors": job.errors,
+                    "mean_ms": round(job.total / job.runs * 1000, 3) if job.runs else 0.0,
+                    "max_ms": round(job.max * 1000, 3),
+                    "last_ms": round(job.last * 1000, 3),
+                    "interval": job.current,
+                }
+                for job in self._jobs
+            }
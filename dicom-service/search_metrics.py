@@ -0,0 +1,207 @@
+"""
+Search Metrics — where DICOM lock latency goes, per workstation.
+
+DicomMonitor reports each stage of the search funnel here:
+
+    PSOnePerf.log written -> search started -> cache / index / folder scan
+    -> lock | timeout | abandoned
+
+Counters are cumulative since service start.  Histograms keep cumulative
+bucket counts plus the most recent samples for percentiles, so a snapshot
+shows both the long-run shape and how the last few hundred searches went.
+:meth:`SearchMetrics.dump` writes an atomic ``data/metrics.json`` snapshot
+for collection across workstations.
+
+Per-search figures (folders listed, files opened, bytes read, parse time)
+are the counter deltas between search start and end, so header probes that
+prefetch workers ran during the search are included.
+
+PRIVACY: only numbers and fixed labels are recorded — never an accession,
+patient name, folder name or window title.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+
+log = logging.getLogger(__name__)
+
+_METRICS_VERSION = 1
+
+# Bucket upper bounds (inclusive); one overflow bucket follows the last
+_MS_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000,
+               10000, 30000, 60000, 120000)
+_COUNT_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+_BYTES_BUCKETS = (0, 4096, 16384, 65536, 262144, 1048576, 4194304,
+                  16777216, 67108864)
+
+# Counters accumulated into per-search deltas
+_FUNNEL_COUNTERS = ("folders_listed", "folders_probed", "files_opened",
+                    "bytes_read", "parse_us")
+
+
+class Histogram:
+    """Fixed-bucket histogram with a rolling window of recent samples."""
+
+    def __init__(self, bounds, window=500):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._recent = deque(maxlen=window)
+
+    def add(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        self._recent.append(value)
+
+    def percentile(self, p):
+        """Return the *p*-th percentile (0-100) of the recent samples."""
+        if not self._recent:
+            return 0.0
+        ordered = sorted(self._recent)
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+    def snapshot(self):
+        labels = [f"<={b}" for b in self.bounds] + [f">{self.bounds[-1]}"]
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 3) if self.count else 0.0,
+            "max": round(self.max, 3),
+            "recent": {
+                "n": len(self._recent),
+                "p50": round(self.percentile(50), 3),
+                "p90": round(self.percentile(90), 3),
+                "p99": round(self.percentile(99), 3),
+            },
+            "buckets": {label: n for label, n in zip(labels, self.counts) if n},
+        }
+
+
+class SearchMetrics:
+    """Thread-safe funnel counters and histograms for one DicomMonitor."""
+
+    def __init__(self, *, window=500, clock=time.monotonic):
+        self.clock = clock
+        self.counters = {}
+        self.histograms = {
+            # PSOnePerf.log mtime (or a later reset) -> _start_search, wall clock
+            "trigger_ms": Histogram(_MS_BUCKETS, window),
+            # _start_search -> lock
+            "lock_ms": Histogram(_MS_BUCKETS, window),
+            # Single-file header probe
+            "probe_ms": Histogram(_MS_BUCKETS, window),
+            # Per search, start -> end
+            "search_folders_listed": Histogram(_COUNT_BUCKETS, window),
+            "search_folders_probed": Histogram(_COUNT_BUCKETS, window),
+            "search_files_opened": Histogram(_COUNT_BUCKETS, window),
+            "search_bytes_read": Histogram(_BYTES_BUCKETS, window),
+            "search_parse_ms": Histogram(_MS_BUCKETS, window),
+        }
+        self.info = {}
+        self._baseline = None  # funnel counters at search start
+        self._started = clock()
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def incr(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+            self._dirty = True
+
+    def observe(self, name, value):
+        with self._lock:
+            self.histograms[name].add(value)
+            self._dirty = True
+
+    def probe(self, nbytes, seconds):
+        """Record one header probe (a file opened)."""
+        with self._lock:
+            c = self.counters
+            c["files_opened"] = c.get("files_opened", 0) + 1
+            c["bytes_read"] = c.get("bytes_read", 0) + nbytes
+            c["parse_us"] = c.get("parse_us", 0) + int(seconds * 1e6)
+            self.histograms["probe_ms"].add(seconds * 1000)
+            self._dirty = True
+
+    def search_started(self, trigger_seconds=None):
+        """Mark a search start; *trigger_seconds* is the PSOne log -> start delay."""
+        with self._lock:
+            c = self.counters
+            if self._baseline is not None:
+                c["searches_superseded"] = c.get("searches_superseded", 0) + 1
+            c["searches"] = c.get("searches", 0) + 1
+            if trigger_seconds is not None and trigger_seconds >= 0:
+                self.histograms["trigger_ms"].add(trigger_seconds * 1000)
+            self._baseline = {k: c.get(k, 0) for k in _FUNNEL_COUNTERS}
+            self._dirty = True
+
+    def search_ended(self, outcome, elapsed=None, source=""):
+        """Close the current search: *outcome* is lock, timeout or abandoned."""
+        with self._lock:
+            c = self.counters
+            c[f"searches_{outcome}"] = c.get(f"searches_{outcome}", 0) + 1
+            if source:
+                c[f"lock_source_{source}"] = c.get(f"lock_source_{source}", 0) + 1
+            if outcome == "lock" and elapsed is not None:
+                self.histograms["lock_ms"].add(elapsed * 1000)
+            if self._baseline is not None:
+                delta = {k: c.get(k, 0) - self._baseline[k] for k in _FUNNEL_COUNTERS}
+                self._baseline = None
+                for key in ("folders_listed", "folders_probed", "files_opened",
+                            "bytes_read"):
+                    self.histograms[f"search_{key}"].add(delta[key])
+                self.histograms["search_parse_ms"].add(delta["parse_us"] / 1000)
+            self._dirty = True
+
+    # ------------------------------------------------------------------
+    # Snapshot
+    # ------------------------------------------------------------------
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "version": _METRICS_VERSION,
+                "written": round(time.time(), 3),
+                "uptime_s": round(self.clock() - self._started, 1),
+                "info": dict(self.info),
+                "counters": dict(sorted(self.counters.items())),
+                "histograms": {name: h.snapshot()
+                               for name, h in self.histograms.items()},
+            }
+
+    def dump(self, path, force=False):
+        """Write :meth:`snapshot` to *path* atomically if anything changed."""
+        if not self._dirty and not force:
+            return False
+        payload = self.snapshot()
+        self._dirty = False
+
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        tmp_fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(tmp_fd, "w", encoding="utf-8") as fh:
+                json.dump(payload, fh, indent=1)
+            os.replace(tmp_path, path)
+        except OSError:
+            log.warning("Failed to write metrics", exc_info=True)
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            self._dirty = True
+            return False
+        return True
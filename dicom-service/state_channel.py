@@ -0,0 +1,205 @@
+"""
+State Channel — push study-state changes to local subscribers.
+
+``current_study.json`` is still written for old consumers, but watching it
+costs each consumer a watchdog event plus a re-read and re-parse.  The
+channel serves the same payload on a loopback TCP socket instead: each
+subscriber receives newline-delimited JSON messages::
+
+    {"seq": 42, "state": {"Acc": ..., "Sex": ..., "Age": ..., "Mod": ...,
+                          "StudyDesc": ..., "Gen": ..., "Written": ...}}
+
+``seq`` increases by one per published state.  A subscriber that falls
+behind only receives the latest state (seq jumps), never a backlog.  The
+current state is sent as soon as a subscriber connects.
+
+The port is written to ``data/state_channel.port`` so consumers can find
+it; the file is removed on shutdown.
+
+PRIVACY: the payload is the already-filtered state-file dict — patient name
+is never published.
+"""
+
+import json
+import logging
+import os
+import socket
+import tempfile
+import threading
+
+log = logging.getLogger(__name__)
+
+PORT_FILE_NAME = "state_channel.port"
+
+# How often an idle subscriber thread checks whether its peer disconnected
+_IDLE_CHECK_SECS = 30.0
+
+
+class StateChannel:
+    """Loopback publish/subscribe server for the current study state."""
+
+    def __init__(self, data_dir, *, host="127.0.0.1", port=0,
+                 max_subscribers=16):
+        self.data_dir = data_dir
+        self.port_file = os.path.join(data_dir, PORT_FILE_NAME)
+        self.host = host
+        self.port = port
+        self.max_subscribers = max_subscribers
+
+        self.seq = 0
+        self.published = 0
+        self.sent = 0
+        self.dropped = 0
+
+        self._payload = self._encode(0, {})
+        self._subscribers = set()
+        self._cond = threading.Condition()
+        self._sock = None
+        self._running = False
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Bind the listening socket and start accepting subscribers."""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.bind((self.host, self.port))
+        sock.listen(self.max_subscribers)
+        self._sock = sock
+        self.port = sock.getsockname()[1]
+        self._running = True
+        threading.Thread(target=self._accept_loop, name="state-channel",
+                         daemon=True).start()
+        self._write_port_file()
+        log.info("State channel listening on %s:%d", self.host, self.port)
+
+    def stop(self):
+        with self._cond:
+            if not self._running:
+                return
+            self._running = False
+            subscribers = list(self._subscribers)
+            self._cond.notify_all()
+        try:
+            self._sock.close()
+        except OSError:
+            pass
+        for conn in subscribers:
+            _close(conn)
+        try:
+            os.unlink(self.port_file)
+        except OSError:
+            pass
+        log.info("State channel stopped: %s", self.stats())
+
+    # ------------------------------------------------------------------
+    # Publishing
+    # ------------------------------------------------------------------
+
+    def publish(self, state):
+        """Send *state* to every subscriber.  Never blocks on slow readers."""
+        with self._cond:
+            self.seq += 1
+            self.published += 1
+            self._payload = self._encode(self.seq, state)
+            self._cond.notify_all()
+        return self.seq
+
+    @staticmethod
+    def _encode(seq, state):
+        return (json.dumps({"seq": seq, "state": state}) + "\n").encode("utf-8")
+
+    # ------------------------------------------------------------------
+    # Subscribers
+    # ------------------------------------------------------------------
+
+    def _accept_loop(self):
+        while self._running:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return  # socket closed by stop()
+            with self._cond:
+                if len(self._subscribers) >= self.max_subscribers:
+                    self.dropped += 1
+                    _close(conn)
+                    continue
+                self._subscribers.add(conn)
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            threading.Thread(target=self._serve, args=(conn,),
+                             name="state-subscriber", daemon=True).start()
+
+    def _serve(self, conn):
+        """Send the latest state whenever it changes (one thread per subscriber)."""
+        last = -1
+        try:
+            while True:
+                with self._cond:
+                    if self._running and self.seq == last:
+                        self._cond.wait(timeout=_IDLE_CHECK_SECS)
+                    if not self._running:
+                        return
+                    if self.seq == last:
+                        payload = None
+                    else:
+                        last, payload = self.seq, self._payload
+                if payload is None:
+                    # Idle: free the slot if the subscriber went away
+                    if _peer_closed(conn):
+                        return
+                    continue
+                conn.sendall(payload)
+                with self._cond:
+                    self.sent += 1
+        except OSError:
+            log.debug("State subscriber disconnected")
+        finally:
+            with self._cond:
+                self._subscribers.discard(conn)
+            _close(conn)
+
+    def _write_port_file(self):
+        os.makedirs(self.data_dir, exist_ok=True)
+        tmp_fd, tmp_path = tempfile.mkstemp(dir=self.data_dir, suffix=".tmp")
+        try:
+            with os.fdopen(tmp_fd, "w", encoding="utf-8") as fh:
+                fh.write(str(self.port))
+            os.replace(tmp_path, self.port_file)
+        except OSError:
+            log.warning("Failed to write state channel port file", exc_info=True)
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+    def stats(self):
+        with self._cond:
+            return {"seq": self.seq, "published": self.published,
+                    "sent": self.sent, "subscribers": len(self._subscribers),
+                    "dropped": self.dropped}
+
+
+def _peer_closed(conn):
+    """Return True if *conn*'s peer has closed (or reset) the connection."""
+    try:
+        conn.setblocking(False)
+        try:
+            return conn.recv(1, socket.MSG_PEEK) == b""
+        finally:
+            conn.setblocking(True)
+    except BlockingIOError:
+        return False
+    except OSError:
+        return True
+
+
+def _close(conn):
+    try:
+        conn.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+    try:
+        conn.close()
+    except OSError:
+        pass
@@ -0,0 +1,220 @@
+"""
+Study Cache — parsed study headers, bounded by count, bytes and age.
+
+:class:`StudyRecord` is the immutable result of a DICOM header probe.  It
+keeps the ``_extract_fields`` key names as a read-only mapping view
+(``record["Acc"]``, ``record.get("_Name")``) so the state file, study index
+and tests can treat it like the dicts it replaces, but it can't be changed
+once built: the lookup source is attached with :meth:`StudyRecord.with_source`,
+which returns a new record.
+
+:class:`StudyCache` is the accession -> record LRU behind
+:meth:`DicomMonitor._try_match`.  Besides the entry count it caps the
+approximate memory held and drops entries older than *ttl*, so it can be
+sized for a whole shift in a process that runs for days.
+
+PRIVACY: ``repr`` never includes the patient name.
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+# Fixed per-entry cost on top of the strings: the record, its key and the
+# OrderedDict node (measured on CPython 3.11, rounded up)
+_ENTRY_OVERHEAD = 200
+
+
+class StudyRecord:
+    """Demographics parsed from one study's DICOM header."""
+
+    __slots__ = ("acc", "name", "sex", "age", "mod", "study_desc", "source")
+
+    # Mapping-view key -> slot
+    _KEYS = {"Acc": "acc", "_Name": "name", "Sex": "sex", "Age": "age",
+             "Mod": "mod", "StudyDesc": "study_desc", "_source": "source"}
+
+    def __init__(self, acc="", name="", sex="", age="", mod="", study_desc="",
+                 source=""):
+        for slot, value in zip(self.__slots__,
+                               (acc, name, sex, age, mod, study_desc, source)):
+            object.__setattr__(self, slot, value)
+
+    @classmethod
+    def from_fields(cls, data, source=None):
+        """Build a record from an ``_extract_fields``-style mapping."""
+        if isinstance(data, cls):
+            return data if source is None else data.with_source(source)
+        return cls(acc=data.get("Acc", ""), name=data.get("_Name", ""),
+                   sex=data.get("Sex", ""), age=data.get("Age", ""),
+                   mod=data.get("Mod", ""), study_desc=data.get("StudyDesc", ""),
+                   source=data.get("_source", "") if source is None else source)
+
+    def with_source(self, source):
+        """Return this record tagged with the lookup *source*."""
+        if source == self.source:
+            return self
+        return StudyRecord(self.acc, self.name, self.sex, self.age, self.mod,
+                           self.study_desc, source)
+
+    def __setattr__(self, key, value):
+        raise AttributeError("StudyRecord is immutable")
+
+    def __delattr__(self, key):
+        raise AttributeError("StudyRecord is immutable")
+
+    # ------------------------------------------------------------------
+    # Read-only mapping view
+    # ------------------------------------------------------------------
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, self._KEYS[key])
+        except KeyError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key, value):
+        raise TypeError("StudyRecord is immutable")
+
+    def __contains__(self, key):
+        slot = self._KEYS.get(key)
+        return slot is not None and bool(getattr(self, slot))
+
+    def get(self, key, default=None):
+        """Like ``dict.get``; empty fields count as missing."""
+        slot = self._KEYS.get(key)
+        value = getattr(self, slot) if slot is not None else ""
+        return value if value else default
+
+    def to_dict(self):
+        return {key: getattr(self, slot) for key, slot in self._KEYS.items()
+                if getattr(self, slot)}
+
+    # ------------------------------------------------------------------
+
+    def _values(self):
+        return tuple(getattr(self, slot) for slot in self.__slots__)
+
+    def __eq__(self, other):
+        if not isinstance(other, StudyRecord):
+            return NotImplemented
+        return self._values() == other._values()
+
+    def __hash__(self):
+        return hash(self._values())
+
+    def __repr__(self):
+        return f"StudyRecord(acc={self.acc!r}, mod={self.mod!r}, source={self.source!r})"
+
+    @property
+    def nbytes(self):
+        """Approximate memory held by this record."""
+        return sys.getsizeof(self) + sum(sys.getsizeof(v) for v in self._values())
+
+
+class StudyCache:
+    """Thread-safe accession -> :class:`StudyRecord` LRU.
+
+    Bounded by *max_entries* and *max_bytes* (approximate; 0 = no byte
+    limit); entries older than *ttl* seconds (0 = never) are treated as
+    missing and dropped.  The newest entry is always kept, even if it alone
+    is over the byte limit.
+    """
+
+    def __init__(self, max_entries=5, *, max_bytes=0, ttl=0.0, clock=time.monotonic):
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max(0, max_bytes)
+        self.ttl = ttl
+        self.clock = clock
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+        self._entries = OrderedDict()  # acc -> (record, stored_at, nbytes)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        """Accessions, least recently used first."""
+        with self._lock:
+            return iter(list(self._entries))
+
+    def __contains__(self, acc):
+        with self._lock:
+            entry = self._entries.get(acc)
+            return entry is not None and not self._stale(entry)
+
+    def __getitem__(self, acc):
+        """Peek at *acc* without touching LRU order or counters."""
+        with self._lock:
+            return self._entries[acc][0]
+
+    def get(self, acc):
+        """Return the record for *acc* (most recently used), or *None*."""
+        with self._lock:
+            entry = self._entries.get(acc)
+            if entry is not None and self._stale(entry):
+                self._drop(acc)
+                self.expired += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(acc)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, acc, record):
+        """Store *record* under *acc*; return the accessions evicted."""
+        nbytes = record.nbytes + sys.getsizeof(acc) + _ENTRY_OVERHEAD
+        with self._lock:
+            if acc in self._entries:
+                self._drop(acc)
+            self._entries[acc] = (record, self.clock(), nbytes)
+            self.bytes += nbytes
+            evicted = []
+            if len(self._entries) > self.max_entries or self._over_bytes():
+                self._purge_expired()
+            while len(self._entries) > 1 and (
+                    len(self._entries) > self.max_entries or self._over_bytes()):
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.evictions += 1
+                evicted.append(oldest)
+            return evicted
+
+    def purge_expired(self):
+        """Drop every entry past its TTL; return how many went."""
+        with self._lock:
+            return self._purge_expired()
+
+    def stats(self):
+        with self._lock:
+            return {"size": len(self._entries), "bytes": self.bytes,
+                    "hits": self.hits, "misses": self.misses,
+                    "evictions": self.evictions, "expired": self.expired}
+
+    # ------------------------------------------------------------------
+    # Internals (caller holds _lock)
+    # ------------------------------------------------------------------
+
+    def _stale(self, entry):
+        return self.ttl > 0 and self.clock() - entry[1] > self.ttl
+
+    def _over_bytes(self):
+        return self.max_bytes and self.bytes > self.max_bytes
+
+    def _drop(self, acc):
+        _, _, nbytes = self._entries.pop(acc)
+        self.bytes -= nbytes
+
+    def _purge_expired(self):
+        stale = [acc for acc, entry in self._entries.items() if self._stale(entry)]
+        for acc in stale:
+            self._drop(acc)
+        self.expired += len(stale)
+        return len(stale)
@@ -0,0 +1,189 @@
+"""
+Study Index — persistent accession -> study-folder map for the DICOM cache.
+
+Every study folder DicomMonitor parses is recorded here, keyed by its
+study-UID folder name and stamped with the folder mtime.  The index is
+saved to ``data/study_index.json`` and loaded again at startup, so the first
+PSOne accession after a service restart resolves with one dict lookup
+instead of a crawl of the InteleViewer cache.
+
+PRIVACY: patient name is never stored — only the fields that are already
+allowed in ``current_study.json``.
+"""
+
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+_INDEX_VERSION = 1
+
+# Same allow-list as the state file (no patient name)
+_INDEX_FIELDS = ("Acc", "Sex", "Age", "Mod", "StudyDesc")
+
+
+class StudyIndex:
+    """On-disk index of study folders in the DICOM cache.
+
+    Entries are keyed by study-UID folder name::
+
+        {"<study_uid>": {"mtime_ns": int, "core": "RAD-1-CT",
+                         "Acc": ..., "Sex": ..., "Age": ..., "Mod": ...,
+                         "StudyDesc": ...}}
+
+    An entry is *current* while the folder's mtime still matches the one
+    recorded.  Only folders that yielded a parseable DICOM header are
+    recorded, so folders still being written are retried later.
+
+    Thread-safe: the prefetch workers record entries concurrently with the
+    main loop.
+    """
+
+    def __init__(self, path, *, save_interval=30.0):
+        self.path = path
+        self.save_interval = save_interval
+        self._entries = {}
+        self._by_acc = {}  # core accession -> folder uid
+        self._dirty = False
+        self._last_save = 0.0
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, uid):
+        return uid in self._entries
+
+    # ------------------------------------------------------------------
+    # Lookup / update
+    # ------------------------------------------------------------------
+
+    def lookup(self, core_acc):
+        """Return the folder uid recorded for *core_acc*, or ``""``."""
+        if not core_acc:
+            return ""
+        with self._lock:
+            return self._by_acc.get(core_acc, "")
+
+    def get(self, uid):
+        """Return the stored fields for *uid* (a copy), or *None*."""
+        with self._lock:
+            entry = self._entries.get(uid)
+            if entry is None:
+                return None
+            return {key: entry.get(key, "") for key in _INDEX_FIELDS}
+
+    def is_current(self, uid, mtime_ns):
+        with self._lock:
+            entry = self._entries.get(uid)
+            return entry is not None and entry["mtime_ns"] == mtime_ns
+
+    def record(self, uid, mtime_ns, core_acc, data):
+        """Record the parsed header *data* of folder *uid*."""
+        entry = {"mtime_ns": int(mtime_ns), "core": core_acc or ""}
+        for key in _INDEX_FIELDS:
+            val = data.get(key, "")
+            if val:
+                entry[key] = re.sub(r"[\x00-\x1f]", "", str(val))
+
+        with self._lock:
+            old = self._entries.get(uid)
+            if old is not None and self._by_acc.get(old["core"]) == uid:
+                del self._by_acc[old["core"]]
+            self._entries[uid] = entry
+            if entry["core"]:
+                self._by_acc[entry["core"]] = uid
+            self._dirty = True
+
+    def forget(self, uid):
+        """Drop *uid* (folder deleted or no longer matching)."""
+        with self._lock:
+            entry = self._entries.pop(uid, None)
+            if entry is None:
+                return
+            if self._by_acc.get(entry["core"]) == uid:
+                del self._by_acc[entry["core"]]
+            self._dirty = True
+
+    def prune(self, live_uids):
+        """Forget every entry whose folder is not in *live_uids*."""
+        with self._lock:
+            gone = [uid for uid in self._entries if uid not in live_uids]
+            for uid in gone:
+                self.forget(uid)
+        return len(gone)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def load(self):
+        """Load the index from disk.  A missing or corrupt file starts empty."""
+        try:
+            with open(self.path, encoding="utf-8") as fh:
+                raw = json.load(fh)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError):
+            log.warning("Study index unreadable — starting empty", exc_info=True)
+            return
+
+        if not isinstance(raw, dict) or raw.get("version") != _INDEX_VERSION:
+            log.info("Study index version mismatch — starting empty")
+            return
+
+        for uid, entry in (raw.get("studies") or {}).items():
+            try:
+                mtime_ns = int(entry["mtime_ns"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            self._entries[uid] = dict(entry, mtime_ns=mtime_ns,
+                                      core=str(entry.get("core", "")))
+            if self._entries[uid]["core"]:
+                self._by_acc[self._entries[uid]["core"]] = uid
+
+        self._dirty = False
+        self._last_save = time.monotonic()
+        log.info("Study index loaded (%d studies)", len(self._entries))
+
+    def save(self, force=False):
+        """Write the index atomically if it changed.
+
+        Unless *force* is set, writes are rate-limited to one per
+        ``save_interval`` seconds so bulk indexing doesn't hammer the disk.
+        """
+        if not self._dirty:
+            return False
+        now = time.monotonic()
+        if not force and now - self._last_save < self.save_interval:
+            return False
+
+        with self._lock:
+            payload = json.dumps({"version": _INDEX_VERSION,
+                                  "studies": self._entries})
+            self._dirty = False
+
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        tmp_fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(tmp_fd, "w", encoding="utf-8") as fh:
+                fh.write(payload)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            log.warning("Failed to write study index", exc_info=True)
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            self._dirty = True
+            return False
+
+        self._last_save = now
+        log.debug("Study index saved (%d studies)", len(self._entries))
+        return True
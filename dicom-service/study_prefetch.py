@@ -0,0 +1,188 @@
+"""
+Study Prefetch — parse new InteleViewer study folders before they're needed.
+
+A watchdog observer on the DICOM cache root reports files as InteleViewer
+writes them.  Each event is mapped to its top-level study-UID folder and
+queued; once a folder has been quiet for ``debounce`` seconds (so the first
+files are no longer half-written) a worker thread parses its header into
+the monitor's LRU cache.  Large studies keep writing for minutes, so a
+folder is also processed once it has been pending for ``max_wait`` seconds.
+By the time PowerScribe logs the accession, :meth:`DicomMonitor._try_match`
+is a cache hit.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from watchdog.events import FileSystemEventHandler
+
+from dicom_monitor import _looks_like_uid
+
+log = logging.getLogger(__name__)
+
+
+# ======================================================================
+# watchdog handler — maps cache events to study folders
+# ======================================================================
+
+class CacheFolderHandler(FileSystemEventHandler):
+    """watchdog handler for the DICOM cache root (recursive)."""
+
+    def __init__(self, prefetcher, cache_dir):
+        super().__init__()
+        self.prefetcher = prefetcher
+        self.cache_dir = os.path.abspath(cache_dir)
+
+    def on_created(self, event):
+        self._notify(event.src_path)
+
+    def on_modified(self, event):
+        self._notify(event.src_path)
+
+    def on_moved(self, event):
+        self._notify(event.dest_path)
+
+    def _notify(self, path):
+        folder = self._study_folder(path)
+        if folder:
+            self.prefetcher.notify(folder)
+
+    def _study_folder(self, path):
+        """Return ``<cache_dir>/<study_uid>`` for *path*, or ``""``."""
+        try:
+            rel = os.path.relpath(os.path.abspath(path), self.cache_dir)
+        except ValueError:  # different drive on Windows
+            return ""
+        top = rel.split(os.sep, 1)[0]
+        if top in (".", "..") or not _looks_like_uid(top):
+            return ""
+        return os.path.join(self.cache_dir, top)
+
+
+# ======================================================================
+# StudyPrefetcher — debounced, bounded worker pool
+# ======================================================================
+
+class StudyPrefetcher:
+    """Debounce study-folder events and prefetch them on worker threads.
+
+    At most *workers* folders are parsed concurrently, and at most
+    *max_pending* folders wait in the queue (oldest dropped first — the
+    regular search still finds them).  Folders that prefetched successfully
+    are remembered and ignored until they drop out of that memory.
+    """
+
+    def __init__(self, monitor, *, workers=2, debounce=1.5, max_wait=None,
+                 max_pending=256, max_done=1024):
+        self.monitor = monitor
+        self.workers = max(1, workers)
+        self.debounce = debounce
+        self.max_wait = max_wait if max_wait is not None else 4 * debounce
+        self.max_pending = max_pending
+        self.max_done = max_done
+
+        self.prefetched = 0
+        self.empty = 0
+        self.dropped = 0
+
+        self._pending = OrderedDict()  # folder -> [first event, last event]
+        self._done = OrderedDict()     # folders already prefetched
+        self._cond = threading.Condition()
+        self._threads = []
+        self._running = False
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self):
+        self._running = True
+        for i in range(self.workers):
+            t = threading.Thread(target=self._worker, name=f"prefetch-{i}",
+                                 daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def stop(self, timeout=2.0):
+        with self._cond:
+            self._running = False
+            self._pending.clear()
+            self._cond.notify_all()
+        for t in self._threads:
+            t.join(timeout=timeout)
+        self._threads = []
+        log.info("Prefetch stopped: %s", self.stats())
+
+    # ------------------------------------------------------------------
+    # Queue
+    # ------------------------------------------------------------------
+
+    def notify(self, folder):
+        """Record activity in *folder*; restarts its quiet window."""
+        now = time.monotonic()
+        with self._cond:
+            if folder in self._done:
+                return
+            times = self._pending.get(folder)
+            if times is None:
+                self._pending[folder] = [now, now]
+            else:
+                times[1] = now
+            while len(self._pending) > self.max_pending:
+                self._pending.popitem(last=False)
+                self.dropped += 1
+            self._cond.notify()
+
+    def _next_ready(self):
+        """Pop the first folder that is quiet (or has waited long enough).
+
+        Returns ``(folder, wait)``: *folder* is ``""`` if none is ready and
+        *wait* is how long until the earliest one will be.
+        """
+        now = time.monotonic()
+        wait = None
+        for folder, (first, last) in self._pending.items():
+            remaining = min(self.debounce - (now - last),
+                            self.max_wait - (now - first))
+            if remaining <= 0:
+                del self._pending[folder]
+                return folder, 0.0
+            if wait is None or remaining < wait:
+                wait = remaining
+        return "", wait
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while True:
+                    if not self._running:
+                        return
+                    folder, wait = self._next_ready()
+                    if folder:
+                        break
+                    self._cond.wait(timeout=wait)
+
+            try:
+                acc = self.monitor.prefetch_folder(folder)
+            except Exception:
+                log.exception("Prefetch failed for %s", folder)
+                continue
+            if acc:
+                with self._cond:
+                    self.prefetched += 1
+                    self._done[folder] = True
+                    while len(self._done) > self.max_done:
+                        self._done.popitem(last=False)
+                log.debug("Prefetched %s from %s", acc, os.path.basename(folder))
+            else:
+                # Probably still half-written; later events re-queue it
+                with self._cond:
+                    self.empty += 1
+
+    def stats(self):
+        with self._cond:
+            return {"prefetched": self.prefetched, "empty": self.empty,
+                    "dropped": self.dropped, "pending": len(self._pending)}
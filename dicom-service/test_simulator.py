@@ -49,7 +49,7 @@ def show_state():
             content = f.read().strip()
         if content:
             data = json.loads(content)
-            if data:
+            if data.get("Acc"):
                 for k, v in data.items():
                     print(f"    {k}: {v}")
             else:
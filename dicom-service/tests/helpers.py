@@ -0,0 +1,11 @@
+"""Shared test helpers."""
+
+
+class FakeClock:
+    """Callable clock for the modules' ``clock=`` hooks; tests move ``now``."""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
@@ -186,12 +186,13 @@ def watch_state(stop_event, interval=0.5):
     while not stop_event.is_set():
         current = read_state()
         if current != last:
-            if current:
+            # A cleared state still carries Gen / Written
+            if current.get("Acc"):
                 print(f"\n  ** DETECTION: current_study.json updated:")
                 for k, v in current.items():
                     print(f"     {k}: {v}")
             else:
-                print(f"\n  ** State cleared (current_study.json is empty)")
+                print(f"\n  ** State cleared (no study in current_study.json)")
             last = current
             print("\n> ", end="", flush=True)
         stop_event.wait(interval)
@@ -8,7 +8,7 @@ import unittest
 # Ensure the parent package is importable
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
-from dicom_monitor import DicomMonitor, _extract_core_acc
+from dicom_monitor import DicomMonitor, _PSOneLogTail, _extract_core_acc
 
 
 class TestExtractCoreAcc(unittest.TestCase):
@@ -104,5 +104,86 @@ class TestParsePSOneLog(unittest.TestCase):
         self.assertEqual(DicomMonitor._parse_psone_log("/nonexistent/path.log"), "")
 
 
+class TestPSOneLogTail(unittest.TestCase):
+    """Test the incremental PSOnePerf.log reader."""
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".log")
+        os.close(fd)
+        self.addCleanup(lambda: os.path.exists(self.path) and os.unlink(self.path))
+
+    def _append(self, text):
+        with open(self.path, "a", encoding="utf-8") as fh:
+            fh.write(text)
+
+    def test_unchanged_file_returns_none(self):
+        self._append("10:00 OpenReport SingleAccession RAD-1-CT\n")
+        tail = _PSOneLogTail(self.path)
+        self.assertEqual(tail.poll(), "RAD-1-CT")
+        self.assertIsNone(tail.poll())
+
+    def test_reads_only_appended_bytes(self):
+        self._append("10:00 filler line\n" * 1000)
+        self._append("10:00 OpenReport SingleAccession RAD-1-CT\n")
+        tail = _PSOneLogTail(self.path)
+        self.assertEqual(tail.poll(), "RAD-1-CT")
+        before = tail.bytes_read
+        line = "10:01 OpenReport SingleAccession RAD-2-MR\n"
+        self._append(line)
+        self.assertEqual(tail.poll(), "RAD-2-MR")
+        self.assertEqual(tail.bytes_read - before, len(line))
+
+    def test_append_without_accession_keeps_last(self):
+        self._append("10:00 OpenReport SingleAccession RAD-1-CT\n")
+        tail = _PSOneLogTail(self.path)
+        tail.poll()
+        self._append("10:01 SomeOtherAction foo\n")
+        self.assertEqual(tail.poll(), "RAD-1-CT")
+
+    def test_backward_scan_across_blocks(self):
+        self._append("10:00 OpenReport SingleAccession RAD-1-CT\n")
+        self._append("10:00 filler line without accession\n" * 200)
+        tail = _PSOneLogTail(self.path, block_size=16)
+        self.assertEqual(tail.poll(), "RAD-1-CT")
+
+    def test_truncation_rescans(self):
+        self._append("10:00 filler\n" * 100)
+        self._append("10:00 OpenReport SingleAccession RAD-1-CT\n")
+        tail = _PSOneLogTail(self.path)
+        tail.poll()
+        with open(self.path, "w", encoding="utf-8") as fh:
+            fh.write("11:00 OpenReport SingleAccession RAD-9-US\n")
+        self.assertEqual(tail.poll(), "RAD-9-US")
+
+    def test_rotation_rescans(self):
+        self._append("10:00 OpenReport SingleAccession RAD-1-CT\n")
+        tail = _PSOneLogTail(self.path)
+        tail.poll()
+        rotated = self.path + ".1"
+        os.replace(self.path, rotated)
+        self.addCleanup(os.unlink, rotated)
+        self._append("11:00 OpenReport SingleAccession RAD-5-MR\n" + "x" * 200 + "\n")
+        self.assertEqual(tail.poll(), "RAD-5-MR")
+
+    def test_partial_line_completed_later(self):
+        self._append("10:00 OpenReport SingleAccession RAD-1-CT\n")
+        tail = _PSOneLogTail(self.path)
+        tail.poll()
+        self._append("10:01 OpenReport Single")
+        self.assertEqual(tail.poll(), "RAD-1-CT")
+        self._append("Accession RAD-2-CT\n")
+        self.assertEqual(tail.poll(), "RAD-2-CT")
+
+    def test_forget_change_reports_again(self):
+        self._append("10:00 OpenReport SingleAccession RAD-1-CT\n")
+        tail = _PSOneLogTail(self.path)
+        tail.poll()
+        tail.forget_change()
+        self.assertEqual(tail.poll(), "RAD-1-CT")
+
+    def test_missing_file(self):
+        self.assertIsNone(_PSOneLogTail("/nonexistent/path.log").poll())
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -4,15 +4,17 @@ import json
 import os
 import sys
 import tempfile
+import time
 import unittest
+from unittest.mock import patch
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
-from dicom_monitor import DicomMonitor
+from dicom_monitor import DicomMonitor, _HeaderMemo, _NO_HEADER
 
 
 class TestLRUCache(unittest.TestCase):
-    """Test the DicomMonitor LRU cache (OrderedDict, default 5 entries)."""
+    """Test the DicomMonitor LRU cache (StudyCache, default 5 entries)."""
 
     def _make_monitor(self, cache_size=5):
         data_dir = tempfile.mkdtemp()
@@ -55,6 +57,13 @@ class TestLRUCache(unittest.TestCase):
         self.assertIn("C", m._cache)
         self.assertIn("D", m._cache)
 
+    def test_hit_does_not_mutate_cached_record(self):
+        m = self._make_monitor()
+        m._add_to_cache("RAD-1-CT", {"Acc": "RAD-1-CT", "_Name": "DOE^JOHN"})
+        self.assertEqual(m._try_match("RAD-1-CT")["_source"], "cache")
+        self.assertEqual(m._cache["RAD-1-CT"].source, "")
+        self.assertEqual(m.cache_stats()["hits"], 1)
+
     def test_cache_size_one(self):
         m = self._make_monitor(cache_size=1)
         m._add_to_cache("A", {"Acc": "A", "_Name": "X"})
@@ -64,6 +73,69 @@ class TestLRUCache(unittest.TestCase):
         self.assertIn("B", m._cache)
 
 
+class TestHeaderMemo(unittest.TestCase):
+    """Test the (folder, mtime_ns) header memo."""
+
+    def test_hit_and_miss_counts(self):
+        memo = _HeaderMemo()
+        self.assertIsNone(memo.get("/c/1.2", 100))
+        memo.put("/c/1.2", 100, {"Acc": "A", "_Name": "X"})
+        self.assertEqual(memo.get("/c/1.2", 100)["Acc"], "A")
+        self.assertEqual(memo.stats()["hits"], 1)
+        self.assertEqual(memo.stats()["misses"], 1)
+
+    def test_mtime_change_is_miss(self):
+        memo = _HeaderMemo()
+        memo.put("/c/1.2", 100, {"Acc": "A"})
+        self.assertIsNone(memo.get("/c/1.2", 101))
+
+    def test_no_header_marker(self):
+        memo = _HeaderMemo()
+        memo.put("/c/1.2", 100, None)
+        self.assertIs(memo.get("/c/1.2", 100), _NO_HEADER)
+
+    def test_no_header_marker_expires(self):
+        memo = _HeaderMemo(negative_ttl=0.0)
+        memo.put("/c/1.2", 100, None)
+        time.sleep(0.01)
+        self.assertIsNone(memo.get("/c/1.2", 100))
+
+    def test_returns_immutable_records(self):
+        memo = _HeaderMemo()
+        memo.put("/c/1.2", 100, {"Acc": "A"})
+        with self.assertRaises(TypeError):
+            memo.get("/c/1.2", 100)["_source"] = "cache"
+        memo.get("/c/1.2", 100).with_source("cache")
+        self.assertNotIn("_source", memo.get("/c/1.2", 100))
+
+    def test_lru_eviction(self):
+        memo = _HeaderMemo(max_entries=2)
+        memo.put("a", 1, {"Acc": "A"})
+        memo.put("b", 1, {"Acc": "B"})
+        memo.get("a", 1)
+        memo.put("c", 1, {"Acc": "C"})
+        self.assertIsNone(memo.get("b", 1))
+        self.assertIsNotNone(memo.get("a", 1))
+        self.assertEqual(memo.stats()["evictions"], 1)
+        self.assertEqual(len(memo), 2)
+
+    def test_repeated_ticks_parse_once(self):
+        cache_dir = tempfile.mkdtemp()
+        data_dir = tempfile.mkdtemp()
+        self.addCleanup(lambda: _rmtree(cache_dir))
+        self.addCleanup(lambda: _rmtree(data_dir))
+        for i in range(3):
+            os.makedirs(os.path.join(cache_dir, f"1.2.{i}"))
+        m = DicomMonitor(cache_dir=cache_dir, data_dir=data_dir)
+
+        with patch.object(m, "_parse_first_dicom_in_folder",
+                          return_value={"Acc": "OTHER-1-CT", "_Name": "X"}) as parse:
+            for _ in range(5):
+                self.assertIsNone(m._find_in_recent_folders("RAD-1-CT"))
+        self.assertEqual(parse.call_count, 3)
+        self.assertEqual(m._memo.stats()["hits"], 12)
+
+
 class TestStateFileWrite(unittest.TestCase):
     """Test _write_state() privacy filtering and atomic writes."""
 
@@ -117,7 +189,7 @@ class TestStateFileWrite(unittest.TestCase):
         m._write_state({})
         with open(m.state_file, encoding="utf-8") as fh:
             data = json.load(fh)
-        self.assertEqual(data, {})
+        self.assertEqual(set(data), {"Gen", "Written"})
 
     def test_control_chars_stripped(self):
         m = self._make_monitor()
@@ -140,7 +212,7 @@ class TestStateFileWrite(unittest.TestCase):
         })
         with open(m.state_file, encoding="utf-8") as fh:
             data = json.load(fh)
-        allowed = {"Acc", "Sex", "Age", "Mod", "StudyDesc"}
+        allowed = {"Acc", "Sex", "Age", "Mod", "StudyDesc", "Gen", "Written"}
         self.assertTrue(set(data.keys()).issubset(allowed))
 
     def test_creates_data_dir(self):
@@ -150,6 +222,36 @@ class TestStateFileWrite(unittest.TestCase):
         m._write_state({"Acc": "X"})
         self.assertTrue(os.path.isfile(m.state_file))
 
+    def test_unchanged_state_skipped(self):
+        m = self._make_monitor()
+        self.assertTrue(m._write_state({}))
+        mtime = os.stat(m.state_file).st_mtime_ns
+        self.assertFalse(m._write_state({"_Name": "DOE^JOHN"}))
+        self.assertFalse(m._write_state({}))
+        self.assertEqual(os.stat(m.state_file).st_mtime_ns, mtime)
+        self.assertEqual(m.state_write_stats()["written"], 1)
+        self.assertEqual(m.state_write_stats()["skipped"], 2)
+
+    def test_generation_increases(self):
+        m = self._make_monitor()
+        gens = []
+        for acc in ("A", "B", "B", "C"):
+            m._write_state({"Acc": acc})
+            with open(m.state_file, encoding="utf-8") as fh:
+                data = json.load(fh)
+            gens.append(data["Gen"])
+            self.assertIsInstance(data["Written"], float)
+        self.assertEqual(gens, [1, 2, 2, 3])
+
+    def test_generation_continues_after_restart(self):
+        m = self._make_monitor()
+        m._write_state({"Acc": "A"})
+        m._write_state({})
+        m2 = DicomMonitor(cache_dir=m.cache_dir, data_dir=m.data_dir)
+        m2._write_state({})  # first write always lands
+        with open(m2.state_file, encoding="utf-8") as fh:
+            self.assertEqual(json.load(fh)["Gen"], 3)
+
 
 class TestResetState(unittest.TestCase):
     """Test DicomMonitor.reset_state()."""
@@ -175,7 +277,7 @@ class TestResetState(unittest.TestCase):
         m.reset_state("test")
         with open(m.state_file, encoding="utf-8") as fh:
             data = json.load(fh)
-        self.assertEqual(data, {})
+        self.assertEqual(set(data), {"Gen", "Written"})
 
 
 def _rmtree(path):
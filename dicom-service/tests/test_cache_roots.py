@@ -0,0 +1,160 @@
+"""Tests for several DICOM cache roots ranked as one cache."""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from dicom_monitor import DicomMonitor, _CacheRoots
+from study_index import StudyIndex
+from tests.helpers import FakeClock
+
+
+class _RootsCase(unittest.TestCase):
+
+    def setUp(self):
+        self.fast = tempfile.mkdtemp()
+        self.slow = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.fast, True)
+        self.addCleanup(shutil.rmtree, self.slow, True)
+
+    def _mkdir(self, root, uid, mtime):
+        path = os.path.join(root, uid)
+        os.makedirs(path, exist_ok=True)
+        os.utime(path, ns=(mtime, mtime))
+        return path
+
+
+class TestCacheRoots(_RootsCase):
+    """Test merged ranking, per-root health and latency stats."""
+
+    def _roots(self, **kwargs):
+        roots = _CacheRoots([self.fast, self.slow], **kwargs)
+        self.addCleanup(roots.close)
+        return roots
+
+    def test_merged_newest_first(self):
+        self._mkdir(self.fast, "1.2.1", 1_000)
+        self._mkdir(self.slow, "1.2.2", 4_000)
+        self._mkdir(self.fast, "1.2.3", 3_000)
+        self._mkdir(self.slow, "1.2.4", 2_000)
+        roots = self._roots()
+        added, removed, touched = roots.refresh()
+        self.assertEqual(added, {"1.2.1", "1.2.2", "1.2.3", "1.2.4"})
+        self.assertEqual([uid for _, uid, _ in roots.top(3)],
+                         ["1.2.2", "1.2.3", "1.2.4"])
+        self.assertEqual(len(roots), 4)
+
+    def test_duplicate_uid_ranks_newest_copy(self):
+        self._mkdir(self.fast, "1.2.1", 1_000)
+        newer = self._mkdir(self.slow, "1.2.1", 5_000)
+        roots = self._roots()
+        roots.refresh()
+        self.assertEqual(roots.top(), [(5_000, "1.2.1", newer)])
+        self.assertEqual(roots.folders["1.2.1"], (5_000, newer))
+
+    def test_unreachable_root_skipped(self):
+        self._mkdir(self.fast, "1.2.1", 1_000)
+        shutil.rmtree(self.slow)
+        roots = self._roots()
+        self.assertIsNotNone(roots.refresh())
+        self.assertEqual([uid for _, uid, _ in roots.top()], ["1.2.1"])
+        stats = roots.stats()
+        self.assertTrue(stats[self.fast]["healthy"])
+        self.assertFalse(stats[self.slow]["healthy"])
+        self.assertEqual(stats[self.slow]["failures"], 1)
+
+    def test_none_when_no_root_listed(self):
+        shutil.rmtree(self.fast)
+        shutil.rmtree(self.slow)
+        self.assertIsNone(self._roots().refresh())
+
+    def test_slow_listing_does_not_block(self):
+        self._mkdir(self.fast, "1.2.1", 1_000)
+        self._mkdir(self.slow, "1.2.2", 9_000)
+        roots = self._roots(threaded=True, list_timeout=0.05)
+        release = threading.Event()
+        slow_root = roots.roots[1]
+        real_scan = slow_root.snapshot.scan
+
+        def _hang():
+            release.wait(5)
+            return real_scan()
+
+        with patch.object(slow_root.snapshot, "scan", side_effect=_hang):
+            roots.refresh()
+            self.assertEqual([uid for _, uid, _ in roots.top()], ["1.2.1"])
+            self.assertEqual(roots.stats()[self.slow]["timeouts"], 1)
+            release.set()
+            slow_root.listing.result(timeout=5)
+            roots.refresh()
+        self.assertEqual([uid for _, uid, _ in roots.top()], ["1.2.2", "1.2.1"])
+        self.assertTrue(roots.stats()[self.slow]["healthy"])
+
+    def test_slow_probe_cools_root_down(self):
+        clock = FakeClock()
+        self._mkdir(self.fast, "1.2.1", 1_000)
+        slow_folder = self._mkdir(self.slow, "1.2.2", 9_000)
+        roots = self._roots(slow_probe=1.0, cooldown=30.0, clock=clock)
+        roots.refresh()
+        roots.record_probe(slow_folder, 2.5)
+        self.assertEqual([uid for _, uid, _ in roots.top()], ["1.2.1"])
+        self.assertFalse(roots.usable(slow_folder))
+        stats = roots.stats()[self.slow]
+        self.assertEqual((stats["probes"], stats["slow"]), (1, 1))
+        self.assertEqual(stats["probe_ms_max"], 2500.0)
+        clock.now += 31
+        self.assertEqual([uid for _, uid, _ in roots.top()], ["1.2.2", "1.2.1"])
+
+
+class TestMonitorRoots(_RootsCase):
+    """Test DicomMonitor searching and indexing across roots."""
+
+    def setUp(self):
+        super().setUp()
+        self.data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.data_dir, True)
+        self.headers = {
+            self._mkdir(self.fast, "1.2.1", 2_000): {"_Name": "DOE^JOHN", "Acc": "RAD-1-CT"},
+            self._mkdir(self.slow, "1.2.2", 1_000): {"_Name": "DOE^JOHN", "Acc": "RAD-2-MR"},
+        }
+        parse = patch.object(DicomMonitor, "_parse_first_dicom_in_folder",
+                             autospec=True,
+                             side_effect=lambda m, folder: dict(self.headers[folder]))
+        parse.start()
+        self.addCleanup(parse.stop)
+
+    def _monitor(self, **kwargs):
+        m = DicomMonitor(cache_dir=[self.fast, self.slow], data_dir=self.data_dir,
+                         **kwargs)
+        self.addCleanup(m.close)
+        return m
+
+    def test_single_root_string_still_accepted(self):
+        m = DicomMonitor(cache_dir=self.fast, data_dir=self.data_dir)
+        self.assertEqual(m.cache_dirs, [self.fast])
+        self.assertFalse(m.root_threads)
+
+    def test_search_finds_study_in_second_root(self):
+        m = self._monitor()
+        self.assertTrue(m.root_threads)
+        data = m._find_in_recent_folders("RAD-2-MR")
+        self.assertEqual(data["Acc"], "RAD-2-MR")
+        stats = m.root_stats()
+        self.assertEqual(stats[self.slow]["probes"], 1)
+        self.assertEqual(stats[self.fast]["probes"], 1)
+
+    def test_index_resolves_folder_in_any_root(self):
+        index = StudyIndex(os.path.join(self.data_dir, "index.json"))
+        m = self._monitor(index=index)
+        self.assertEqual(m.update_index(), 2)
+        self.assertEqual(m._find_in_index("RAD-2-MR")["_source"], "index")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,160 @@
+"""Tests for the loopback control API (leases, status, queued commands)."""
+
+import http.client
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from control_api import ControlServer, Leases, call, read_control_file
+from dicom_monitor import DicomMonitor
+from tests.helpers import FakeClock
+
+
+class TestLeases(unittest.TestCase):
+    """Test per-client lease renewal and expiry."""
+
+    def test_independent_leases(self):
+        clock = FakeClock()
+        leases = Leases(clock=clock)
+        leases.renew("report-check", 30)
+        leases.renew("bruce-helper", 60)
+        clock.now += 40
+        self.assertEqual(list(leases.active()), ["bruce-helper"])
+        leases.renew("report-check", 30)
+        self.assertEqual(sorted(leases.active()), ["bruce-helper", "report-check"])
+
+    def test_release(self):
+        leases = Leases()
+        leases.renew("report-check")
+        self.assertTrue(leases.release("report-check"))
+        self.assertFalse(leases.release("report-check"))
+        self.assertEqual(leases.active(), {})
+
+    def test_ttl_clamped(self):
+        leases = Leases()
+        self.assertEqual(leases.renew("a", 0), 1.0)
+        self.assertEqual(leases.renew("a", 1e9), 600.0)
+
+
+class TestControlServer(unittest.TestCase):
+    """Test the HTTP endpoint over a real loopback socket."""
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.data_dir, True)
+        self.commands = {"search": MagicMock(return_value="RAD-1-CT"),
+                         "reset": MagicMock(return_value=None),
+                         "shutdown": MagicMock(return_value=None)}
+        self.server = ControlServer(
+            self.data_dir, commands=self.commands,
+            status=lambda: {"search": {"search_active": False}},
+            wake=self._wake)
+        self.server.start()
+        self.addCleanup(self.server.stop)
+        self.info = read_control_file(self.data_dir)
+
+    def _wake(self):
+        # Stand-in for the scheduler: run the queued command off-thread
+        threading.Thread(target=self.server.run_pending, name="main-loop",
+                         daemon=True).start()
+
+    def test_control_file(self):
+        self.assertEqual(self.info["port"], self.server.port)
+        self.assertEqual(self.info["pid"], os.getpid())
+        self.server.stop()
+        self.assertIsNone(read_control_file(self.data_dir))
+
+    def test_ping(self):
+        reply = call(self.info, "GET", "/ping")
+        self.assertTrue(reply["ok"])
+        self.assertEqual(reply["pid"], os.getpid())
+
+    def test_token_required(self):
+        self.assertIsNone(call(dict(self.info, token="wrong"), "GET", "/ping"))
+        self.assertEqual(self.server.rejected, 1)
+
+    def test_lease_round_trip(self):
+        reply = call(self.info, "POST", "/lease?client=report-check&ttl=30")
+        self.assertEqual((reply["ttl"], reply["clients"]), (30.0, 1))
+        status = call(self.info, "GET", "/status")
+        self.assertIn("report-check", status["leases"])
+        self.assertEqual(status["search"], {"search_active": False})
+        reply = call(self.info, "DELETE", "/lease?client=report-check")
+        self.assertTrue(reply["released"])
+        self.assertEqual(self.server.leases.active(), {})
+
+    def test_lease_needs_client(self):
+        self.assertIsNone(call(self.info, "POST", "/lease"))
+
+    def test_search_runs_on_main_loop(self):
+        reply = call(self.info, "POST", "/search?acc=RAD-1-CT_2")
+        self.assertEqual(reply["result"], "RAD-1-CT")
+        self.commands["search"].assert_called_once_with(accession="RAD-1-CT_2")
+
+    def test_reset_and_shutdown(self):
+        self.assertTrue(call(self.info, "POST", "/reset")["ok"])
+        self.assertTrue(call(self.info, "POST", "/shutdown")["ok"])
+        self.commands["reset"].assert_called_once_with()
+        self.commands["shutdown"].assert_called_once_with()
+
+    def test_failed_command_reported(self):
+        self.commands["reset"].side_effect = RuntimeError("boom")
+        self.assertIsNone(call(self.info, "POST", "/reset"))
+
+    def test_unknown_endpoint(self):
+        self.assertIsNone(call(self.info, "GET", "/nope"))
+
+    def test_status_built_on_main_loop(self):
+        threads = []
+        self.server.commands["status"] = lambda: (
+            threads.append(threading.current_thread()) or {"search": {}})
+        self.assertEqual(call(self.info, "GET", "/status")["search"], {})
+        self.assertEqual(threads[0].name, "main-loop")
+
+    def test_bad_content_length(self):
+        conn = http.client.HTTPConnection("127.0.0.1", self.info["port"], timeout=2)
+        self.addCleanup(conn.close)
+        conn.putrequest("POST", "/reset")
+        conn.putheader("Content-Length", "lots")
+        conn.putheader("X-Control-Token", self.info["token"])
+        conn.endheaders()
+        self.assertEqual(conn.getresponse().status, 400)
+        self.commands["reset"].assert_not_called()
+
+
+class TestMonitorControl(unittest.TestCase):
+    """Test DicomMonitor's force_search and status."""
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, True)
+        self.addCleanup(shutil.rmtree, self.data_dir, True)
+        self.m = DicomMonitor(cache_dir=self.cache_dir, data_dir=self.data_dir)
+
+    def test_force_search_uses_core_accession(self):
+        self.assertEqual(self.m.force_search(" RAD-1-CT_2 "), "RAD-1-CT")
+        self.assertTrue(self.m.search_active)
+        self.assertEqual(self.m.search_target_acc, "RAD-1-CT")
+
+    def test_force_search_rejects_empty(self):
+        self.assertEqual(self.m.force_search("N/A"), "")
+        self.assertFalse(self.m.search_active)
+
+    def test_status_has_no_names(self):
+        self.m._add_to_cache("RAD-1-CT", {"_Name": "DOE^JOHN", "Acc": "RAD-1-CT"})
+        self.m.force_search("RAD-2-CT")
+        status = self.m.status()
+        self.assertEqual(status["search_target"], "RAD-2-CT")
+        self.assertNotIn("DOE", json.dumps(status))
+
+
+if __name__ == "__main__":
+    unittest.main()
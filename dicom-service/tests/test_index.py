@@ -0,0 +1,198 @@
+"""Tests for the persistent study index and index-backed lookups."""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from dicom_monitor import DicomMonitor
+from study_index import StudyIndex
+
+
+def _study(acc, name="DOE^JOHN"):
+    return {"_Name": name, "Acc": acc, "Sex": "M", "Age": "045Y",
+            "Mod": "CT", "StudyDesc": "CT CHEST"}
+
+
+class TestStudyIndex(unittest.TestCase):
+    """Test StudyIndex bookkeeping and persistence."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, True)
+        self.path = os.path.join(self.tmp, "study_index.json")
+
+    def test_record_and_lookup(self):
+        idx = StudyIndex(self.path)
+        idx.record("1.2.3", 100, "RAD-1-CT", _study("RAD-1-CT_1"))
+        self.assertEqual(idx.lookup("RAD-1-CT"), "1.2.3")
+        self.assertTrue(idx.is_current("1.2.3", 100))
+        self.assertFalse(idx.is_current("1.2.3", 101))
+        self.assertEqual(idx.get("1.2.3")["Acc"], "RAD-1-CT_1")
+
+    def test_name_never_stored(self):
+        idx = StudyIndex(self.path)
+        idx.record("1.2.3", 100, "RAD-1-CT", _study("RAD-1-CT"))
+        idx.save(force=True)
+        with open(self.path, encoding="utf-8") as fh:
+            raw = fh.read()
+        self.assertNotIn("DOE", raw)
+        self.assertNotIn("_Name", raw)
+
+    def test_roundtrip(self):
+        idx = StudyIndex(self.path)
+        idx.record("1.2.3", 100, "RAD-1-CT", _study("RAD-1-CT"))
+        idx.record("1.2.4", 200, "RAD-2-MR", _study("RAD-2-MR"))
+        self.assertTrue(idx.save(force=True))
+
+        loaded = StudyIndex(self.path)
+        loaded.load()
+        self.assertEqual(len(loaded), 2)
+        self.assertEqual(loaded.lookup("RAD-2-MR"), "1.2.4")
+        self.assertTrue(loaded.is_current("1.2.3", 100))
+
+    def test_rerecord_moves_accession(self):
+        idx = StudyIndex(self.path)
+        idx.record("1.2.3", 100, "RAD-1-CT", _study("RAD-1-CT"))
+        idx.record("1.2.3", 150, "RAD-9-CT", _study("RAD-9-CT"))
+        self.assertEqual(idx.lookup("RAD-1-CT"), "")
+        self.assertEqual(idx.lookup("RAD-9-CT"), "1.2.3")
+
+    def test_prune(self):
+        idx = StudyIndex(self.path)
+        idx.record("1.2.3", 100, "RAD-1-CT", _study("RAD-1-CT"))
+        idx.record("1.2.4", 200, "RAD-2-MR", _study("RAD-2-MR"))
+        self.assertEqual(idx.prune({"1.2.4"}), 1)
+        self.assertEqual(idx.lookup("RAD-1-CT"), "")
+        self.assertNotIn("1.2.3", idx)
+
+    def test_save_rate_limited(self):
+        idx = StudyIndex(self.path, save_interval=3600)
+        idx.record("1.2.3", 100, "RAD-1-CT", _study("RAD-1-CT"))
+        self.assertTrue(idx.save(force=True))
+        idx.record("1.2.4", 200, "RAD-2-MR", _study("RAD-2-MR"))
+        self.assertFalse(idx.save())
+        self.assertTrue(idx.save(force=True))
+        self.assertFalse(idx.save(force=True))  # nothing dirty
+
+    def test_corrupt_file_starts_empty(self):
+        with open(self.path, "w", encoding="utf-8") as fh:
+            fh.write("{not json")
+        idx = StudyIndex(self.path)
+        idx.load()
+        self.assertEqual(len(idx), 0)
+
+    def test_version_mismatch_starts_empty(self):
+        with open(self.path, "w", encoding="utf-8") as fh:
+            json.dump({"version": 999, "studies": {"1.2.3": {"mtime_ns": 1}}}, fh)
+        idx = StudyIndex(self.path)
+        idx.load()
+        self.assertEqual(len(idx), 0)
+
+
+class TestIndexedSearch(unittest.TestCase):
+    """Test DicomMonitor lookups through the study index."""
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, True)
+        self.addCleanup(shutil.rmtree, self.data_dir, True)
+        self.studies = {}
+        self.parsed = []
+
+    def _add_folder(self, uid, acc):
+        path = os.path.join(self.cache_dir, uid)
+        os.makedirs(path)
+        self.studies[path] = _study(acc)
+        return path
+
+    def _fake_parse(self, folder):
+        self.parsed.append(os.path.basename(folder))
+        data = self.studies.get(folder)
+        return dict(data) if data else None
+
+    def _make_monitor(self, index):
+        m = DicomMonitor(cache_dir=self.cache_dir, data_dir=self.data_dir,
+                         index=index)
+        patcher = patch.object(m, "_parse_first_dicom_in_folder",
+                               side_effect=self._fake_parse)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return m
+
+    def test_update_index_then_lookup(self):
+        for i in range(5):
+            self._add_folder(f"1.2.{i}", f"RAD-{i}-CT")
+        idx = StudyIndex(os.path.join(self.data_dir, "study_index.json"))
+        m = self._make_monitor(idx)
+
+        self.assertEqual(m.update_index(batch=3), 3)
+        self.assertEqual(m.update_index(batch=3), 2)
+        self.assertEqual(m.update_index(batch=3), 0)
+        self.assertEqual(len(idx), 5)
+
+        self.parsed.clear()
+        result = m._try_match("RAD-2-CT")
+        self.assertEqual(result["_source"], "index")
+        self.assertEqual(self.parsed, [])  # confirmation served by header memo
+
+    def test_index_survives_restart(self):
+        self._add_folder("1.2.7", "RAD-7-MR")
+        path = os.path.join(self.data_dir, "study_index.json")
+        idx = StudyIndex(path)
+        self._make_monitor(idx).update_index()
+        idx.save(force=True)
+
+        reloaded = StudyIndex(path)
+        reloaded.load()
+        m = self._make_monitor(reloaded)
+        self.parsed.clear()
+        result = m._try_match("RAD-7-MR")
+        self.assertEqual(result["Acc"], "RAD-7-MR")
+        self.assertEqual(self.parsed, ["1.2.7"])
+
+    def test_stale_entry_falls_back_to_scan(self):
+        self._add_folder("1.2.1", "RAD-1-CT")
+        idx = StudyIndex(os.path.join(self.data_dir, "study_index.json"))
+        idx.record("9.9.9", 1, "RAD-1-CT", _study("RAD-1-CT"))  # folder gone
+        m = self._make_monitor(idx)
+
+        result = m._try_match("RAD-1-CT")
+        self.assertEqual(result["_source"], "recent_folders")
+        self.assertEqual(idx.lookup("RAD-1-CT"), "1.2.1")
+        self.assertNotIn("9.9.9", idx)
+
+    def test_scan_skips_current_index_entries(self):
+        self._add_folder("1.2.1", "RAD-1-CT")
+        self._add_folder("1.2.2", "RAD-2-CT")
+        idx = StudyIndex(os.path.join(self.data_dir, "study_index.json"))
+        m = self._make_monitor(idx)
+        m.update_index()
+
+        self.parsed.clear()
+        self.assertIsNone(m._find_in_recent_folders("RAD-404-CT"))
+        self.assertEqual(self.parsed, [])
+
+    def test_unparseable_folder_not_retried(self):
+        os.makedirs(os.path.join(self.cache_dir, "1.2.99"))  # no DICOM yet
+        idx = StudyIndex(os.path.join(self.data_dir, "study_index.json"))
+        m = self._make_monitor(idx)
+        self.assertEqual(m.update_index(), 1)
+        self.assertEqual(m.update_index(), 0)
+
+    def test_update_index_idle_only(self):
+        self._add_folder("1.2.1", "RAD-1-CT")
+        idx = StudyIndex(os.path.join(self.data_dir, "study_index.json"))
+        m = self._make_monitor(idx)
+        m.search_active = True
+        self.assertEqual(m.update_index(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
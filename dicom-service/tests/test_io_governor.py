@@ -0,0 +1,154 @@
+"""Tests for the token-bucket I/O governor."""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from dicom_monitor import DicomMonitor
+from io_governor import IOGovernor
+
+
+class TestIOGovernor(unittest.TestCase):
+    """Test file/byte budgets and search priority (real clock, short ticks)."""
+
+    def _timed_acquire(self, gov):
+        t0 = time.monotonic()
+        gov.acquire()
+        return time.monotonic() - t0
+
+    def test_unlimited_never_waits(self):
+        gov = IOGovernor()
+        for _ in range(100):
+            gov.acquire()
+            gov.charge(4096)
+        stats = gov.snapshot()
+        self.assertEqual(stats["files"], 100)
+        self.assertEqual(stats["bytes"], 409600)
+        self.assertEqual(stats["throttled"], 0)
+
+    def test_files_per_tick(self):
+        gov = IOGovernor(files_per_tick=2, tick=0.2)
+        self.assertLess(self._timed_acquire(gov), 0.05)
+        self.assertLess(self._timed_acquire(gov), 0.05)
+        self.assertGreater(self._timed_acquire(gov), 0.05)
+        self.assertEqual(gov.snapshot()["throttled"], 1)
+
+    def test_bytes_per_sec(self):
+        gov = IOGovernor(bytes_per_sec=10000)
+        gov.acquire()
+        gov.charge(10800)
+        self.assertGreater(self._timed_acquire(gov), 0.05)
+
+    def test_search_wait_bounded(self):
+        gov = IOGovernor(files_per_tick=1, tick=30.0, max_wait=0.1)
+        gov.acquire()
+        waited = self._timed_acquire(gov)
+        self.assertGreater(waited, 0.05)
+        self.assertLess(waited, 1.0)
+
+    def test_background_yields_to_search(self):
+        gov = IOGovernor(files_per_tick=4, tick=30.0)
+        gov.acquire()
+        gov.acquire()  # 2 of 4 left: below the search's reserve
+        gov.set_foreground(True)
+        done = threading.Event()
+
+        def _background():
+            with gov.background():
+                gov.acquire()
+            done.set()
+
+        threading.Thread(target=_background, daemon=True).start()
+        self.assertFalse(done.wait(0.1))
+        gov.set_foreground(False)
+        self.assertTrue(done.wait(1.0))
+        self.assertEqual(gov.snapshot()["throttled_background"], 1)
+
+    def test_background_uses_budget_above_reserve(self):
+        gov = IOGovernor(files_per_tick=4, tick=30.0)
+        gov.set_foreground(True)
+        with gov.background():
+            self.assertLess(self._timed_acquire(gov), 0.05)
+        self.assertEqual(gov.snapshot()["throttled_background"], 0)
+
+    def test_unlimited_never_blocks_background(self):
+        gov = IOGovernor()
+        gov.set_foreground(True)
+        self.assertTrue(gov.ready())
+        with gov.background():
+            for _ in range(50):
+                self.assertLess(self._timed_acquire(gov), 0.05)
+        self.assertEqual(gov.snapshot()["throttled_background"], 0)
+
+    def test_ready(self):
+        gov = IOGovernor(files_per_tick=4, tick=30.0)
+        self.assertTrue(gov.ready())
+        gov.acquire()
+        gov.acquire()
+        self.assertTrue(gov.ready())
+        gov.set_foreground(True)
+        self.assertFalse(gov.ready())
+        gov.set_foreground(False)
+        gov.acquire()
+        gov.acquire()
+        self.assertFalse(gov.ready())
+
+    def test_nowait_background_does_not_block(self):
+        gov = IOGovernor(files_per_tick=1, tick=30.0)
+        gov.set_foreground(True)
+        with gov.background(wait=False):
+            self.assertLess(self._timed_acquire(gov), 0.05)
+            self.assertLess(self._timed_acquire(gov), 0.05)
+        self.assertEqual(gov.snapshot()["files"], 2)
+
+
+class TestMonitorGovernor(unittest.TestCase):
+    """Test DicomMonitor routing probes through the governor."""
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, True)
+        self.addCleanup(shutil.rmtree, self.data_dir, True)
+        self.gov = MagicMock()
+        self.m = DicomMonitor(cache_dir=self.cache_dir, data_dir=self.data_dir,
+                              io_governor=self.gov)
+
+    def test_probe_takes_token_and_charges_bytes(self):
+        with patch("dicom_monitor._probe_dicom_header", return_value=(None, 512)):
+            self.m._probe("/c/1.2.3/x.dcm")
+        self.gov.acquire.assert_called_once_with()
+        self.gov.charge.assert_called_once_with(512)
+
+    def test_search_sets_priority(self):
+        self.m._start_search("RAD-1-CT")
+        self.gov.set_foreground.assert_called_with(True)
+        self.m.reset_state("test")
+        self.gov.set_foreground.assert_called_with(False)
+
+    def test_indexer_stops_when_over_budget(self):
+        self.m.index = MagicMock()
+        self.m.index.is_current.return_value = False
+        os.makedirs(os.path.join(self.cache_dir, "1.2.3"))
+        self.gov.ready.return_value = False
+        with patch.object(self.m, "_parse_first_dicom_in_folder") as parse:
+            self.assertEqual(self.m.update_index(), 0)
+        parse.assert_not_called()
+        self.gov.skip.assert_called_once_with()
+
+    def test_prefetch_is_background(self):
+        os.makedirs(os.path.join(self.cache_dir, "1.2.3"))
+        with patch.object(self.m, "_parse_first_dicom_in_folder", return_value=None):
+            self.m.prefetch_folder(os.path.join(self.cache_dir, "1.2.3"))
+        self.gov.background.assert_called_once_with(True)
+
+
+if __name__ == "__main__":
+    unittest.main()
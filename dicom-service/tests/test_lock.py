@@ -54,6 +54,13 @@ class TestPIDLock(unittest.TestCase):
         with self.assertRaises(SystemExit):
             dicom_service._acquire_lock()
 
+    def test_instance_answering_control_api_exits(self):
+        # No lock file at all — the control API ping is enough
+        with patch.object(dicom_service, "_control_ping", return_value=4242):
+            with self.assertRaises(SystemExit):
+                dicom_service._acquire_lock()
+        self.assertFalse(os.path.isfile(dicom_service.LOCK_FILE))
+
     def test_release_no_file_no_error(self):
         # Releasing when no lock file exists should not raise
         dicom_service._release_lock()
@@ -0,0 +1,135 @@
+"""Tests for search-funnel metrics."""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from dicom_monitor import DicomMonitor
+from search_metrics import Histogram, SearchMetrics
+
+
+class TestHistogram(unittest.TestCase):
+    """Test bucketing and rolling percentiles."""
+
+    def test_buckets_and_overflow(self):
+        h = Histogram((1, 10))
+        for value in (0.5, 1, 5, 50):
+            h.add(value)
+        self.assertEqual(h.counts, [2, 1, 1])
+        self.assertEqual(h.snapshot()["buckets"], {"<=1": 2, "<=10": 1, ">10": 1})
+
+    def test_percentiles_use_recent_window(self):
+        h = Histogram((10,), window=10)
+        for value in range(100):
+            h.add(value)
+        self.assertEqual(h.count, 100)
+        self.assertEqual(h.percentile(0), 90)
+        self.assertEqual(h.percentile(50), 95)
+        self.assertEqual(h.max, 99)
+
+
+class TestSearchMetrics(unittest.TestCase):
+    """Test per-search deltas and snapshot dumping."""
+
+    def test_per_search_deltas(self):
+        m = SearchMetrics()
+        m.probe(1000, 0.002)  # before the search: not attributed
+        m.search_started(0.05)
+        m.incr("folders_listed", 40)
+        m.incr("folders_probed", 3)
+        m.probe(4096, 0.001)
+        m.probe(4096, 0.003)
+        m.search_ended("lock", 1.5, "recent_folders")
+
+        snap = m.snapshot()
+        self.assertEqual(snap["counters"]["searches_lock"], 1)
+        self.assertEqual(snap["counters"]["lock_source_recent_folders"], 1)
+        self.assertEqual(snap["counters"]["files_opened"], 3)
+        hist = snap["histograms"]
+        self.assertEqual(hist["search_files_opened"]["max"], 2)
+        self.assertEqual(hist["search_bytes_read"]["max"], 8192)
+        self.assertEqual(hist["search_folders_listed"]["max"], 40)
+        self.assertEqual(hist["lock_ms"]["max"], 1500)
+        self.assertEqual(hist["trigger_ms"]["max"], 50)
+
+    def test_superseded_search(self):
+        m = SearchMetrics()
+        m.search_started()
+        m.search_started()
+        self.assertEqual(m.counters["searches"], 2)
+        self.assertEqual(m.counters["searches_superseded"], 1)
+
+    def test_dump_only_when_changed(self):
+        path = os.path.join(tempfile.mkdtemp(), "metrics.json")
+        self.addCleanup(shutil.rmtree, os.path.dirname(path), True)
+        m = SearchMetrics()
+        self.assertFalse(m.dump(path))
+        m.incr("cache_hits")
+        self.assertTrue(m.dump(path))
+        self.assertFalse(m.dump(path))
+        with open(path, encoding="utf-8") as fh:
+            self.assertEqual(json.load(fh)["counters"], {"cache_hits": 1})
+
+
+class TestMonitorFunnel(unittest.TestCase):
+    """Test DicomMonitor feeding the funnel."""
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.data_dir, True)
+        self.m = DicomMonitor(cache_dir=tempfile.mkdtemp(), data_dir=self.data_dir)
+
+    def test_cache_lock_counted_without_identifiers(self):
+        self.m._add_to_cache("RAD-1-CT", {"Acc": "RAD-1-CT_2", "_Name": "DOE^JOHN"})
+        self.m._start_search("RAD-1-CT")
+        self.m.continue_search()
+
+        counters = self.m.metrics.counters
+        self.assertEqual(counters["cache_hits"], 1)
+        self.assertEqual(counters["lock_source_cache"], 1)
+
+        path = os.path.join(self.data_dir, "metrics.json")
+        self.m.metrics.dump(path)
+        with open(path, encoding="utf-8") as fh:
+            raw = fh.read()
+        for secret in ("RAD-1", "DOE", "JOHN"):
+            self.assertNotIn(secret, raw)
+
+    def test_name_mismatch_and_abandon(self):
+        self.m.window_monitor = MagicMock(last_patient_title="SMITH, JANE")
+        self.m._add_to_cache("RAD-1-CT", {"Acc": "RAD-1-CT", "_Name": "DOE^JOHN"})
+        self.m._start_search("RAD-1-CT")
+        self.m.continue_search()
+        self.m.reset_state("patient changed")
+
+        counters = self.m.metrics.counters
+        self.assertEqual(counters["name_mismatch"], 1)
+        self.assertEqual(counters["searches_abandoned"], 1)
+
+    def test_trigger_after_reset_measured_from_reset(self):
+        log_path = os.path.join(self.data_dir, "PSOnePerf.log")
+        with open(log_path, "w", encoding="utf-8") as fh:
+            fh.write("x OpenReport SingleAccession RAD-1-CT\n")
+        hour_ago = time.time() - 3600
+        os.utime(log_path, (hour_ago, hour_ago))
+        self.m.psone_log_path = log_path
+
+        self.m.on_psone_log_changed()
+        self.m.reset_state("patient changed")
+        self.m.on_psone_log_changed()
+
+        trigger = self.m.metrics.histograms["trigger_ms"]
+        self.assertEqual(trigger.count, 2)
+        self.assertGreater(trigger.max, 3000 * 1000)
+        self.assertLess(trigger.percentile(0), 60 * 1000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+"""Tests for parallel folder probing in _find_in_recent_folders()."""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from dicom_monitor import DicomMonitor
+
+
+class TestParallelProbe(unittest.TestCase):
+    """Parallel probing must return exactly what the serial scan returns."""
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, True)
+        self.addCleanup(shutil.rmtree, self.data_dir, True)
+        self.studies = {}
+        self.parsed = []
+        self.lock = threading.Lock()
+
+    def _add_folder(self, uid, acc, mtime, delay=0.0):
+        path = os.path.join(self.cache_dir, uid)
+        os.makedirs(path)
+        os.utime(path, ns=(mtime, mtime))
+        self.studies[path] = ({"_Name": "DOE^JOHN", "Acc": acc}, delay)
+
+    def _fake_parse(self, folder):
+        data, delay = self.studies[folder]
+        time.sleep(delay)
+        with self.lock:
+            self.parsed.append(os.path.basename(folder))
+        # Header results are StudyRecords; tag the folder in a known field
+        return dict(data, StudyDesc=os.path.basename(folder))
+
+    def _make_monitor(self, workers):
+        m = DicomMonitor(cache_dir=self.cache_dir, data_dir=self.data_dir,
+                         probe_workers=workers)
+        self.addCleanup(m.close)
+        patcher = patch.object(m, "_parse_first_dicom_in_folder",
+                               side_effect=self._fake_parse)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return m
+
+    def test_same_result_as_serial(self):
+        # Two folders share the accession; the newer one must win even
+        # though the older one finishes parsing first.
+        self._add_folder("1.2.1", "RAD-1-CT", 9_000, delay=0.1)
+        self._add_folder("1.2.2", "RAD-9-CT", 8_000)
+        self._add_folder("1.2.3", "RAD-1-CT", 7_000)
+
+        serial = self._make_monitor(1)._find_in_recent_folders("RAD-1-CT")
+        self.parsed.clear()
+        parallel = self._make_monitor(4)._find_in_recent_folders("RAD-1-CT")
+        self.assertEqual(serial["StudyDesc"], "1.2.1")
+        self.assertEqual(parallel["StudyDesc"], "1.2.1")
+
+    def test_no_match(self):
+        for i in range(6):
+            self._add_folder(f"1.2.{i}", f"RAD-{i}-CT", 1_000 + i)
+        m = self._make_monitor(3)
+        self.assertIsNone(m._find_in_recent_folders("RAD-404-CT"))
+        self.assertEqual(len(self.parsed), 6)
+
+    def test_later_folders_cancelled_after_match(self):
+        self._add_folder("1.2.0", "RAD-0-CT", 100_000)
+        for i in range(1, 40):
+            self._add_folder(f"1.2.{i}", f"RAD-{i}-CT", 100_000 - i, delay=0.01)
+        m = self._make_monitor(2)
+        result = m._find_in_recent_folders("RAD-0-CT")
+        self.assertEqual(result["StudyDesc"], "1.2.0")
+        time.sleep(0.1)
+        self.assertLess(len(self.parsed), 10)
+
+    def test_open_files_capped(self):
+        m = DicomMonitor(cache_dir=self.cache_dir, data_dir=self.data_dir,
+                         probe_workers=4, max_open_files=1)
+        active = []
+        peak = []
+
+        def _slow_probe(path):
+            with self.lock:
+                active.append(path)
+                peak.append(len(active))
+            time.sleep(0.02)
+            with self.lock:
+                active.remove(path)
+            return None, 0
+
+        with patch("dicom_monitor._probe_dicom_header", side_effect=_slow_probe):
+            threads = [threading.Thread(target=m._probe, args=(f"f{i}",))
+                       for i in range(4)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        self.assertEqual(max(peak), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
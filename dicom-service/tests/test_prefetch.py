@@ -0,0 +1,142 @@
+"""Tests for watchdog-driven study prefetch."""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from dicom_monitor import DicomMonitor
+from study_prefetch import CacheFolderHandler, StudyPrefetcher
+
+
+class TestCacheFolderHandler(unittest.TestCase):
+    """Test mapping of cache events to top-level study folders."""
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, True)
+        self.prefetcher = MagicMock()
+        self.handler = CacheFolderHandler(self.prefetcher, self.cache_dir)
+
+    def test_file_in_series_maps_to_study(self):
+        path = os.path.join(self.cache_dir, "1.2.3", "1.2.3.4", "img.dcm")
+        self.assertEqual(self.handler._study_folder(path),
+                         os.path.join(self.cache_dir, "1.2.3"))
+
+    def test_named_container_ignored(self):
+        path = os.path.join(self.cache_dir, "InteleViewerDicomSpool", "x.dcm")
+        self.assertEqual(self.handler._study_folder(path), "")
+
+    def test_cache_root_ignored(self):
+        self.assertEqual(self.handler._study_folder(self.cache_dir), "")
+
+    def test_outside_cache_ignored(self):
+        self.assertEqual(self.handler._study_folder("/elsewhere/1.2.3"), "")
+
+    def test_event_notifies_prefetcher(self):
+        event = MagicMock(src_path=os.path.join(self.cache_dir, "1.2.3", "a"))
+        self.handler.on_created(event)
+        self.prefetcher.notify.assert_called_once_with(
+            os.path.join(self.cache_dir, "1.2.3"))
+
+
+class TestStudyPrefetcher(unittest.TestCase):
+    """Test debouncing and worker hand-off."""
+
+    def _make(self, **kwargs):
+        monitor = MagicMock()
+        done = threading.Event()
+
+        def _prefetch(folder):
+            done.set()
+            return "RAD-1-CT"
+
+        monitor.prefetch_folder.side_effect = _prefetch
+        pf = StudyPrefetcher(monitor, **kwargs)
+        self.addCleanup(pf.stop)
+        return pf, monitor, done
+
+    def test_debounced_until_quiet(self):
+        pf, monitor, done = self._make(debounce=0.2, max_wait=10)
+        pf.start()
+        for _ in range(5):
+            pf.notify("/c/1.2.3")
+            time.sleep(0.05)
+        monitor.prefetch_folder.assert_not_called()
+        self.assertTrue(done.wait(2))
+        monitor.prefetch_folder.assert_called_once_with("/c/1.2.3")
+
+    def test_max_wait_bounds_busy_folder(self):
+        pf, monitor, done = self._make(debounce=0.5, max_wait=0.15)
+        pf.start()
+        deadline = time.monotonic() + 1.0
+        while not done.is_set() and time.monotonic() < deadline:
+            pf.notify("/c/1.2.3")
+            time.sleep(0.02)
+        self.assertTrue(done.is_set())
+
+    def test_done_folder_ignored(self):
+        pf, monitor, done = self._make(debounce=0.01)
+        pf.start()
+        pf.notify("/c/1.2.3")
+        self.assertTrue(done.wait(2))
+        time.sleep(0.05)
+        pf.notify("/c/1.2.3")
+        self.assertEqual(pf.stats()["pending"], 0)
+        self.assertEqual(pf.stats()["prefetched"], 1)
+
+    def test_pending_bounded(self):
+        pf, _, _ = self._make(max_pending=2)
+        for i in range(4):
+            pf.notify(f"/c/1.2.{i}")
+        self.assertEqual(pf.stats()["pending"], 2)
+        self.assertEqual(pf.stats()["dropped"], 2)
+
+    def test_empty_counted_across_workers(self):
+        pf, monitor, _ = self._make(workers=4, debounce=0.01, max_pending=100)
+        monitor.prefetch_folder.side_effect = lambda folder: ""
+        for i in range(50):
+            pf.notify(f"/c/1.2.{i}")
+        pf.start()
+        deadline = time.monotonic() + 2.0
+        while pf.stats()["empty"] < 50 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(pf.stats()["empty"], 50)
+        self.assertEqual(pf.stats()["prefetched"], 0)
+
+
+class TestPrefetchFolder(unittest.TestCase):
+    """Test DicomMonitor.prefetch_folder() feeding the LRU cache."""
+
+    def test_prefetch_then_cache_hit(self):
+        cache_dir = tempfile.mkdtemp()
+        data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, True)
+        self.addCleanup(shutil.rmtree, data_dir, True)
+        folder = os.path.join(cache_dir, "1.2.3")
+        os.makedirs(folder)
+
+        m = DicomMonitor(cache_dir=cache_dir, data_dir=data_dir)
+        study = {"_Name": "DOE^JOHN", "Acc": "RAD-1-CT_2", "Mod": "CT"}
+        with patch.object(m, "_parse_first_dicom_in_folder",
+                          return_value=dict(study)):
+            self.assertEqual(m.prefetch_folder(folder), "RAD-1-CT")
+
+        with patch.object(m, "_parse_first_dicom_in_folder") as parse:
+            result = m._try_match("RAD-1-CT")
+        parse.assert_not_called()
+        self.assertEqual(result["_source"], "cache")
+
+    def test_prefetch_missing_folder(self):
+        m = DicomMonitor(cache_dir=tempfile.mkdtemp(), data_dir=tempfile.mkdtemp())
+        self.assertEqual(m.prefetch_folder("/nonexistent/1.2.3"), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+"""Tests for the DICOM header probe and first-file folder walk."""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from dicom_monitor import DicomMonitor, _iter_files, _probe_dicom_header
+
+try:
+    import pydicom
+    from pydicom.dataset import Dataset, FileMetaDataset
+    from pydicom.uid import ExplicitVRLittleEndian, generate_uid
+except ImportError:
+    pydicom = None
+
+
+def _write_dicom(path, acc="RAD-1-CT", name="DOE^JOHN", private_bytes=0,
+                 preamble=True):
+    """Write a minimal DICOM file; *private_bytes* pads a tag past PatientAge.
+
+    Files are padded over 1 KB so they pass the minimum-size check.
+    """
+    meta = FileMetaDataset()
+    meta.MediaStorageSOPClassUID = "1.2.840.10008.5.1.4.1.1.2"
+    meta.MediaStorageSOPInstanceUID = generate_uid()
+    meta.TransferSyntaxUID = ExplicitVRLittleEndian
+
+    ds = Dataset()
+    ds.file_meta = meta
+    ds.SOPClassUID = meta.MediaStorageSOPClassUID
+    ds.SOPInstanceUID = meta.MediaStorageSOPInstanceUID
+    ds.AccessionNumber = acc
+    ds.Modality = "CT"
+    ds.StudyDescription = "CT CHEST"
+    ds.PatientName = name
+    ds.PatientSex = "M"
+    ds.PatientAge = "045Y"
+    ds.add_new(0x00291010, "OB", b"\0" * max(private_bytes, 1200))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    ds.save_as(path, enforce_file_format=preamble)
+    return path
+
+
+@unittest.skipIf(pydicom is None, "pydicom not installed")
+class TestProbeDicomHeader(unittest.TestCase):
+    """Test _probe_dicom_header() magic check and bounded reads."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, True)
+
+    def test_valid_file(self):
+        path = _write_dicom(os.path.join(self.tmp, "a.dcm"))
+        data, nbytes = _probe_dicom_header(path)
+        self.assertEqual(data["Acc"], "RAD-1-CT")
+        self.assertEqual(data["_Name"], "DOE^JOHN")
+        self.assertEqual(data["Age"], "045Y")
+        self.assertEqual(data["Mod"], "CT")
+        self.assertGreater(nbytes, 132)
+
+    def test_stops_before_later_tags(self):
+        path = _write_dicom(os.path.join(self.tmp, "a.dcm"), private_bytes=200000)
+        data, nbytes = _probe_dicom_header(path)
+        self.assertEqual(data["Acc"], "RAD-1-CT")
+        self.assertLess(nbytes, 4096)
+        self.assertGreater(os.path.getsize(path), 200000)
+
+    def test_rejects_missing_magic(self):
+        path = _write_dicom(os.path.join(self.tmp, "raw.dcm"), preamble=False)
+        data, nbytes = _probe_dicom_header(path)
+        self.assertIsNone(data)
+        self.assertLessEqual(nbytes, 132)
+
+    def test_rejects_junk(self):
+        path = os.path.join(self.tmp, "junk.bin")
+        with open(path, "wb") as fh:
+            fh.write(os.urandom(4096))
+        self.assertIsNone(_probe_dicom_header(path)[0])
+
+    def test_truncated_header(self):
+        full = _write_dicom(os.path.join(self.tmp, "a.dcm"))
+        with open(full, "rb") as fh:
+            head = fh.read(150)
+        path = os.path.join(self.tmp, "partial.dcm")
+        with open(path, "wb") as fh:
+            fh.write(head)
+        data, _ = _probe_dicom_header(path)
+        self.assertTrue(data is None or data["_Name"] == "Unknown")
+
+
+@unittest.skipIf(pydicom is None, "pydicom not installed")
+class TestParseFirstDicomInFolder(unittest.TestCase):
+    """Test the lazy folder walk in _parse_first_dicom_in_folder()."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, True)
+        self.monitor = DicomMonitor(cache_dir=self.tmp, data_dir=self.tmp)
+
+    def test_skips_junk_and_small_files(self):
+        study = os.path.join(self.tmp, "1.2.3")
+        series = os.path.join(study, "1.2.3.4")
+        os.makedirs(series)
+        with open(os.path.join(study, "tiny.dcm"), "wb") as fh:
+            fh.write(b"\0" * 100)
+        with open(os.path.join(study, "junk.xml"), "wb") as fh:
+            fh.write(b"<xml>" * 500)
+        _write_dicom(os.path.join(series, "img1.dcm"), acc="RAD-7-MR")
+
+        data = self.monitor._parse_first_dicom_in_folder(study)
+        self.assertEqual(data["Acc"], "RAD-7-MR")
+        stats = self.monitor.probe_stats
+        self.assertEqual(stats["probes"], 2)  # junk + first DICOM; tiny skipped
+        self.assertEqual(stats["rejected"], 1)
+        self.assertGreater(stats["bytes"], 0)
+
+    def test_stops_at_first_hit(self):
+        study = os.path.join(self.tmp, "1.2.3")
+        for i in range(3):
+            _write_dicom(os.path.join(study, f"s{i}", "img.dcm"))
+        self.monitor._parse_first_dicom_in_folder(study)
+        self.assertEqual(self.monitor.probe_stats["probes"], 1)
+
+    def test_empty_folder(self):
+        os.makedirs(os.path.join(self.tmp, "1.2.3"))
+        self.assertIsNone(
+            self.monitor._parse_first_dicom_in_folder(os.path.join(self.tmp, "1.2.3")))
+
+
+class TestIterFiles(unittest.TestCase):
+    """Test _iter_files() ordering (files before subdirectories)."""
+
+    def test_files_before_subdirs(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp, True)
+        os.makedirs(os.path.join(tmp, "sub"))
+        for rel in ("a", os.path.join("sub", "b")):
+            with open(os.path.join(tmp, rel), "w") as fh:
+                fh.write("x")
+        names = [e.name for e in _iter_files(tmp)]
+        self.assertEqual(names, ["a", "b"])
+
+    def test_missing_folder(self):
+        self.assertEqual(list(_iter_files("/nonexistent/folder")), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+"""Tests for the event-driven service scheduler."""
+
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from scheduler import Scheduler
+from tests.helpers import FakeClock
+
+
+class TestScheduler(unittest.TestCase):
+    """Test job intervals, wakes and idle back-off with a fake clock."""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.sched = Scheduler(clock=self.clock, max_sleep=60.0)
+        self.calls = []
+
+    def _job(self, name, result=None):
+        def _run():
+            self.calls.append(name)
+            return result
+        return _run
+
+    def test_jobs_run_on_their_own_interval(self):
+        self.sched.add_job("fast", self._job("fast"), 1.0)
+        self.sched.add_job("slow", self._job("slow"), 5.0)
+        self.assertEqual(self.sched.run_pending(), 1.0)
+        self.assertEqual(self.calls, ["fast", "slow"])
+
+        for _ in range(4):
+            self.clock.now += 1.0
+            self.sched.run_pending()
+        self.assertEqual(self.calls.count("fast"), 5)
+        self.assertEqual(self.calls.count("slow"), 1)
+
+        self.clock.now += 1.0
+        self.sched.run_pending()
+        self.assertEqual(self.calls.count("slow"), 2)
+
+    def test_wake_makes_job_due(self):
+        self.sched.add_job("psone", self._job("psone"), 10.0)
+        self.sched.add_job("other", self._job("other"), 10.0)
+        self.sched.run_pending()
+        self.calls.clear()
+
+        self.clock.now += 0.1
+        self.sched.wake("psone")
+        self.assertAlmostEqual(self.sched.run_pending(), 9.9)
+        self.assertEqual(self.calls, ["psone"])
+
+    def test_idle_back_off_and_reset(self):
+        busy = [False]
+
+        def _search():
+            return busy[0]
+
+        self.sched.add_job("search", _search, 0.5, idle_interval=4.0)
+        waits = []
+        for _ in range(5):
+            waits.append(self.sched.run_pending())
+            self.clock.now += waits[-1]
+        self.assertEqual(waits, [1.0, 2.0, 4.0, 4.0, 4.0])
+
+        busy[0] = True
+        self.assertEqual(self.sched.run_pending(), 0.5)
+
+    def test_wake_resets_back_off(self):
+        self.sched.add_job("search", self._job("search", False), 0.5, idle_interval=8.0)
+        for _ in range(4):
+            self.clock.now += self.sched.run_pending()
+        self.sched.wake("search")
+        self.sched.run_pending()
+        self.assertEqual(self.sched.stats()["search"]["interval"], 1.0)
+
+    def test_errors_counted_and_isolated(self):
+        def _boom():
+            raise RuntimeError("boom")
+
+        self.sched.add_job("bad", _boom, 1.0)
+        self.sched.add_job("good", self._job("good"), 1.0)
+        self.sched.run_pending()
+        self.assertEqual(self.calls, ["good"])
+        self.assertEqual(self.sched.stats()["bad"]["errors"], 1)
+
+    def test_stats_timing(self):
+        self.sched.add_job("job", self._job("job"), 1.0)
+        self.sched.run_pending()
+        stats = self.sched.stats()["job"]
+        self.assertEqual(stats["runs"], 1)
+        self.assertGreaterEqual(stats["max_ms"], 0.0)
+
+
+class TestSchedulerLoop(unittest.TestCase):
+    """Test the real-time loop: wakes from other threads and stop()."""
+
+    def test_wake_from_thread_runs_promptly(self):
+        sched = Scheduler(max_sleep=30.0)
+        ran = threading.Event()
+        sched.add_job("idle", lambda: None, 30.0)
+        sched.add_job("psone", ran.set, 30.0)
+
+        t = threading.Thread(target=sched.run)
+        t.start()
+        time.sleep(0.05)
+        ran.clear()
+        t0 = time.monotonic()
+        sched.wake("psone")
+        self.assertTrue(ran.wait(1.0))
+        self.assertLess(time.monotonic() - t0, 1.0)
+
+        sched.stop()
+        t.join(2.0)
+        self.assertFalse(t.is_alive())
+        self.assertGreaterEqual(sched.wakeups, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
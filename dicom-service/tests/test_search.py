@@ -0,0 +1,85 @@
+"""Tests for the search lifecycle: deepening schedule and lock bookkeeping."""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from dicom_monitor import DicomMonitor, _default_depths
+from dicom_service import _int_list
+
+
+class TestDeepeningSchedule(unittest.TestCase):
+    """Test the iterative-deepening search window."""
+
+    def _make_monitor(self, **kwargs):
+        data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, data_dir, True)
+        return DicomMonitor(cache_dir=tempfile.mkdtemp(), data_dir=data_dir,
+                            **kwargs)
+
+    def test_default_depths(self):
+        self.assertEqual(_default_depths(50), [5, 10, 25, 50, 100])
+        self.assertEqual(_default_depths(4), [4, 5, 8])
+
+    def test_widens_with_age(self):
+        m = self._make_monitor(search_depths=[5, 20, 80], depth_step=4.0)
+        self.assertEqual(m._search_depth(0.0), (5, "5"))
+        self.assertEqual(m._search_depth(3.9), (5, "5"))
+        self.assertEqual(m._search_depth(4.0), (20, "20"))
+        self.assertEqual(m._search_depth(60.0), (80, "80"))
+
+    def test_one_full_sweep_before_timeout(self):
+        m = self._make_monitor(search_timeout=60, full_sweep_max=300,
+                               full_sweep_lead=10.0)
+        self.assertEqual(m._search_depth(50.0), (300, "sweep"))
+        self.assertNotEqual(m._search_depth(52.0)[1], "sweep")
+
+    def test_continue_search_passes_depth(self):
+        m = self._make_monitor(search_depths=[3, 30], depth_step=4.0)
+        m._start_search("RAD-1-CT")
+        with patch.object(m, "_find_in_recent_folders", return_value=None) as scan:
+            m.continue_search()
+        scan.assert_called_once_with("RAD-1-CT", 3)
+
+        m.search_start -= 5.0
+        with patch.object(m, "_find_in_recent_folders", return_value=None) as scan:
+            m.continue_search()
+        scan.assert_called_once_with("RAD-1-CT", 30)
+
+    def test_lock_latency_recorded_per_depth(self):
+        m = self._make_monitor(search_depths=[5, 50])
+        m._start_search("RAD-1-CT")
+        with patch.object(m, "_find_in_recent_folders",
+                          return_value={"Acc": "RAD-1-CT", "_Name": "X"}):
+            m.continue_search()
+        self.assertEqual(m.current_locked_acc, "RAD-1-CT")
+        self.assertEqual(m.depth_stats["5"]["locks"], 1)
+
+    def test_cache_hit_recorded_as_cache(self):
+        m = self._make_monitor()
+        m._add_to_cache("RAD-1-CT", {"Acc": "RAD-1-CT", "_Name": "X"})
+        m._start_search("RAD-1-CT")
+        m.continue_search()
+        self.assertEqual(m.depth_stats["cache"]["locks"], 1)
+
+
+class TestIntList(unittest.TestCase):
+    """Test config.ini integer-list parsing."""
+
+    def test_parse(self):
+        self.assertEqual(_int_list("5, 10,25"), [5, 10, 25])
+        self.assertEqual(_int_list("5;10"), [5, 10])
+
+    def test_empty_or_invalid(self):
+        self.assertIsNone(_int_list(""))
+        self.assertIsNone(_int_list("five"))
+        self.assertIsNone(_int_list("0,-1"))
+
+
+if __name__ == "__main__":
+    unittest.main()
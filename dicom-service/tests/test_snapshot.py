@@ -0,0 +1,128 @@
+"""Tests for the scandir cache snapshot and its tick-to-tick delta."""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from dicom_monitor import DicomMonitor, _CacheSnapshot
+from study_index import StudyIndex
+
+
+class TestCacheSnapshot(unittest.TestCase):
+    """Test _CacheSnapshot delta detection and ranking."""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, True)
+
+    def _mkdir(self, uid, mtime):
+        path = os.path.join(self.root, uid)
+        os.makedirs(path, exist_ok=True)
+        os.utime(path, ns=(mtime, mtime))
+        return path
+
+    def test_first_refresh_all_added(self):
+        self._mkdir("1.2.1", 1_000)
+        self._mkdir("1.2.2", 2_000)
+        os.makedirs(os.path.join(self.root, "InteleViewerDicomSpool"))
+        with open(os.path.join(self.root, "1.2.3"), "w") as fh:
+            fh.write("not a folder")
+        snap = _CacheSnapshot(self.root)
+        added, removed, touched = snap.refresh()
+        self.assertEqual(added, {"1.2.1", "1.2.2"})
+        self.assertEqual((removed, touched), (set(), set()))
+
+    def test_delta(self):
+        self._mkdir("1.2.1", 1_000)
+        self._mkdir("1.2.2", 2_000)
+        snap = _CacheSnapshot(self.root)
+        snap.refresh()
+        self.assertEqual(snap.refresh(), (set(), set(), set()))
+
+        shutil.rmtree(os.path.join(self.root, "1.2.1"))
+        self._mkdir("1.2.2", 5_000)
+        self._mkdir("1.2.3", 3_000)
+        added, removed, touched = snap.refresh()
+        self.assertEqual(added, {"1.2.3"})
+        self.assertEqual(removed, {"1.2.1"})
+        self.assertEqual(touched, {"1.2.2"})
+
+    def test_top_newest_first(self):
+        for i, mtime in enumerate([5, 1, 9, 3, 7]):
+            self._mkdir(f"1.2.{i}", mtime * 1_000)
+        snap = _CacheSnapshot(self.root)
+        snap.refresh()
+        self.assertEqual([uid for _, uid, _ in snap.top(3)],
+                         ["1.2.2", "1.2.4", "1.2.0"])
+        self.assertEqual(len(snap.top()), 5)
+
+    def test_ranking_reused_until_change(self):
+        self._mkdir("1.2.1", 1_000)
+        snap = _CacheSnapshot(self.root)
+        snap.refresh()
+        first = snap.top(10)
+        snap.refresh()
+        self.assertIs(snap.top(10), first)
+        self._mkdir("1.2.2", 2_000)
+        snap.refresh()
+        self.assertIsNot(snap.top(10), first)
+        self.assertEqual(snap.top(10)[0][1], "1.2.2")
+
+    def test_missing_root(self):
+        self.assertIsNone(_CacheSnapshot("/nonexistent/cache").refresh())
+
+
+class TestSnapshotDrivenIndexing(unittest.TestCase):
+    """Test that index maintenance follows the snapshot delta."""
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, True)
+        self.addCleanup(shutil.rmtree, self.data_dir, True)
+        self.index = StudyIndex(os.path.join(self.data_dir, "study_index.json"))
+        self.monitor = DicomMonitor(cache_dir=self.cache_dir,
+                                    data_dir=self.data_dir, index=self.index)
+        patcher = patch.object(self.monitor, "_parse_first_dicom_in_folder",
+                               side_effect=self._fake_parse)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _fake_parse(self, folder):
+        uid = os.path.basename(folder)
+        return {"_Name": "DOE^JOHN", "Acc": f"RAD-{uid.split('.')[-1]}-CT"}
+
+    def test_new_folder_indexed_after_delta(self):
+        os.makedirs(os.path.join(self.cache_dir, "1.2.1"))
+        self.monitor.update_index()
+        self.assertEqual(self.monitor.update_index(), 0)
+
+        os.makedirs(os.path.join(self.cache_dir, "1.2.2"))
+        self.assertEqual(self.monitor.update_index(), 1)
+        self.assertEqual(self.index.lookup("RAD-2-CT"), "1.2.2")
+
+    def test_removed_folder_forgotten(self):
+        os.makedirs(os.path.join(self.cache_dir, "1.2.1"))
+        self.monitor.update_index()
+        self.assertEqual(self.index.lookup("RAD-1-CT"), "1.2.1")
+
+        shutil.rmtree(os.path.join(self.cache_dir, "1.2.1"))
+        self.monitor.update_index()
+        self.assertEqual(self.index.lookup("RAD-1-CT"), "")
+
+    def test_backlog_primed_by_search(self):
+        for i in range(3):
+            os.makedirs(os.path.join(self.cache_dir, f"1.2.{i}"))
+        self.monitor.max_scan_folders = 1
+        self.monitor._find_in_recent_folders("RAD-404-CT")
+        self.assertEqual(self.monitor.update_index(), 2)
+        self.assertEqual(len(self.index), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
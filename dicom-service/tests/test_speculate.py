@@ -0,0 +1,120 @@
+"""Tests for the name-triggered speculative study lookup."""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from dicom_monitor import DicomMonitor
+
+
+class TestSpeculate(unittest.TestCase):
+    """Test DicomMonitor.speculate() pre-caching by patient last name."""
+
+    # Newest first
+    STUDIES = [
+        ("1.2.1", {"_Name": "SMITH^JANE", "Acc": "RAD-1-CT", "Mod": "CT"}),
+        ("1.2.2", {"_Name": "DOE^JOHN", "Acc": "RAD-2-MR_1", "Mod": "MR"}),
+        ("1.2.3", {"_Name": "DOELL^ANN", "Acc": "RAD-3-CT", "Mod": "CT"}),
+        ("1.2.4", {"_Name": "DOE^JOHN", "Acc": "RAD-4-US", "Mod": "US"}),
+        ("1.2.5", {"_Name": "DOE^JOHN", "Acc": "RAD-5-DX", "Mod": "DX"}),
+    ]
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, True)
+        self.addCleanup(shutil.rmtree, self.data_dir, True)
+        self.headers = {}
+        base_ns = 1_700_000_000 * 10 ** 9
+        for rank, (uid, study) in enumerate(self.STUDIES):
+            folder = os.path.join(self.cache_dir, uid)
+            os.makedirs(folder)
+            mtime_ns = base_ns - rank * 10 ** 9
+            os.utime(folder, ns=(mtime_ns, mtime_ns))
+            self.headers[folder] = study
+
+        self.parsed = []
+        parse = patch.object(DicomMonitor, "_parse_first_dicom_in_folder",
+                             autospec=True, side_effect=self._parse)
+        parse.start()
+        self.addCleanup(parse.stop)
+
+    def _parse(self, monitor, folder):
+        self.parsed.append(os.path.basename(folder))
+        return dict(self.headers[folder])
+
+    def _monitor(self, **kwargs):
+        m = DicomMonitor(cache_dir=self.cache_dir, data_dir=self.data_dir,
+                         cache_size=10, **kwargs)
+        self.addCleanup(m.close)
+        return m
+
+    def test_matching_studies_cached(self):
+        m = self._monitor()
+        self.assertEqual(m.speculate("DOE^JOHN").result(timeout=5), 2)
+        self.assertEqual(set(m._cache), {"RAD-2-MR", "RAD-4-US"})
+
+    def test_last_name_must_match_exactly(self):
+        m = self._monitor(speculate_max=5)
+        m.speculate("DOE^JOHN").result(timeout=5)
+        self.assertNotIn("RAD-3-CT", m._cache)  # DOELL
+        self.assertNotIn("RAD-1-CT", m._cache)
+
+    def test_stops_after_speculate_max(self):
+        m = self._monitor(speculate_max=1)
+        m.speculate("DOE^JOHN").result(timeout=5)
+        self.assertEqual(list(m._cache), ["RAD-2-MR"])
+        self.assertEqual(self.parsed, ["1.2.1", "1.2.2"])
+
+    def test_depth_limits_folders_read(self):
+        m = self._monitor(speculate_max=5, speculate_depth=3)
+        m.speculate("DOE^JOHN").result(timeout=5)
+        self.assertEqual(sorted(self.parsed), ["1.2.1", "1.2.2", "1.2.3"])
+
+    def test_later_search_is_cache_hit(self):
+        m = self._monitor()
+        m.speculate("DOE^JOHN").result(timeout=5)
+        self.parsed.clear()
+        result = m._try_match("RAD-4-US")
+        self.assertEqual(result["_source"], "cache")
+        self.assertEqual(self.parsed, [])
+        self.assertEqual(m.metrics.counters["speculative_hits"], 1)
+
+    def test_new_title_cancels_running_lookup(self):
+        m = self._monitor()
+        m._refresh_snapshot()
+        candidates = m._snapshot.top()
+        gen = m._spec_gen
+        m.speculate("")  # title changed again
+        self.assertEqual(m._speculate(gen, "DOE", candidates), 0)
+        self.assertEqual(self.parsed, [])
+        self.assertEqual(m.metrics.counters["speculative_cancelled"], 1)
+        self.assertEqual(len(m._cache), 0)
+
+    def test_empty_title_or_disabled_does_nothing(self):
+        self.assertIsNone(self._monitor().speculate(""))
+        self.assertIsNone(self._monitor(speculate_max=0).speculate("DOE^JOHN"))
+        self.assertEqual(self.parsed, [])
+
+    def test_new_patient_resets_speculative_hits(self):
+        m = self._monitor()
+        m.speculate("DOE^JOHN").result(timeout=5)
+        m.speculate("SMITH^JANE").result(timeout=5)
+        m._try_match("RAD-2-MR")
+        self.assertNotIn("speculative_hits", m.metrics.counters)
+
+    def test_name_not_logged_or_written(self):
+        m = self._monitor()
+        with self.assertLogs("dicom_monitor", "DEBUG") as logs:
+            m.speculate("DOE^JOHN").result(timeout=5)
+        self.assertNotIn("DOE", "\n".join(logs.output))
+        self.assertFalse(os.path.exists(m.state_file))
+
+
+if __name__ == "__main__":
+    unittest.main()
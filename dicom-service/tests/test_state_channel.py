@@ -0,0 +1,109 @@
+"""Tests for the loopback study-state channel."""
+
+import json
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from dicom_monitor import DicomMonitor
+from state_channel import StateChannel
+
+
+class TestStateChannel(unittest.TestCase):
+    """Test publishing, sequence numbers and the port file."""
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.data_dir, True)
+        self.channel = StateChannel(self.data_dir)
+        self.channel.start()
+        self.addCleanup(self.channel.stop)
+
+    def _subscribe(self):
+        with open(self.channel.port_file, encoding="utf-8") as fh:
+            port = int(fh.read())
+        conn = socket.create_connection(("127.0.0.1", port), timeout=2)
+        self.addCleanup(conn.close)
+        return conn.makefile("rb")
+
+    def _next(self, reader):
+        return json.loads(reader.readline())
+
+    def test_snapshot_on_connect(self):
+        self.channel.publish({"Acc": "RAD-1-CT"})
+        reader = self._subscribe()
+        self.assertEqual(self._next(reader),
+                         {"seq": 1, "state": {"Acc": "RAD-1-CT"}})
+
+    def test_sequence_increases(self):
+        reader = self._subscribe()
+        self.assertEqual(self._next(reader)["seq"], 0)
+        self.channel.publish({"Acc": "RAD-1-CT"})
+        self.channel.publish({})
+        seqs = [self._next(reader)["seq"]]
+        if seqs[0] == 1:
+            seqs.append(self._next(reader)["seq"])
+        # A slow reader may skip superseded states but always ends on the latest
+        self.assertEqual(seqs[-1], 2)
+
+    def test_multiple_subscribers(self):
+        readers = [self._subscribe() for _ in range(3)]
+        for reader in readers:
+            self._next(reader)
+        self.channel.publish({"Mod": "MR"})
+        for reader in readers:
+            self.assertEqual(self._next(reader)["state"], {"Mod": "MR"})
+
+    def test_stop_removes_port_file(self):
+        self.assertTrue(os.path.isfile(self.channel.port_file))
+        reader = self._subscribe()
+        self._next(reader)
+        self.channel.stop()
+        self.assertFalse(os.path.exists(self.channel.port_file))
+        self.assertEqual(reader.readline(), b"")
+
+
+class TestMonitorPublishes(unittest.TestCase):
+    """Test DicomMonitor._write_state() pushing to the channel."""
+
+    def test_write_state_publishes_filtered_state(self):
+        data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, data_dir, True)
+        m = DicomMonitor(cache_dir=data_dir, data_dir=data_dir)
+        m.state_channel = MagicMock()
+
+        m._write_state({"_Name": "DOE^JOHN", "Acc": "RAD-1-CT", "Mod": "CT"})
+        published = m.state_channel.publish.call_args[0][0]
+        self.assertEqual(published["Acc"], "RAD-1-CT")
+        self.assertNotIn("_Name", published)
+        with open(m.state_file, encoding="utf-8") as fh:
+            self.assertEqual(json.load(fh), published)
+
+        m._write_state({"Acc": "RAD-1-CT", "Mod": "CT"})
+        m.state_channel.publish.assert_called_once()
+
+    def test_state_file_written_before_publish(self):
+        data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, data_dir, True)
+        m = DicomMonitor(cache_dir=data_dir, data_dir=data_dir)
+        on_disk = []
+
+        def publish(state):
+            with open(m.state_file, encoding="utf-8") as fh:
+                on_disk.append(json.load(fh))
+
+        m.state_channel = MagicMock()
+        m.state_channel.publish.side_effect = publish
+        m._write_state({"Acc": "RAD-1-CT", "Mod": "CT"})
+        m._write_state({"Acc": "RAD-2-MR", "Mod": "MR"})
+        self.assertEqual([s["Acc"] for s in on_disk], ["RAD-1-CT", "RAD-2-MR"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+"""Tests for StudyRecord and the count/byte/TTL-bounded StudyCache."""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from study_cache import StudyCache, StudyRecord
+from tests.helpers import FakeClock
+
+
+def _record(acc, desc="CT CHEST"):
+    return StudyRecord(acc=acc, name="DOE^JOHN", sex="M", age="045Y",
+                       mod="CT", study_desc=desc)
+
+
+class TestStudyRecord(unittest.TestCase):
+    """Test the immutable record and its read-only mapping view."""
+
+    def test_from_fields_round_trip(self):
+        fields = {"Acc": "RAD-1-CT", "_Name": "DOE^JOHN", "Sex": "M",
+                  "Age": "045Y", "Mod": "CT", "StudyDesc": "CT CHEST"}
+        record = StudyRecord.from_fields(fields)
+        self.assertEqual(record.acc, "RAD-1-CT")
+        self.assertEqual(record["_Name"], "DOE^JOHN")
+        self.assertEqual(record.to_dict(), fields)
+
+    def test_immutable(self):
+        record = _record("RAD-1-CT")
+        with self.assertRaises(AttributeError):
+            record.acc = "RAD-2-CT"
+        with self.assertRaises(TypeError):
+            record["_source"] = "cache"
+        with self.assertRaises(AttributeError):
+            record.extra = 1  # __slots__
+
+    def test_with_source_returns_new_record(self):
+        record = _record("RAD-1-CT")
+        tagged = record.with_source("cache")
+        self.assertEqual(tagged["_source"], "cache")
+        self.assertEqual(record.source, "")
+        self.assertIs(tagged.with_source("cache"), tagged)
+
+    def test_get_treats_empty_as_missing(self):
+        record = StudyRecord(acc="RAD-1-CT")
+        self.assertEqual(record.get("Sex", "?"), "?")
+        self.assertNotIn("Sex", record)
+        self.assertIn("Acc", record)
+        self.assertIsNone(record.get("Unknown"))
+
+    def test_repr_omits_name(self):
+        self.assertNotIn("DOE", repr(_record("RAD-1-CT")))
+
+
+class TestStudyCache(unittest.TestCase):
+    """Test LRU order, byte budget, TTL and counters."""
+
+    def test_hit_miss_counters(self):
+        cache = StudyCache(5)
+        cache.put("A", _record("A"))
+        self.assertEqual(cache.get("A").acc, "A")
+        self.assertIsNone(cache.get("B"))
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+
+    def test_count_bound_evicts_least_recent(self):
+        cache = StudyCache(2)
+        cache.put("A", _record("A"))
+        cache.put("B", _record("B"))
+        cache.get("A")
+        self.assertEqual(cache.put("C", _record("C")), ["B"])
+        self.assertEqual(list(cache), ["A", "C"])
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_byte_bound(self):
+        one = StudyCache(100)
+        one.put("ACC-0", _record("ACC-0"))
+        per_entry = one.bytes
+        cache = StudyCache(100, max_bytes=per_entry * 3)
+        for i in range(10):
+            cache.put(f"ACC-{i}", _record(f"ACC-{i}"))
+        self.assertEqual(len(cache), 3)
+        self.assertLessEqual(cache.bytes, per_entry * 3)
+        self.assertEqual(list(cache), ["ACC-7", "ACC-8", "ACC-9"])
+
+    def test_oversized_entry_still_kept(self):
+        cache = StudyCache(5, max_bytes=10)
+        cache.put("A", _record("A", desc="X" * 1000))
+        self.assertIn("A", cache)
+
+    def test_replace_updates_bytes(self):
+        cache = StudyCache(5)
+        cache.put("A", _record("A", desc="X" * 1000))
+        big = cache.bytes
+        cache.put("A", _record("A"))
+        self.assertLess(cache.bytes, big)
+        self.assertEqual(len(cache), 1)
+
+    def test_ttl_expiry(self):
+        clock = FakeClock()
+        cache = StudyCache(5, ttl=60, clock=clock)
+        cache.put("A", _record("A"))
+        clock.now += 59
+        self.assertIsNotNone(cache.get("A"))
+        clock.now += 2
+        self.assertNotIn("A", cache)
+        self.assertIsNone(cache.get("A"))
+        self.assertEqual(cache.stats()["expired"], 1)
+        self.assertEqual(cache.bytes, 0)
+
+    def test_purge_expired(self):
+        clock = FakeClock()
+        cache = StudyCache(5, ttl=60, clock=clock)
+        cache.put("A", _record("A"))
+        clock.now += 30
+        cache.put("B", _record("B"))
+        clock.now += 31
+        self.assertEqual(cache.purge_expired(), 1)
+        self.assertEqual(list(cache), ["B"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+"""Tests for the benchmark suite's synthetic DICOM cache."""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+_SERVICE_DIR = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, _SERVICE_DIR)
+sys.path.insert(0, os.path.join(_SERVICE_DIR, "bench"))
+
+from dicom_monitor import DicomMonitor
+
+try:
+    import pydicom
+    from synthetic_cache import build_cache, load_manifest
+except ImportError:
+    pydicom = None
+
+
+@unittest.skipIf(pydicom is None, "pydicom not installed")
+class TestSyntheticCache(unittest.TestCase):
+    """Test the generated cache is what DicomMonitor expects to scan."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.mkdtemp()
+        cls.root = os.path.join(cls.tmp, "cache")
+        cls.manifest = build_cache(cls.root, 30, seed=7, partial_ratio=0.2,
+                                   max_pad_kb=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp, True)
+
+    def _monitor(self):
+        data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, data_dir, True)
+        return DicomMonitor(cache_dir=self.root, data_dir=data_dir)
+
+    def test_manifest_matches_snapshot_order(self):
+        m = self._monitor()
+        m._refresh_snapshot()
+        uids = [uid for _, uid, _ in m._snapshot.top()]
+        self.assertEqual(uids, [e["uid"] for e in self.manifest["studies"]])
+
+    def test_same_seed_is_reproducible(self):
+        root = os.path.join(self.tmp, "again")
+        again = build_cache(root, 30, seed=7, partial_ratio=0.2, max_pad_kb=2)
+        self.assertEqual([e["core"] for e in again["studies"]],
+                         [e["core"] for e in self.manifest["studies"]])
+
+    def test_findable_and_partial_studies(self):
+        m = self._monitor()
+        for entry in self.manifest["studies"]:
+            data = m._parse_first_dicom_in_folder(
+                os.path.join(self.root, entry["uid"]))
+            if entry["partial"]:
+                self.assertTrue(data is None or data["_Name"] == "Unknown")
+            else:
+                self.assertEqual(data["Acc"], entry["acc"])
+
+    def test_load_manifest(self):
+        manifest = load_manifest(self.root)
+        self.assertEqual(len(manifest["studies"]), 30)
+
+
+if __name__ == "__main__":
+    unittest.main()
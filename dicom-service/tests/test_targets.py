@@ -0,0 +1,173 @@
+"""Tests for deferred search targets sharing one folder sweep."""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from dicom_monitor import DicomMonitor
+from tests.helpers import FakeClock
+
+
+class TestDeferredTargets(unittest.TestCase):
+    """Test DicomMonitor keeping earlier accessions alive as deferred targets."""
+
+    # Newest first
+    STUDIES = [
+        ("1.2.1", {"_Name": "DOE^JOHN", "Acc": "RAD-1-CT", "Mod": "CT"}),
+        ("1.2.2", {"_Name": "DOE^JOHN", "Acc": "RAD-2-CT", "Mod": "CT"}),
+        ("1.2.3", {"_Name": "DOE^JOHN", "Acc": "RAD-3-MR", "Mod": "MR"}),
+        ("1.2.4", {"_Name": "SMITH^JANE", "Acc": "RAD-4-US", "Mod": "US"}),
+    ]
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, True)
+        self.addCleanup(shutil.rmtree, self.data_dir, True)
+        self.headers = {}
+        base_ns = 1_700_000_000 * 10 ** 9
+        for rank, (uid, study) in enumerate(self.STUDIES):
+            folder = os.path.join(self.cache_dir, uid)
+            os.makedirs(folder)
+            mtime_ns = base_ns - rank * 10 ** 9
+            os.utime(folder, ns=(mtime_ns, mtime_ns))
+            self.headers[folder] = study
+
+        self.parsed = []
+        parse = patch.object(DicomMonitor, "_parse_first_dicom_in_folder",
+                             autospec=True, side_effect=self._parse)
+        parse.start()
+        self.addCleanup(parse.stop)
+        self.clock = FakeClock()
+
+    def _parse(self, monitor, folder):
+        self.parsed.append(os.path.basename(folder))
+        return dict(self.headers[folder])
+
+    def _monitor(self, **kwargs):
+        kwargs.setdefault("search_depths", [10])
+        m = DicomMonitor(cache_dir=self.cache_dir, data_dir=self.data_dir,
+                         clock=self.clock, **kwargs)
+        self.addCleanup(m.close)
+        return m
+
+    def test_new_accession_defers_unresolved_one(self):
+        m = self._monitor()
+        m._start_search("RAD-3-MR")
+        m._start_search("RAD-1-CT")
+        self.assertEqual(m.search_target_acc, "RAD-1-CT")
+        self.assertEqual(m.pending_targets, ["RAD-3-MR"])
+        self.assertEqual(m.metrics.counters["targets_deferred"], 1)
+
+    def test_locked_accession_not_deferred(self):
+        m = self._monitor()
+        m._start_search("RAD-1-CT")
+        m.continue_search()
+        m._start_search("RAD-2-CT")
+        self.assertEqual(m.pending_targets, [])
+
+    def test_one_sweep_serves_all_targets(self):
+        m = self._monitor()
+        m._start_search("RAD-3-MR")
+        m._start_search("RAD-2-CT")
+        m.continue_search()
+        self.assertEqual(m.current_locked_acc, "RAD-2-CT")
+        self.assertEqual(m.pending_targets, [])
+        self.assertIn("RAD-3-MR", m._cache)
+        self.assertEqual(self.parsed, ["1.2.1", "1.2.2", "1.2.3"])
+        self.assertEqual(m.metrics.counters["targets_resolved"], 1)
+
+    def test_state_file_holds_most_recent_target(self):
+        m = self._monitor()
+        m._start_search("RAD-2-CT")
+        m._start_search("RAD-3-MR")
+        m.continue_search()
+        with open(m.state_file, encoding="utf-8") as fh:
+            self.assertEqual(json.load(fh)["Acc"], "RAD-3-MR")
+        self.assertIn("RAD-2-CT", m._cache)
+
+    def test_pending_swept_after_cache_hit_lock(self):
+        m = self._monitor()
+        m._add_to_cache("RAD-9-CT", {"_Name": "DOE^JOHN", "Acc": "RAD-9-CT"})
+        m._start_search("RAD-3-MR")
+        m._start_search("RAD-9-CT")
+        m.continue_search()
+        self.assertEqual(m.current_locked_acc, "RAD-9-CT")
+        self.assertEqual(m.pending_targets, [])
+        self.assertIn("RAD-3-MR", m._cache)
+
+    def test_pending_swept_without_current_search(self):
+        m = self._monitor()
+        m._start_search("RAD-3-MR")
+        m._start_search("RAD-1-CT")
+        m.search_active = False  # e.g. current search timed out
+        m.continue_search()
+        self.assertIn("RAD-3-MR", m._cache)
+        self.assertEqual(m.current_locked_acc, "")
+
+    def test_folder_without_accession_does_not_end_deferred_sweep(self):
+        newest = os.path.join(self.cache_dir, "1.2.1")
+        self.headers[newest] = {"_Name": "DOE^JOHN", "Acc": "N/A", "Mod": "CT"}
+        m = self._monitor()
+        m._start_search("RAD-3-MR")
+        m._start_search("RAD-2-CT")
+        m.search_active = False  # deferred-only sweep
+        m.continue_search()
+        self.assertIn("RAD-3-MR", m._cache)
+        self.assertEqual(m.pending_targets, [])
+        self.assertEqual(self.parsed, ["1.2.1", "1.2.2", "1.2.3"])
+
+    def test_switching_back_is_cache_hit(self):
+        m = self._monitor()
+        m._start_search("RAD-3-MR")
+        m._start_search("RAD-2-CT")
+        m.continue_search()
+        self.parsed.clear()
+        m._start_search("RAD-3-MR")
+        result = m._try_match("RAD-3-MR")
+        self.assertEqual(result["_source"], "cache")
+        self.assertEqual(self.parsed, [])
+
+    def test_deferred_target_keeps_its_own_deadline(self):
+        m = self._monitor(search_timeout=30)
+        m._start_search("RAD-404-CT")
+        self.clock.now += 20
+        m._start_search("RAD-1-CT")
+        m.continue_search()
+        self.assertEqual(m.pending_targets, ["RAD-404-CT"])
+        self.clock.now += 11
+        m.continue_search()
+        self.assertEqual(m.pending_targets, [])
+        self.assertEqual(m.metrics.counters["targets_expired"], 1)
+
+    def test_oldest_dropped_beyond_max_targets(self):
+        m = self._monitor(max_targets=2)
+        for acc in ("RAD-2-CT", "RAD-3-MR", "RAD-1-CT"):
+            m._start_search(acc)
+        self.assertEqual(m.pending_targets, ["RAD-3-MR"])
+        self.assertEqual(m.metrics.counters["targets_dropped"], 1)
+
+    def test_reset_drops_pending(self):
+        m = self._monitor()
+        m._start_search("RAD-3-MR")
+        m._start_search("RAD-1-CT")
+        m.reset_state("patient_changed")
+        self.assertEqual(m.pending_targets, [])
+
+    def test_parallel_sweep_fills_cache(self):
+        m = self._monitor(probe_workers=4)
+        m._start_search("RAD-4-US")
+        m._start_search("RAD-404-CT")
+        m.continue_search()
+        self.assertIn("RAD-4-US", m._cache)
+        self.assertEqual(m.pending_targets, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
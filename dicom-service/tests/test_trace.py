@@ -0,0 +1,169 @@
+"""Tests for the trace recorder and the virtual-clock replay harness."""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+_SERVICE_DIR = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, _SERVICE_DIR)
+sys.path.insert(0, os.path.join(_SERVICE_DIR, "bench"))
+
+from trace_recorder import TraceRecorder, load_trace
+from tests.helpers import FakeClock
+
+try:
+    import pydicom
+    from replay_trace import Replay, replay
+except ImportError:
+    pydicom = None
+
+
+class TestTraceRecorder(unittest.TestCase):
+    """Test event capture and pseudonymisation."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, True)
+        self.log_path = os.path.join(self.tmp, "PSOnePerf.log")
+        with open(self.log_path, "w", encoding="utf-8") as fh:
+            fh.write("x OpenReport SingleAccession RAD-1-CT\n")
+        self.clock = FakeClock(100.0)
+        self.monitor = MagicMock()
+        self.monitor.index.get.return_value = None  # nothing indexed yet
+        self.rec = TraceRecorder(os.path.join(self.tmp, "traces", "t.jsonl"),
+                                 monitor=self.monitor, clock=self.clock,
+                                 psone_log_path=self.log_path)
+        self.rec.start(cache_folders=12)
+
+    def _append(self, acc):
+        with open(self.log_path, "a", encoding="utf-8") as fh:
+            fh.write(f"x OpenReport SingleAccession {acc}\n")
+
+    def _events(self):
+        self.rec.close()
+        return load_trace(self.rec.path)
+
+    def test_streams_scrubbed(self):
+        self.clock.now += 1.0
+        self.rec.window("DOE^JOHN")
+        self.rec.window("DOE^JOHN")  # unchanged: not recorded
+        self.clock.now += 1.0
+        self.rec.notify("/cache/1.2.840.5")
+        self._append("RAD-77-MR")
+        self.rec.poll_psone()
+        self.rec.poll_psone()  # no new append
+        self.rec.window("")
+
+        header, events = self._events()
+        self.assertEqual(header["cache_folders"], 12)
+        self.assertEqual([e["type"] for e in events],
+                         ["window", "folder", "psone", "window"])
+        self.assertEqual(events[0], {"t": 1.0, "type": "window", "patient": 1})
+        self.assertEqual(events[2]["study"], 1)
+        self.assertEqual(events[2]["mod"], "MR")
+        self.assertIsNone(events[3]["patient"])
+
+        with open(self.rec.path, encoding="utf-8") as fh:
+            raw = fh.read()
+        for secret in ("DOE", "JOHN", "RAD-", "1.2.840"):
+            self.assertNotIn(secret, raw)
+
+    def test_accession_without_modality_scrubbed(self):
+        for acc in ("12345", "RAD-67890", "RAD-24680-CT"):
+            self._append(acc)
+            self.rec.poll_psone()
+        _, events = self._events()
+        self.assertEqual([e["mod"] for e in events], ["", "", "CT"])
+        with open(self.rec.path, encoding="utf-8") as fh:
+            raw = fh.read()
+        for digits in ("12345", "67890", "24680"):
+            self.assertNotIn(digits, raw)
+
+    def test_existing_accession_not_an_event(self):
+        self.rec.poll_psone()
+        _, events = self._events()
+        self.assertEqual(events, [])
+
+    def test_folder_events_rate_limited(self):
+        for _ in range(5):
+            self.rec.notify("/cache/1.2.3")
+        self.clock.now += 2.0
+        self.rec.notify("/cache/1.2.3")
+        _, events = self._events()
+        self.assertEqual([e["t"] for e in events], [0.0, 2.0])
+        self.assertEqual({e["folder"] for e in events}, {1})
+
+    def test_link_through_index(self):
+        self.rec.notify("/cache/1.2.3")
+        self._append("RAD-5-CT")
+        self.rec.poll_psone()
+        self.monitor.index.get.return_value = {"Acc": "RAD-5-CT_2", "Mod": "CT"}
+        self.assertEqual(self.rec.link_folders(), 1)
+        self.assertEqual(self.rec.link_folders(), 0)
+        _, events = self._events()
+        link = events[-1]
+        self.assertEqual(link["type"], "link")
+        self.assertEqual((link["folder"], link["study"]), (1, 1))
+
+
+@unittest.skipIf(pydicom is None, "pydicom not installed")
+class TestReplay(unittest.TestCase):
+    """Test the replay harness end to end on a hand-written trace."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, True)
+        self.trace = os.path.join(self.tmp, "t.jsonl")
+        lines = [
+            {"type": "header", "version": 1, "cache_folders": 30,
+             "config": {"timer_interval": 2.0, "search_interval": 1.0}},
+            {"t": 1.0, "type": "window", "patient": 1},
+            {"t": 2.0, "type": "folder", "folder": 1},
+            {"t": 4.0, "type": "link", "folder": 1, "study": 1, "mod": "CT"},
+            {"t": 5.0, "type": "psone", "study": 1, "mod": "CT"},
+            {"t": 30.0, "type": "window", "patient": 2},
+            {"t": 31.0, "type": "psone", "study": 2, "mod": "MR"},
+            {"t": 60.0, "type": "window", "patient": None},
+        ]
+        with open(self.trace, "w", encoding="utf-8") as fh:
+            for line in lines:
+                fh.write(json.dumps(line) + "\n")
+
+    def test_all_studies_lock(self):
+        result = replay(self.trace, background=30)
+        self.assertEqual(result["locks"], 2)
+        self.assertEqual(result["unlocked"], 0)
+        self.assertGreaterEqual(result["virtual_s"], 60.0)
+        self.assertLess(result["latency_s"]["max"], 30.0)
+
+    def test_monitor_runs_on_virtual_time(self):
+        r = Replay(self.trace, os.path.join(self.tmp, "work"), background=30)
+        r.prepare()
+        r.run()
+        trigger = r.monitor.metrics.histograms["trigger_ms"]
+        self.assertEqual(trigger.count, 2)
+        # PSOne poll wakes at the traced time, so only job time is charged
+        self.assertLess(trigger.max, 2000)
+        counters = r.monitor.metrics.counters
+        self.assertGreaterEqual(counters["speculative_runs"], 2)
+        self.assertTrue(r.monitor._spec_future.done())
+        with open(r.monitor.state_file, encoding="utf-8") as fh:
+            written = json.load(fh)["Written"]
+        # Last write: the search started by the psone event at t=31
+        self.assertGreater(written - r._epoch_ns / 1e9, 30.0)
+        self.assertLessEqual(written, r._wall_clock())
+
+    def test_poll_only_is_slower(self):
+        fast = replay(self.trace, background=30)
+        slow = replay(self.trace, background=30, watchdog=False,
+                      prefetch=False, index=False)
+        self.assertEqual(slow["locks"], 2)
+        self.assertGreater(slow["latency_s"]["max"], fast["latency_s"]["max"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -79,6 +79,35 @@ class TestPatientSafety(unittest.TestCase):
         dm.reset_state.assert_not_called()
         self.assertEqual(wm.last_patient_title, "DOE^JOHN")
 
+    def test_new_patient_starts_speculation(self):
+        wm, dm = self._make_monitor_pair()
+        wm.last_patient_title = "DOE^JOHN"
+        with patch.object(wm, "get_patient_title", return_value="SMITH^JANE"):
+            wm.check_patient_safety(dm)
+        dm.speculate.assert_called_once_with("SMITH^JANE")
+
+    def test_window_closed_cancels_speculation(self):
+        wm, dm = self._make_monitor_pair()
+        wm.last_patient_title = "DOE^JOHN"
+        with patch.object(wm, "get_patient_title", return_value=""):
+            wm.check_patient_safety(dm)
+        dm.speculate.assert_called_once_with("")
+
+    def test_reset_before_speculation(self):
+        wm, dm = self._make_monitor_pair()
+        wm.last_patient_title = "DOE^JOHN"
+        with patch.object(wm, "get_patient_title", return_value="SMITH^JANE"):
+            wm.check_patient_safety(dm)
+        self.assertEqual([c[0] for c in dm.mock_calls],
+                         ["reset_state", "speculate"])
+
+    def test_same_patient_no_speculation(self):
+        wm, dm = self._make_monitor_pair()
+        wm.last_patient_title = "DOE^JOHN"
+        with patch.object(wm, "get_patient_title", return_value="DOE^JOHN"):
+            wm.check_patient_safety(dm)
+        dm.speculate.assert_not_called()
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,204 @@
+"""
+Trace Recorder — capture the detection pipeline's input event streams.
+
+Lock latency depends on how three independent streams interleave:
+
+* ``psone``  — PowerScribe appending an accession to PSOnePerf.log
+* ``window`` — the InteleViewer patient window title changing
+* ``folder`` — InteleViewer creating/writing study folders in the cache
+
+The recorder writes them as JSON lines to ``data/traces/trace-<time>.jsonl``
+for offline replay (see ``bench/replay_trace.py``)::
+
+    {"type": "header", "version": 1, "cache_folders": 4210, "config": {...}}
+    {"t": 12.503, "type": "window", "patient": 3}
+    {"t": 14.020, "type": "folder", "folder": 17}
+    {"t": 15.871, "type": "psone", "study": 9, "mod": "CT"}
+    {"t": 16.400, "type": "link", "folder": 17, "study": 9, "mod": "CT"}
+
+``t`` is seconds since the recording started.
+
+PRIVACY: accessions, patient names and study UIDs are replaced by per-trace
+integers (first seen = 1); the mapping lives only in memory.  The only
+clinical field kept is the modality.  ``link`` events tie a folder to the
+study it holds, resolved through the study index.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+
+from dicom_monitor import (_ACC_MOD_RE, _PSOneLogTail, _extract_core_acc,
+                           _extract_last_name, _psone_log_path)
+
+log = logging.getLogger(__name__)
+
+TRACE_VERSION = 1
+
+# watchdog reports every file written; one folder event per this many seconds
+_FOLDER_EVENT_GAP = 1.0
+
+
+class _Pseudonyms:
+    """Map identifying strings to small per-trace integers."""
+
+    def __init__(self):
+        self._ids = {}
+
+    def __call__(self, value):
+        if not value:
+            return None
+        ident = self._ids.get(value)
+        if ident is None:
+            ident = self._ids[value] = len(self._ids) + 1
+        return ident
+
+
+class TraceRecorder:
+    """Append scrubbed psone/window/folder events to a JSON-lines trace.
+
+    Thread-safe: folder events arrive on the watchdog observer thread.
+    """
+
+    def __init__(self, path, *, monitor=None, clock=time.monotonic,
+                 psone_log_path=""):
+        self.path = path
+        self.monitor = monitor
+        self.clock = clock
+        self.psone_log_path = psone_log_path
+        self.events = 0
+
+        self._studies = _Pseudonyms()
+        self._patients = _Pseudonyms()
+        self._folders = _Pseudonyms()
+        self._unlinked = {}       # folder uid -> pseudonym, awaiting a link
+        self._folder_seen = {}    # folder uid -> last event time
+        self._last_patient = 0    # 0 = nothing recorded yet
+        self._tail = None
+        self._start = clock()
+        self._fh = None
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self, cache_folders=0, config=None):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._fh = open(self.path, "w", encoding="utf-8")
+        self._start = self.clock()
+        self._write({"type": "header", "version": TRACE_VERSION,
+                     "started": round(time.time(), 3),
+                     "cache_folders": cache_folders,
+                     "config": config or {}})
+        # Only appends from now on count as events
+        self._tail = _PSOneLogTail(self.psone_log_path or _psone_log_path())
+        self._tail.poll()
+        log.info("Recording trace to %s", self.path)
+
+    def close(self):
+        self.link_folders()
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+        log.info("Trace closed (%d events)", self.events)
+
+    # ------------------------------------------------------------------
+    # Event streams
+    # ------------------------------------------------------------------
+
+    def poll_psone(self):
+        """Record a new PSOnePerf.log accession, if one was appended."""
+        if self._tail is None:
+            return
+        before = self._tail.last_acc
+        acc = self._tail.poll()
+        # Like DicomMonitor, a repeat of the same accession is not a new event
+        if not acc or acc == before:
+            return
+        # Stamp with the log mtime, not when we noticed
+        delay = max(0.0, time.time() - self._tail.mtime_ns / 1e9)
+        # Only a recognised modality code: anything else is part of the accession
+        m = _ACC_MOD_RE.search(acc)
+        self._record({"type": "psone", "study": self._studies(acc),
+                      "mod": m.group(1) if m else ""}, delay)
+
+    def window(self, title):
+        """Record the patient window title (pseudonymised by last name)."""
+        patient = self._patients(_extract_last_name(title)) if title else None
+        if patient == self._last_patient:
+            return
+        self._last_patient = patient
+        self._record({"type": "window", "patient": patient})
+
+    def notify(self, folder):
+        """Study-folder activity (``CacheFolderHandler`` prefetcher interface)."""
+        uid = os.path.basename(folder)
+        now = self.clock()
+        with self._lock:
+            last = self._folder_seen.get(uid)
+            if last is not None and now - last < _FOLDER_EVENT_GAP:
+                return
+            self._folder_seen[uid] = now
+            ident = self._folders(uid)
+            if last is None:
+                self._unlinked[uid] = ident
+        self._record({"type": "folder", "folder": ident})
+
+    def link_folders(self):
+        """Emit ``link`` events for folders the study index now knows."""
+        index = getattr(self.monitor, "index", None)
+        if index is None:
+            return 0
+        with self._lock:
+            pending = list(self._unlinked.items())
+        linked = 0
+        for uid, ident in pending:
+            entry = index.get(uid)
+            if not entry or not entry.get("Acc"):
+                continue
+            core = _extract_core_acc(entry["Acc"])
+            with self._lock:
+                self._unlinked.pop(uid, None)
+            self._record({"type": "link", "folder": ident,
+                          "study": self._studies(core), "mod": entry.get("Mod", "")})
+            linked += 1
+        return linked
+
+    # ------------------------------------------------------------------
+    # Output
+    # ------------------------------------------------------------------
+
+    def _record(self, event, delay=0.0):
+        event = dict(t=round(max(0.0, self.clock() - self._start - delay), 3),
+                     **event)
+        self._write(event)
+
+    def _write(self, event):
+        with self._lock:
+            if self._fh is None:
+                return
+            self._fh.write(json.dumps(event) + "\n")
+            self._fh.flush()
+            self.events += 1
+
+
+def load_trace(path):
+    """Return ``(header, events)`` from a trace file, events sorted by time."""
+    header = {}
+    events = []
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            event = json.loads(line)
+            if event.get("type") == "header":
+                header = event
+            else:
+                events.append(event)
+    events.sort(key=lambda e: e["t"])
+    return header, events
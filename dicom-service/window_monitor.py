@@ -2,7 +2,8 @@
 Window Monitor — InteleViewer patient window safety checks.
 
 Polls InteleViewer windows every timer tick. Clears DICOM state when the
-patient viewer closes or the displayed patient changes (last-name comparison).
+patient viewer closes or the displayed patient changes (last-name comparison),
+and starts a speculative lookup for the new patient's studies.
 """
 
 import logging
@@ -74,23 +75,24 @@ class WindowMonitor:
 
         *monitor* is the :class:`DicomMonitor` instance whose state should
         be reset when the window disappears or a different patient is loaded.
+        A new patient (or no patient) also restarts its speculative lookup.
         """
         current_title = self.get_patient_title()
+        new_last = _extract_last_name(current_title)
+        old_last = _extract_last_name(self.last_patient_title)
 
-        # Window closed while we had state
+        # Reset before speculating, so the next search's timings start from
+        # the reset rather than from the previous patient's state
         if not current_title and self.last_patient_title:
+            # Window closed while we had state
             log.info("Patient window closed — clearing state")
-            self.last_patient_title = ""
             monitor.reset_state("window_closed")
-            return
-
-        # Patient changed (different last name)
-        if current_title and self.last_patient_title:
-            new_last = _extract_last_name(current_title)
-            old_last = _extract_last_name(self.last_patient_title)
-            if new_last != old_last:
-                log.info("Patient changed: %s -> %s", old_last, new_last)
-                monitor.reset_state("patient_changed")
+        elif current_title and self.last_patient_title and new_last != old_last:
+            log.info("Patient changed: %s -> %s", old_last, new_last)
+            monitor.reset_state("patient_changed")
+
+        if new_last != old_last:
+            monitor.speculate(current_title)
 
         self.last_patient_title = current_title
 
@@ -3,6 +3,9 @@ API Handler for Report Check Python Backend
 
 Wraps anthropic, openai, and google-genai SDKs for all three providers.
 Replaces APIManager.ahk (777 lines) with ~150 lines.
+
+SDK clients come from client_pool, so connections are kept alive and
+reused across calls instead of re-handshaking on every request.
 """
 import sys
 import os
@@ -14,6 +17,8 @@ if script_dir not in sys.path:
 
 import logging
 
+import client_pool
+
 logger = logging.getLogger("report-check")
 
 # API constants
@@ -57,16 +62,14 @@ def send_to_api(provider, api_key, model, system_prompt, user_message,
 def _send_claude(api_key, model, system_prompt, user_message, max_tokens, temperature):
     """Send request to Claude API using the anthropic SDK."""
     try:
-        import anthropic
-
-        client = anthropic.Anthropic(api_key=api_key)
-        message = client.messages.create(
-            model=model,
-            max_tokens=max_tokens,
-            temperature=temperature,
-            system=system_prompt,
-            messages=[{"role": "user", "content": user_message}],
-        )
+        with client_pool.lease_client("claude", api_key) as client:
+            message = client.messages.create(
+                model=model,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                system=system_prompt,
+                messages=[{"role": "user", "content": user_message}],
+            )
         response_text = message.content[0].text
         stop_reason = message.stop_reason  # "end_turn", "max_tokens", etc.
 
@@ -94,28 +97,12 @@ def _send_claude(api_key, model, system_prompt, user_message, max_tokens, temper
 def _send_gemini(api_key, model, system_prompt, user_message, max_tokens, temperature):
     """Send request to Gemini API using the google-genai SDK."""
     try:
-        from google import genai
-        from google.genai import types
-
-        client = genai.Client(api_key=api_key)
-
-        response = client.models.generate_content(
-            model=model,
-            contents=user_message,
-            config=types.GenerateContentConfig(
-                system_instruction=system_prompt,
-                max_output_tokens=max_tokens,
-                temperature=temperature,
-                top_p=0.9,
-                top_k=40,
-                safety_settings=[
-                    types.SafetySetting(category="HARM_CATEGORY_HATE_SPEECH", threshold="OFF"),
-                    types.SafetySetting(category="HARM_CATEGORY_SEXUALLY_EXPLICIT", threshold="OFF"),
-                    types.SafetySetting(category="HARM_CATEGORY_DANGEROUS_CONTENT", threshold="OFF"),
-                    types.SafetySetting(category="HARM_CATEGORY_HARASSMENT", threshold="OFF"),
-                ],
-            ),
-        )
+        with client_pool.lease_client("gemini", api_key) as client:
+            response = client.models.generate_content(
+                model=model,
+                contents=user_message,
+                config=_gemini_config(system_prompt, max_tokens, temperature),
+            )
 
         response_text = response.text
         # Extract finish reason from candidates
@@ -148,18 +135,16 @@ def _send_gemini(api_key, model, system_prompt, user_message, max_tokens, temper
 def _send_openai(api_key, model, system_prompt, user_message, max_tokens, temperature):
     """Send request to OpenAI API using the openai SDK."""
     try:
-        import openai
-
-        client = openai.OpenAI(api_key=api_key)
-        response = client.chat.completions.create(
-            model=model,
-            temperature=temperature,
-            max_completion_tokens=max_tokens,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_message},
-            ],
-        )
+        with client_pool.lease_client("openai", api_key) as client:
+            response = client.chat.completions.create(
+                model=model,
+                temperature=temperature,
+                max_completion_tokens=max_tokens,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_message},
+                ],
+            )
 
         response_text = response.choices[0].message.content
         stop_reason = response.choices[0].finish_reason or ""  # "stop", "length", etc.
@@ -295,15 +280,14 @@ def send_to_api_multiturn(provider, api_key, model, system_prompt, messages,
 
 def _send_claude_multiturn(api_key, model, system_prompt, messages, max_tokens, temperature):
     try:
-        import anthropic
-        client = anthropic.Anthropic(api_key=api_key)
-        message = client.messages.create(
-            model=model,
-            max_tokens=max_tokens,
-            temperature=temperature,
-            system=system_prompt,
-            messages=messages,
-        )
+        with client_pool.lease_client("claude", api_key) as client:
+            message = client.messages.create(
+                model=model,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                system=system_prompt,
+                messages=messages,
+            )
         response_text = message.content[0].text
         stop_reason = message.stop_reason
         return {
@@ -316,29 +300,13 @@ def _send_claude_multiturn(api_key, model, system_prompt, messages, max_tokens,
 
 def _send_gemini_multiturn(api_key, model, system_prompt, messages, max_tokens, temperature):
     try:
-        from google import genai
-        from google.genai import types
-
-        client = genai.Client(api_key=api_key)
         contents = _build_gemini_contents(messages)
-
-        response = client.models.generate_content(
-            model=model,
-            contents=contents,
-            config=types.GenerateContentConfig(
-                system_instruction=system_prompt,
-                max_output_tokens=max_tokens,
-                temperature=temperature,
-                top_p=0.9,
-                top_k=40,
-                safety_settings=[
-                    types.SafetySetting(category="HARM_CATEGORY_HATE_SPEECH", threshold="OFF"),
-                    types.SafetySetting(category="HARM_CATEGORY_SEXUALLY_EXPLICIT", threshold="OFF"),
-                    types.SafetySetting(category="HARM_CATEGORY_DANGEROUS_CONTENT", threshold="OFF"),
-                    types.SafetySetting(category="HARM_CATEGORY_HARASSMENT", threshold="OFF"),
-                ],
-            ),
-        )
+        with client_pool.lease_client("gemini", api_key) as client:
+            response = client.models.generate_content(
+                model=model,
+                contents=contents,
+                config=_gemini_config(system_prompt, max_tokens, temperature),
+            )
         response_text = response.text
         stop_reason = ""
         if response.candidates:
@@ -354,15 +322,14 @@ def _send_gemini_multiturn(api_key, model, system_prompt, messages, max_tokens,
 
 def _send_openai_multiturn(api_key, model, system_prompt, messages, max_tokens, temperature):
     try:
-        import openai
-        client = openai.OpenAI(api_key=api_key)
         full_messages = [{"role": "system", "content": system_prompt}] + messages
-        response = client.chat.completions.create(
-            model=model,
-            temperature=temperature,
-            max_completion_tokens=max_tokens,
-            messages=full_messages,
-        )
+        with client_pool.lease_client("openai", api_key) as client:
+            response = client.chat.completions.create(
+                model=model,
+                temperature=temperature,
+                max_completion_tokens=max_tokens,
+                messages=full_messages,
+            )
         response_text = response.choices[0].message.content
         stop_reason = response.choices[0].finish_reason or ""
         return {
@@ -387,35 +354,60 @@ def _build_gemini_contents(messages):
     return contents
 
 
+def _gemini_config(system_prompt, max_tokens, temperature):
+    """GenerateContentConfig shared by every Gemini call."""
+    from google.genai import types
+
+    return types.GenerateContentConfig(
+        system_instruction=system_prompt,
+        max_output_tokens=max_tokens,
+        temperature=temperature,
+        top_p=0.9,
+        top_k=40,
+        safety_settings=[
+            types.SafetySetting(category="HARM_CATEGORY_HATE_SPEECH", threshold="OFF"),
+            types.SafetySetting(category="HARM_CATEGORY_SEXUALLY_EXPLICIT", threshold="OFF"),
+            types.SafetySetting(category="HARM_CATEGORY_DANGEROUS_CONTENT", threshold="OFF"),
+            types.SafetySetting(category="HARM_CATEGORY_HARASSMENT", threshold="OFF"),
+        ],
+    )
+
+
 # --- Streaming support ---
 
 
 def stream_to_api(provider, api_key, model, system_prompt, messages,
                   output_file, status_file,
-                  max_tokens=DEFAULT_MAX_TOKENS, temperature=DEFAULT_TEMPERATURE):
+                  max_tokens=DEFAULT_MAX_TOKENS, temperature=DEFAULT_TEMPERATURE,
+                  sinks=()):
     """Stream a multi-turn response, writing tokens to output_file.
 
-    Writes each chunk to output_file with flush().
+    Runs async_api.stream_chat on the shared event loop.  Writes each chunk
+    to output_file with flush(), and to any extra *sinks*.
     On completion, writes {"done": true, "error": null} to status_file.
     On error, writes {"done": true, "error": "..."} to status_file.
+
+    Returns dict with keys: success, response, stop_reason, usage, error
     """
     from pathlib import Path
     import json
+    import async_api
 
     try:
-        if provider == "claude":
-            _stream_claude(api_key, model, system_prompt, messages, output_file, max_tokens, temperature)
-        elif provider == "openai":
-            _stream_openai(api_key, model, system_prompt, messages, output_file, max_tokens, temperature)
-        elif provider == "gemini":
-            _stream_gemini(api_key, model, system_prompt, messages, output_file, max_tokens, temperature)
-        else:
-            raise ValueError(f"Unknown provider: {provider}")
+        events = async_api.stream_chat(provider, api_key, model, system_prompt,
+                                       messages, max_tokens, temperature)
+        final = async_api.run(async_api.pump(events, async_api.FileSink(output_file),
+                                             *sinks))
 
         Path(status_file).write_text(
             json.dumps({"done": True, "error": None}), encoding="utf-8"
         )
-        logger.info("Streaming completed successfully", extra={"provider": provider})
+        logger.info("Streaming completed successfully", extra={
+            "provider": provider, "stop_reason": final["stop_reason"],
+            **final["usage"],
+        })
+        return {"success": True, "response": final["response"],
+                "stop_reason": final["stop_reason"], "usage": final["usage"]}
 
     except Exception as e:
         error_msg = _translate_error(provider, e, model)
@@ -423,72 +415,4 @@ def stream_to_api(provider, api_key, model, system_prompt, messages,
         Path(status_file).write_text(
             json.dumps({"done": True, "error": error_msg}), encoding="utf-8"
         )
-
-
-def _stream_claude(api_key, model, system_prompt, messages, output_file, max_tokens, temperature):
-    import anthropic
-    client = anthropic.Anthropic(api_key=api_key)
-
-    with client.messages.stream(
-        model=model,
-        max_tokens=max_tokens,
-        temperature=temperature,
-        system=system_prompt,
-        messages=messages,
-    ) as stream:
-        with open(output_file, "w", encoding="utf-8") as f:
-            for text in stream.text_stream:
-                f.write(text)
-                f.flush()
-
-
-def _stream_openai(api_key, model, system_prompt, messages, output_file, max_tokens, temperature):
-    import openai
-    client = openai.OpenAI(api_key=api_key)
-
-    full_messages = [{"role": "system", "content": system_prompt}] + messages
-    stream = client.chat.completions.create(
-        model=model,
-        temperature=temperature,
-        max_completion_tokens=max_tokens,
-        messages=full_messages,
-        stream=True,
-    )
-
-    with open(output_file, "w", encoding="utf-8") as f:
-        for chunk in stream:
-            if chunk.choices and chunk.choices[0].delta.content:
-                f.write(chunk.choices[0].delta.content)
-                f.flush()
-
-
-def _stream_gemini(api_key, model, system_prompt, messages, output_file, max_tokens, temperature):
-    from google import genai
-    from google.genai import types
-
-    client = genai.Client(api_key=api_key)
-    contents = _build_gemini_contents(messages)
-
-    response = client.models.generate_content_stream(
-        model=model,
-        contents=contents,
-        config=types.GenerateContentConfig(
-            system_instruction=system_prompt,
-            max_output_tokens=max_tokens,
-            temperature=temperature,
-            top_p=0.9,
-            top_k=40,
-            safety_settings=[
-                types.SafetySetting(category="HARM_CATEGORY_HATE_SPEECH", threshold="OFF"),
-                types.SafetySetting(category="HARM_CATEGORY_SEXUALLY_EXPLICIT", threshold="OFF"),
-                types.SafetySetting(category="HARM_CATEGORY_DANGEROUS_CONTENT", threshold="OFF"),
-                types.SafetySetting(category="HARM_CATEGORY_HARASSMENT", threshold="OFF"),
-            ],
-        ),
-    )
-
-    with open(output_file, "w", encoding="utf-8") as f:
-        for chunk in response:
-            if chunk.text:
-                f.write(chunk.text)
-                f.flush()
+        return {"success": False, "error": error_msg}
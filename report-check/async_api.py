@@ -0,0 +1,296 @@
+"""
+Async API layer for Report Check Python Backend
+
+One streaming interface over the three provider SDKs' asyncio clients
+(AsyncAnthropic, AsyncOpenAI, genai.Client().aio):
+
+    async for event in stream_chat(provider, api_key, model, system, messages):
+        if event["type"] == "text":
+            ...                      # event["text"]: the next delta
+        else:                        # "done", always last
+            ...                      # event["stop_reason"], event["usage"]
+
+usage is {"input_tokens": int, "output_tokens": int} (zeros when the
+provider didn't report it).  Provider errors are raised unchanged, so
+callers translate them with api_handler's error translators.
+
+Where the deltas go is up to the caller: pump() drives a stream into any
+number of sinks (FileSink, SocketSink, MemorySink, or anything with
+write(text) / close(final), either of which may be a coroutine).  A new
+transport is a new sink, not another copy of each provider.  Sinks run on
+the shared loop, so they must not block it: FileSink hands its writes to
+a thread and SocketSink uses the loop's non-blocking socket calls.
+
+All coroutines run on one shared background event loop (get_loop), so
+concurrent calls share it and the pooled async clients bound to it.
+Synchronous code — the backend's handlers and worker threads — submits
+work with run().
+"""
+import sys
+import os
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+if script_dir not in sys.path:
+    sys.path.insert(0, script_dir)
+
+import asyncio
+import inspect
+import logging
+import threading
+
+import client_pool
+
+logger = logging.getLogger("report-check")
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+# --- Event loop ---
+
+def get_loop():
+    """Return the shared event loop, starting its thread on first use."""
+    global _loop
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="async-api",
+                             daemon=True).start()
+            _loop = loop
+        return _loop
+
+
+def run(coro, timeout=None):
+    """Run *coro* on the shared loop from synchronous code; return its result.
+
+    On timeout the coroutine is cancelled before TimeoutError is raised.
+    """
+    future = asyncio.run_coroutine_threadsafe(coro, get_loop())
+    try:
+        return future.result(timeout)
+    except TimeoutError:
+        future.cancel()
+        raise
+
+
+def run_soon(coro):
+    """Schedule *coro* on the shared loop without waiting for it."""
+    return asyncio.run_coroutine_threadsafe(coro, get_loop())
+
+
+# --- Streaming ---
+
+async def stream_chat(provider, api_key, model, system_prompt, messages,
+                      max_tokens=4000, temperature=0.2):
+    """Stream a multi-turn response as text events followed by one done event.
+
+    Args:
+        messages: list of {role, content} dicts (full conversation history)
+    """
+    if provider == "claude":
+        stream = _stream_claude
+    elif provider == "openai":
+        stream = _stream_openai
+    elif provider == "gemini":
+        stream = _stream_gemini
+    else:
+        raise ValueError(f"Unknown provider: {provider}")
+    async for event in stream(api_key, model, system_prompt, messages,
+                              max_tokens, temperature):
+        yield event
+
+
+async def _stream_claude(api_key, model, system_prompt, messages, max_tokens, temperature):
+    with client_pool.lease_async_client("claude", api_key) as client:
+        async with client.messages.stream(
+            model=model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            system=system_prompt,
+            messages=messages,
+        ) as stream:
+            async for text in stream.text_stream:
+                yield {"type": "text", "text": text}
+            final = await stream.get_final_message()
+
+    usage = final.usage
+    yield _done(final.stop_reason,
+                getattr(usage, "input_tokens", 0), getattr(usage, "output_tokens", 0))
+
+
+async def _stream_openai(api_key, model, system_prompt, messages, max_tokens, temperature):
+    full_messages = [{"role": "system", "content": system_prompt}] + messages
+    stop_reason = ""
+    input_tokens = output_tokens = 0
+    with client_pool.lease_async_client("openai", api_key) as client:
+        stream = await client.chat.completions.create(
+            model=model,
+            temperature=temperature,
+            max_completion_tokens=max_tokens,
+            messages=full_messages,
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        async for chunk in stream:
+            if chunk.choices:
+                choice = chunk.choices[0]
+                if choice.delta.content:
+                    yield {"type": "text", "text": choice.delta.content}
+                if choice.finish_reason:
+                    stop_reason = choice.finish_reason
+            if chunk.usage:  # final chunk, no choices
+                input_tokens = chunk.usage.prompt_tokens or 0
+                output_tokens = chunk.usage.completion_tokens or 0
+
+    yield _done(stop_reason, input_tokens, output_tokens)
+
+
+async def _stream_gemini(api_key, model, system_prompt, messages, max_tokens, temperature):
+    import api_handler
+
+    stop_reason = ""
+    input_tokens = output_tokens = 0
+    with client_pool.lease_async_client("gemini", api_key) as client:
+        response = await client.aio.models.generate_content_stream(
+            model=model,
+            contents=api_handler._build_gemini_contents(messages),
+            config=api_handler._gemini_config(system_prompt, max_tokens, temperature),
+        )
+        async for chunk in response:
+            if chunk.text:
+                yield {"type": "text", "text": chunk.text}
+            if chunk.candidates and chunk.candidates[0].finish_reason:
+                finish_reason = chunk.candidates[0].finish_reason
+                stop_reason = finish_reason.name if hasattr(finish_reason, "name") else str(finish_reason)
+            if chunk.usage_metadata:
+                input_tokens = chunk.usage_metadata.prompt_token_count or 0
+                output_tokens = chunk.usage_metadata.candidates_token_count or 0
+
+    yield _done(stop_reason, input_tokens, output_tokens)
+
+
+def _done(stop_reason, input_tokens, output_tokens):
+    return {
+        "type": "done",
+        "stop_reason": stop_reason or "",
+        "usage": {"input_tokens": input_tokens or 0, "output_tokens": output_tokens or 0},
+    }
+
+
+async def pump(events, *sinks):
+    """Drive *events* (from stream_chat) into *sinks*; return the done event.
+
+    The returned dict also carries the full "response" text.  Every sink is
+    closed — with the done event on success, with None when the stream
+    raised or was cancelled (the exception is re-raised, and *events* is
+    closed so the provider stream is released).  A sink whose write fails
+    is closed with None and dropped; the stream goes on for the others.
+    """
+    sinks = list(sinks)
+    parts = []
+    final = None
+    try:
+        async for event in events:
+            if event["type"] == "text":
+                parts.append(event["text"])
+                for sink in list(sinks):
+                    try:
+                        await _maybe_await(sink.write(event["text"]))
+                    except Exception as e:
+                        logger.warning(f"Stream sink failed, dropping it: {e}")
+                        sinks.remove(sink)
+                        await _close_sink(sink, None)
+            elif event["type"] == "done":
+                final = dict(event, response="".join(parts))
+    except BaseException:
+        for sink in sinks:
+            await _close_sink(sink, None)
+        raise
+    finally:
+        if hasattr(events, "aclose"):
+            await events.aclose()
+    if final is None:
+        final = _done("", 0, 0)
+        final["response"] = "".join(parts)
+    for sink in sinks:
+        await _close_sink(sink, final)
+    return final
+
+
+async def _maybe_await(result):
+    if inspect.isawaitable(result):
+        await result
+
+
+async def _close_sink(sink, final):
+    try:
+        await _maybe_await(sink.close(final))
+    except Exception as e:
+        logger.warning(f"Failed to close stream sink: {e}")
+
+
+# --- Sinks ---
+
+class FileSink:
+    """Write deltas to a file, flushed per delta (the AHK GUIs poll it).
+
+    The file is created on the first delta (or empty on a successful
+    stream without any), so a request that fails up front leaves none.
+    File I/O runs in a worker thread, so a slow disk holds up only this
+    stream.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    async def write(self, text):
+        await asyncio.to_thread(self._write, text)
+
+    async def close(self, final=None):
+        await asyncio.to_thread(self._close, final)
+
+    def _write(self, text):
+        if self._file is None:
+            self._file = open(self.path, "w", encoding="utf-8")
+        self._file.write(text)
+        self._file.flush()
+
+    def _close(self, final):
+        if self._file is None:
+            if final is not None:
+                open(self.path, "w", encoding="utf-8").close()
+            return
+        self._file.close()
+
+
+class SocketSink:
+    """Send deltas as UTF-8 over a connected socket (set non-blocking)."""
+
+    def __init__(self, sock):
+        self.sock = sock
+        sock.setblocking(False)
+
+    async def write(self, text):
+        await asyncio.get_running_loop().sock_sendall(self.sock, text.encode("utf-8"))
+
+    def close(self, final=None):
+        self.sock.close()
+
+
+class MemorySink:
+    """Collect deltas in memory (tests, warm-up, non-streaming callers)."""
+
+    def __init__(self):
+        self.parts = []
+        self.final = None
+
+    def write(self, text):
+        self.parts.append(text)
+
+    def close(self, final=None):
+        self.final = final
+
+    @property
+    def text(self):
+        return "".join(self.parts)
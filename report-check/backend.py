@@ -6,6 +6,9 @@ Called by AHK via subprocess:
 
 Reads request, performs API call + targeted review + HTML generation,
 writes response JSON to the same directory.
+
+Or started once and kept warm (see backend_server):
+    python.exe backend.py --serve [--parent-pid <pid>]
 """
 import sys
 import os
@@ -16,27 +19,77 @@ if script_dir not in sys.path:
     sys.path.insert(0, script_dir)
 
 import json
+import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Import project modules (after sys.path setup)
 from logger import setup_logging
 import config_reader
 import api_handler
+import backend_server
 import html_generator
 import targeted_review
 import session_manager
+import stream_hub
 import utils
 
 VERSION = "0.21.7"
 
+# The targeted review needs only the report and demographics, so it runs on
+# this pool alongside the main review call instead of after it.  Sized like
+# the warm server's job workers, so concurrent reviews never queue their
+# targeted call behind another review's.
+_targeted_pool = ThreadPoolExecutor(max_workers=backend_server.JOB_WORKERS,
+                                    thread_name_prefix="targeted")
+# A targeted review whose main call failed is waited for in the one-shot
+# CLI (so it doesn't exit mid-call) but left to finish detached in server
+# mode, so the error reaches the user straight away
+_wait_for_discarded = True
+
 
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--serve":
+        serve_main(sys.argv[2:])
+        return
+
     request_path = Path(sys.argv[1])
     request = json.loads(request_path.read_text(encoding="utf-8"))
     response_path = request_path.with_name("response.json")
 
-    # Setup logging early
+    result = run_command(request)
+    response_path.write_text(
+        json.dumps(result, ensure_ascii=False), encoding="utf-8"
+    )
+
+
+def serve_main(argv):
+    """Run as a long-lived server (see backend_server)."""
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="backend.py --serve")
+    parser.add_argument("--parent-pid", type=int, default=0)
+    parser.add_argument("--state-dir", default="")
+    parser.add_argument("--idle-timeout", type=float, default=3600.0)
+    args = parser.parse_args(argv)
+
+    global _wait_for_discarded
+    _wait_for_discarded = False
+    logger = setup_logging()
+    logger.info("Backend server starting", extra={"version": VERSION})
+    backend_server.serve(run_command, state_dir=args.state_dir,
+                         parent_pid=args.parent_pid,
+                         idle_timeout=args.idle_timeout)
+
+
+def run_command(request):
+    """Run one request and return its response dict (never raises).
+
+    Shared by the one-shot CLI and the server mode, so both speak the same
+    request/response JSON.
+    """
+    # Setup logging early (debug level follows the request's config)
     config_path = request.get("config_path", "")
     debug = False
     try:
@@ -50,27 +103,13 @@ def main():
 
     try:
         command = request.get("command", "")
-        if command == "review":
-            result = handle_review(request)
-        elif command == "test_api_key":
-            result = handle_test_api_key(request)
-        elif command == "follow_up":
-            result = handle_follow_up(request)
-        elif command == "stream_follow_up":
-            result = handle_stream_follow_up(request)
-        elif command == "stream_review":
-            result = handle_stream_review(request)
-        else:
-            result = {"success": False, "error": f"Unknown command: {command}"}
-
-        response_path.write_text(
-            json.dumps(result, ensure_ascii=False), encoding="utf-8"
-        )
-
+        handler = COMMANDS.get(command)
+        if handler is None:
+            return {"success": False, "error": f"Unknown command: {command}"}
+        return handler(request)
     except Exception as e:
         logger.error(f"Unhandled exception: {e}\n{traceback.format_exc()}")
-        error_response = {"success": False, "error": str(e)}
-        response_path.write_text(json.dumps(error_response), encoding="utf-8")
+        return {"success": False, "error": str(e)}
 
 
 def handle_review(request):
@@ -143,42 +182,33 @@ def handle_review(request):
     else:
         user_message = "Please review this radiology report:\n\n" + report_with_context
 
-    # --- Main API call (with per-mode parameters) ---
-    profile = api_handler.REVIEW_PROFILES.get(mode, {})
-    api_result = api_handler.send_to_api(
-        provider, api_key, model, system_prompt, user_message,
-        max_tokens=profile.get("max_tokens", api_handler.DEFAULT_MAX_TOKENS),
-        temperature=profile.get("temperature", api_handler.DEFAULT_TEMPERATURE),
-    )
-
-    if not api_result.get("success"):
-        return {
-            "success": False,
-            "error": api_result.get("error", "API call failed"),
-            "provider": api_result.get("provider", provider),
-            "model": api_result.get("model", model),
-        }
-
-    # --- Targeted review (if enabled and comprehensive mode) ---
-    targeted_areas = []
-    targeted_user_message = ""
-    targeted_demographics_label = ""
-
-    if config_reader.is_targeted_review_enabled(config) and mode == "comprehensive":
-        logger.info("Getting targeted review...")
-        try:
-            tr_result = targeted_review.get_targeted_review(
-                original_report, config, config_dir
-            )
-            if tr_result.get("success") and tr_result.get("areas"):
-                targeted_areas = tr_result["areas"]
-                targeted_demographics_label = tr_result.get("demographics_label", "")
-                logger.info("Targeted review obtained", extra={"count": len(targeted_areas)})
-            else:
-                targeted_user_message = tr_result.get("user_message", "")
-                targeted_demographics_label = tr_result.get("demographics_label", "")
-        except Exception as e:
-            logger.warning(f"Targeted review failed: {e}")
+    # --- Targeted review (if enabled and comprehensive mode), concurrently ---
+    targeted = _start_targeted_review(original_report, config, config_dir, mode)
+    try:
+        # --- Main API call (with per-mode parameters) ---
+        profile = api_handler.REVIEW_PROFILES.get(mode, {})
+        main_started = time.monotonic()
+        api_result = api_handler.send_to_api(
+            provider, api_key, model, system_prompt, user_message,
+            max_tokens=profile.get("max_tokens", api_handler.DEFAULT_MAX_TOKENS),
+            temperature=profile.get("temperature", api_handler.DEFAULT_TEMPERATURE),
+        )
+        main_finished = time.monotonic()
+
+        if not api_result.get("success"):
+            return {
+                "success": False,
+                "error": api_result.get("error", "API call failed"),
+                "provider": api_result.get("provider", provider),
+                "model": api_result.get("model", model),
+            }
+
+        # --- Join the targeted review ---
+        targeted_areas, targeted_user_message, targeted_demographics_label = \
+            _join_targeted_review(targeted, main_started, main_finished)
+        targeted = None
+    finally:
+        _discard_targeted_review(targeted)
 
     # --- Create conversation session ---
     session_id = ""
@@ -248,6 +278,80 @@ def handle_review(request):
     }
 
 
+def _start_targeted_review(original_report, config, config_dir, mode):
+    """Start the targeted review on a worker thread (None if not applicable).
+
+    Called as soon as the request is validated, so the targeted call runs
+    while the main review is in flight; see _join_targeted_review.
+    """
+    if not (config_reader.is_targeted_review_enabled(config) and mode == "comprehensive"):
+        return None
+    logger = setup_logging()
+    logger.info("Getting targeted review (concurrent with main review)...")
+    return _targeted_pool.submit(
+        _timed_targeted_review, original_report, config, config_dir
+    )
+
+
+def _timed_targeted_review(original_report, config, config_dir):
+    """Worker: returns (result or None, error or None, started, finished)."""
+    started = time.monotonic()
+    try:
+        result = targeted_review.get_targeted_review(original_report, config, config_dir)
+        return result, None, started, time.monotonic()
+    except Exception as e:
+        return None, e, started, time.monotonic()
+
+
+def _join_targeted_review(future, main_started, main_finished):
+    """Wait for the targeted review started by _start_targeted_review.
+
+    Returns (targeted_areas, targeted_user_message, targeted_demographics_label)
+    and logs how long each branch took and how much of them overlapped.
+    """
+    if future is None:
+        return [], "", ""
+    logger = setup_logging()
+
+    join_started = time.monotonic()
+    tr_result, error, tr_started, tr_finished = future.result()
+    overlap = min(main_finished, tr_finished) - max(main_started, tr_started)
+    logger.info("Targeted review joined", extra={
+        "main_seconds": round(main_finished - main_started, 2),
+        "targeted_seconds": round(tr_finished - tr_started, 2),
+        "overlap_seconds": round(max(0.0, overlap), 2),
+        "join_wait_seconds": round(time.monotonic() - join_started, 2),
+    })
+
+    if error is not None:
+        logger.warning(f"Targeted review failed: {error}")
+        return [], "", ""
+    if tr_result.get("success") and tr_result.get("areas"):
+        logger.info("Targeted review obtained", extra={"count": len(tr_result["areas"])})
+        return tr_result["areas"], "", tr_result.get("demographics_label", "")
+    return [], tr_result.get("user_message", ""), tr_result.get("demographics_label", "")
+
+
+def _discard_targeted_review(future):
+    """Settle a targeted review whose result won't be used (main call failed).
+
+    Cancelled if it hasn't started.  Otherwise the one-shot CLI waits for
+    it, so the process doesn't exit with the call in flight; the server
+    returns at once and lets it finish on its worker.
+    """
+    if future is None or future.cancel():
+        return
+    if not _wait_for_discarded:
+        future.add_done_callback(lambda f: setup_logging().info(
+            "Targeted review discarded", extra={"detached": True}))
+        return
+    started = time.monotonic()
+    future.result()  # _timed_targeted_review never raises
+    setup_logging().info("Targeted review discarded", extra={
+        "wait_seconds": round(time.monotonic() - started, 2),
+    })
+
+
 def handle_test_api_key(request):
     """Handle the 'test_api_key' command — verify API key works."""
     logger = setup_logging()
@@ -298,14 +402,13 @@ def handle_stream_review(request):
 
     stream_file = request.get("stream_file", "")
     status_file = request.get("status_file", "")
+    channel = stream_hub.channel(request.get("stream_id"))
 
     def _write_error(msg):
         """Helper to write error to status file and return error dict."""
-        if status_file:
-            Path(status_file).write_text(
-                json.dumps({"done": True, "error": msg, "html_file": "", "session_id": ""}),
-                encoding="utf-8",
-            )
+        _write_stream_status(status_file, channel, {
+            "done": True, "error": msg, "html_file": "", "session_id": "",
+        })
         return {"success": False, "error": msg}
 
     if not stream_file or not status_file:
@@ -371,65 +474,58 @@ def handle_stream_review(request):
     else:
         user_message = "Please review this radiology report:\n\n" + report_with_context
 
-    # --- Stream the API response ---
-    profile = api_handler.REVIEW_PROFILES.get(mode, {})
-    api_status_file = stream_file + ".api_done"
-
-    api_handler.stream_to_api(
-        provider, api_key, model, system_prompt,
-        [{"role": "user", "content": user_message}],
-        stream_file, api_status_file,
-        max_tokens=profile.get("max_tokens", api_handler.DEFAULT_MAX_TOKENS),
-        temperature=profile.get("temperature", api_handler.DEFAULT_TEMPERATURE),
-    )
-
-    # Check if API streaming succeeded
+    # --- Targeted review (if enabled and comprehensive mode), concurrently ---
+    targeted = _start_targeted_review(original_report, config, config_dir, mode)
     try:
-        api_status = json.loads(Path(api_status_file).read_text(encoding="utf-8"))
-    except Exception as e:
-        return _write_error(f"Failed to read API status: {e}")
-    finally:
+        # --- Stream the API response ---
+        profile = api_handler.REVIEW_PROFILES.get(mode, {})
+        api_status_file = stream_file + ".api_done"
+
+        main_started = time.monotonic()
+        api_handler.stream_to_api(
+            provider, api_key, model, system_prompt,
+            [{"role": "user", "content": user_message}],
+            stream_file, api_status_file,
+            max_tokens=profile.get("max_tokens", api_handler.DEFAULT_MAX_TOKENS),
+            temperature=profile.get("temperature", api_handler.DEFAULT_TEMPERATURE),
+            sinks=[channel] if channel else (),
+        )
+        main_finished = time.monotonic()
+
+        # Check if API streaming succeeded
         try:
-            Path(api_status_file).unlink()
-        except OSError:
-            pass
+            api_status = json.loads(Path(api_status_file).read_text(encoding="utf-8"))
+        except Exception as e:
+            return _write_error(f"Failed to read API status: {e}")
+        finally:
+            try:
+                Path(api_status_file).unlink()
+            except OSError:
+                pass
 
-    if api_status.get("error"):
-        return _write_error(api_status["error"])
+        if api_status.get("error"):
+            return _write_error(api_status["error"])
 
-    # Read the full streamed response
-    try:
-        ai_response = Path(stream_file).read_text(encoding="utf-8")
-    except Exception as e:
-        return _write_error(f"Failed to read streamed response: {e}")
-
-    if not ai_response.strip():
-        return _write_error("Empty response from API")
+        # Read the full streamed response
+        try:
+            ai_response = Path(stream_file).read_text(encoding="utf-8")
+        except Exception as e:
+            return _write_error(f"Failed to read streamed response: {e}")
 
-    logger.info("Streaming API call completed", extra={
-        "provider": provider, "model": model,
-        "response_length": len(ai_response),
-    })
+        if not ai_response.strip():
+            return _write_error("Empty response from API")
 
-    # --- Targeted review (if enabled and comprehensive mode) ---
-    targeted_areas = []
-    targeted_user_message = ""
-    targeted_demographics_label = ""
+        logger.info("Streaming API call completed", extra={
+            "provider": provider, "model": model,
+            "response_length": len(ai_response),
+        })
 
-    if config_reader.is_targeted_review_enabled(config) and mode == "comprehensive":
-        logger.info("Getting targeted review...")
-        try:
-            tr_result = targeted_review.get_targeted_review(
-                original_report, config, config_dir
-            )
-            if tr_result.get("success") and tr_result.get("areas"):
-                targeted_areas = tr_result["areas"]
-                targeted_demographics_label = tr_result.get("demographics_label", "")
-            else:
-                targeted_user_message = tr_result.get("user_message", "")
-                targeted_demographics_label = tr_result.get("demographics_label", "")
-        except Exception as e:
-            logger.warning(f"Targeted review failed: {e}")
+        # --- Join the targeted review ---
+        targeted_areas, targeted_user_message, targeted_demographics_label = \
+            _join_targeted_review(targeted, main_started, main_finished)
+        targeted = None
+    finally:
+        _discard_targeted_review(targeted)
 
     # --- Create conversation session ---
     session_id = ""
@@ -472,15 +568,12 @@ def handle_stream_review(request):
         html_file = ""
 
     # --- Write final status file ---
-    Path(status_file).write_text(
-        json.dumps({
-            "done": True,
-            "error": None,
-            "html_file": html_file,
-            "session_id": session_id,
-        }),
-        encoding="utf-8",
-    )
+    _write_stream_status(status_file, channel, {
+        "done": True,
+        "error": None,
+        "html_file": html_file,
+        "session_id": session_id,
+    })
 
     logger.info("Streaming review complete", extra={
         "session_id": session_id, "html_file": html_file,
@@ -574,36 +667,26 @@ def handle_stream_follow_up(request):
     stream_file = request.get("stream_file", "")
     status_file = request.get("status_file", "")
     config_path = request.get("config_path", "")
+    channel = stream_hub.channel(request.get("stream_id"))
 
     if not session_id or not stream_file or not status_file:
         error_msg = "Missing required parameters for stream_follow_up"
         if status_file:
-            Path(status_file).write_text(
-                json.dumps({"done": True, "error": error_msg}), encoding="utf-8"
-            )
+            _write_stream_status(status_file, channel, {"done": True, "error": error_msg})
         return {"success": False, "error": error_msg}
 
     if not user_message.strip():
-        Path(status_file).write_text(
-            json.dumps({"done": True, "error": "Empty follow-up message"}),
-            encoding="utf-8",
-        )
+        _write_stream_status(status_file, channel, {"done": True, "error": "Empty follow-up message"})
         return {"success": False, "error": "Empty follow-up message"}
 
     session = session_manager.load(session_id)
     if not session:
-        Path(status_file).write_text(
-            json.dumps({"done": True, "error": "Session not found or expired"}),
-            encoding="utf-8",
-        )
+        _write_stream_status(status_file, channel, {"done": True, "error": "Session not found or expired"})
         return {"success": False, "error": "Session not found or expired"}
 
     # Read config for API key
     if not config_path or not os.path.exists(config_path):
-        Path(status_file).write_text(
-            json.dumps({"done": True, "error": "Config file not found"}),
-            encoding="utf-8",
-        )
+        _write_stream_status(status_file, channel, {"done": True, "error": "Config file not found"})
         return {"success": False, "error": "Config file not found"}
 
     config = config_reader.read_config(config_path)
@@ -612,9 +695,7 @@ def handle_stream_follow_up(request):
 
     if not api_key:
         error_msg = f"API key not configured for {provider}"
-        Path(status_file).write_text(
-            json.dumps({"done": True, "error": error_msg}), encoding="utf-8"
-        )
+        _write_stream_status(status_file, channel, {"done": True, "error": error_msg})
         return {"success": False, "error": error_msg}
 
     # Add user turn
@@ -629,12 +710,16 @@ def handle_stream_follow_up(request):
         "turn_count": len(messages),
     })
 
-    # Stream the response (blocks until complete, writes to files)
-    api_handler.stream_to_api(
+    # Stream the response (blocks until complete, writes to files and,
+    # when the WebView subscribed, to the stream channel)
+    stream_result = api_handler.stream_to_api(
         provider, api_key, session["model"],
         session["system_prompt"], messages,
         stream_file, status_file,
+        sinks=[channel] if channel else (),
     )
+    if channel:
+        channel.finish({"done": True, "error": stream_result.get("error")})
 
     # After streaming completes, save the full response to the session
     try:
@@ -651,5 +736,22 @@ def handle_stream_follow_up(request):
     return {"success": True, "session_id": session_id}
 
 
+def _write_stream_status(status_file, channel, status):
+    """Write the stream status file and publish the same status in-band."""
+    if status_file:
+        Path(status_file).write_text(json.dumps(status), encoding="utf-8")
+    if channel is not None:
+        channel.finish(status)
+
+
+COMMANDS = {
+    "review": handle_review,
+    "test_api_key": handle_test_api_key,
+    "follow_up": handle_follow_up,
+    "stream_follow_up": handle_stream_follow_up,
+    "stream_review": handle_stream_review,
+}
+
+
 if __name__ == "__main__":
     main()
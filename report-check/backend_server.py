@@ -0,0 +1,324 @@
+"""
+Backend Server for Report Check Python Backend
+
+Keeps one backend process warm between reviews.  Started by AHK as:
+    python.exe backend.py --serve [--parent-pid <pid>] [--state-dir <dir>]
+
+Without it every review, follow-up and API-key test starts a fresh
+python.exe and pays interpreter startup, the provider SDK imports and
+logging/config setup again before the first token.
+
+Listens on 127.0.0.1 (random port) and writes the port, PID and a per-run
+token to <state-dir>/backend.json.  Requests carry the token in the
+X-Backend-Token header; the body is the same request JSON the CLI reads
+from request.json, and the reply is the same response JSON:
+
+    GET  /ping       liveness and pooled-client stats (see client_pool)
+    POST /run        run the command and reply with its result
+    POST /submit     run the command on a worker thread, reply at once
+                     (stream_review / stream_follow_up: results arrive
+                     through stream_file / status_file as before)
+    POST /shutdown   stop the server
+    GET  /events?stream=<id>&token=<token>
+                     Server-Sent Events for a streamed request that carried
+                     "stream_id" (see stream_hub); the token is a query
+                     parameter because EventSource can't set headers.
+                     Unknown or expired streams get 404
+
+The server exits when the AHK parent process is gone, or after
+idle_timeout seconds without a request.  backend.py <request.json> keeps
+working unchanged as the fallback.
+"""
+import sys
+import os
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+if script_dir not in sys.path:
+    sys.path.insert(0, script_dir)
+
+import json
+import logging
+import secrets
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import client_pool
+import stream_hub
+
+logger = logging.getLogger("report-check")
+
+INFO_FILE_NAME = "backend.json"
+TOKEN_HEADER = "X-Backend-Token"
+
+# Provider SDKs imported in the background on start, so the first review
+# doesn't pay for them (api_handler imports them lazily)
+WARM_MODULES = ("anthropic", "openai", "google.genai", "httpx")
+
+PARENT_CHECK_SECONDS = 5.0
+
+# Worker threads for /submit jobs (reviews and follow-ups run here)
+JOB_WORKERS = 4
+
+# SSE comment sent on an idle /events stream, so a gone subscriber is noticed
+EVENTS_KEEPALIVE_SECONDS = 15.0
+
+
+def default_state_dir():
+    """Same directory AHK writes request files to (%TEMP%\\ReportCheck)."""
+    return os.path.join(tempfile.gettempdir(), "ReportCheck")
+
+
+class BackendServer:
+    """Loopback HTTP front end for backend.run_command."""
+
+    def __init__(self, run_command, state_dir, host="127.0.0.1", port=0,
+                 parent_pid=0, idle_timeout=3600.0, workers=JOB_WORKERS):
+        self.run_command = run_command
+        self.state_dir = state_dir
+        self.info_file = os.path.join(state_dir, INFO_FILE_NAME)
+        self.host = host
+        self.port = port
+        self.parent_pid = parent_pid
+        self.idle_timeout = idle_timeout
+        self.token = secrets.token_hex(16)
+        self.requests = 0
+        self.last_request = time.monotonic()
+        self._workers = ThreadPoolExecutor(max_workers=workers,
+                                           thread_name_prefix="backend-job")
+        self.hub = None
+        self._server = None
+        self._stopped = threading.Event()
+
+    def start(self):
+        """Bind, write backend.json and start warming the SDK imports."""
+        self._server = ThreadingHTTPServer((self.host, self.port), _Handler)
+        self._server.daemon_threads = True
+        self._server.backend = self
+        self.port = self._server.server_address[1]
+        self.hub = stream_hub.enable()
+        self._write_info_file()
+        threading.Thread(target=warm_imports, name="backend-warm", daemon=True).start()
+        threading.Thread(target=self._watch, name="backend-watch", daemon=True).start()
+        logger.info("Backend server listening", extra={
+            "port": self.port, "parent_pid": self.parent_pid,
+        })
+
+    def serve_forever(self):
+        """Serve requests until stop() (blocks)."""
+        try:
+            self._server.serve_forever()
+        finally:
+            self._cleanup()
+
+    def stop(self, reason=""):
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        logger.info("Backend server stopping", extra={
+            "reason": reason, "requests": self.requests,
+            "clients": client_pool.stats(), "streams": self.hub.stats(),
+        })
+        # shutdown() waits for serve_forever, so never call it on its thread
+        threading.Thread(target=self._server.shutdown, daemon=True).start()
+
+    def _cleanup(self):
+        self._server.server_close()
+        self._workers.shutdown(wait=True)
+        try:
+            with open(self.info_file, encoding="utf-8") as f:
+                ours = json.load(f).get("pid") == os.getpid()
+            if ours:
+                os.unlink(self.info_file)
+        except (OSError, ValueError):
+            pass
+
+    # ------------------------------------------------------------------
+    # Requests
+    # ------------------------------------------------------------------
+
+    def handle(self, path, body):
+        """Return (http_status, payload) for one authenticated request."""
+        self.requests += 1
+        self.last_request = time.monotonic()
+
+        if path == "/ping":
+            return 200, {"success": True, "pid": os.getpid(),
+                         "requests": self.requests,
+                         "clients": client_pool.stats()}
+        if path == "/shutdown":
+            self.stop("requested")
+            return 200, {"success": True}
+        if path not in ("/run", "/submit"):
+            return 404, {"success": False, "error": f"Unknown endpoint: {path}"}
+
+        try:
+            request = json.loads(body or b"{}")
+        except ValueError as e:
+            return 400, {"success": False, "error": f"Invalid request JSON: {e}"}
+        if not isinstance(request, dict):
+            return 400, {"success": False, "error": "Request must be a JSON object"}
+
+        if request.get("stream_id"):
+            # Before replying, so the page can subscribe straight away
+            self.hub.channel(str(request["stream_id"]))
+        if path == "/submit":
+            self._workers.submit(self.run_command, request)
+            return 202, {"success": True, "accepted": True}
+        return 200, self.run_command(request)
+
+    # ------------------------------------------------------------------
+    # Lifetime
+    # ------------------------------------------------------------------
+
+    def _watch(self):
+        """Stop when the AHK parent exits or the server sits idle too long."""
+        while not self._stopped.wait(PARENT_CHECK_SECONDS):
+            if self.parent_pid and not _pid_exists(self.parent_pid):
+                self.stop("parent exited")
+            elif (self.idle_timeout
+                  and time.monotonic() - self.last_request > self.idle_timeout):
+                self.stop("idle")
+
+    def _write_info_file(self):
+        os.makedirs(self.state_dir, exist_ok=True)
+        tmp_fd, tmp_path = tempfile.mkstemp(dir=self.state_dir, suffix=".tmp")
+        try:
+            with os.fdopen(tmp_fd, "w", encoding="utf-8") as f:
+                json.dump({"port": self.port, "pid": os.getpid(),
+                           "token": self.token}, f)
+            os.replace(tmp_path, self.info_file)
+        except OSError:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Token check and JSON framing around BackendServer.handle."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if urlsplit(self.path).path == "/events":
+            self._events()
+        else:
+            self._dispatch()
+
+    def do_POST(self):
+        self._dispatch()
+
+    def _dispatch(self):
+        backend = self.server.backend
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        if not secrets.compare_digest(self.headers.get(TOKEN_HEADER, ""), backend.token):
+            status, payload = 403, {"success": False, "error": "Bad token"}
+        else:
+            try:
+                status, payload = backend.handle(self.path.split("?", 1)[0], body)
+            except Exception as e:
+                logger.error(f"Backend server request failed: {e}")
+                status, payload = 500, {"success": False, "error": str(e)}
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _events(self):
+        """Serve one stream's events as text/event-stream until it finishes."""
+        backend = self.server.backend
+        query = {k: v[-1] for k, v in parse_qs(urlsplit(self.path).query).items()}
+        if (not secrets.compare_digest(query.get("token", ""), backend.token)
+                or not query.get("stream")):
+            self.send_error(403 if query.get("stream") else 400)
+            return
+        backend.last_request = time.monotonic()
+        # Only streams a request announced (see handle), and not expired
+        channel = backend.hub.get(query["stream"])
+        if channel is None:
+            self.send_error(404)
+            return
+        try:
+            after = int(self.headers.get("Last-Event-ID") or 0)
+        except ValueError:
+            after = 0
+
+        self.close_connection = True
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        # The review pages are file:// documents (origin "null")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        try:
+            finished = False
+            while not finished:
+                events, finished = channel.wait(after, EVENTS_KEEPALIVE_SECONDS)
+                if not events:
+                    if channel.expired():
+                        break  # nothing published for IDLE_TTL_SECONDS
+                    self.wfile.write(b": keep-alive\n\n")
+                for event_id, event, data in events:
+                    payload = json.dumps(data, ensure_ascii=False)
+                    self.wfile.write(
+                        f"id: {event_id}\nevent: {event}\ndata: {payload}\n\n".encode("utf-8"))
+                    after = event_id
+                self.wfile.flush()
+        except OSError:
+            pass  # subscriber went away; it can reconnect with Last-Event-ID
+
+    def log_message(self, format, *args):
+        logger.debug("Backend server: " + format % args)
+
+
+def warm_imports():
+    """Import the provider SDKs so the first request finds them loaded."""
+    started = time.monotonic()
+    for name in WARM_MODULES:
+        try:
+            __import__(name)
+        except Exception as e:
+            logger.debug(f"Warm import of {name} failed: {e}")
+    logger.info("Backend modules warmed", extra={
+        "seconds": round(time.monotonic() - started, 2),
+    })
+
+
+def _pid_exists(pid):
+    """Check whether *pid* is alive.  Works correctly on Windows."""
+    if sys.platform == "win32":
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+        SYNCHRONIZE = 0x00100000
+        handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION | SYNCHRONIZE,
+                                      False, pid)
+        if not handle:
+            return False
+        try:
+            # A handle to an exited process stays openable until released
+            return kernel32.WaitForSingleObject(handle, 0) != 0  # WAIT_OBJECT_0
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+        return True
+    except OSError:
+        return False
+
+
+def serve(run_command, state_dir="", parent_pid=0, idle_timeout=3600.0):
+    """Run the backend server until shutdown, parent exit or idle timeout."""
+    server = BackendServer(run_command, state_dir or default_state_dir(),
+                           parent_pid=parent_pid, idle_timeout=idle_timeout)
+    server.start()
+    server.serve_forever()
@@ -0,0 +1,308 @@
+"""
+Client Pool for Report Check Python Backend
+
+Provider SDK clients (anthropic.Anthropic, openai.OpenAI, genai.Client)
+each own an httpx connection pool.  Building a new client per call means
+a new pool, DNS lookup and TLS handshake every time — at least twice per
+comprehensive review (main + targeted).  This registry keeps one client
+per (provider, API key hash, timeout) and lends it to every call
+(lease_client()), so keep-alive connections are reused across calls
+(and, in server mode — see backend_server — across reviews).
+
+lease_async_client() does the same for the asyncio clients (AsyncAnthropic,
+AsyncOpenAI, and a genai.Client whose .aio side is used) that async_api
+drives; those are only ever used on async_api's event loop.
+
+HTTP/2 is enabled when the optional ``h2`` package is installed.  A call
+that fails with a connection-level error (timeouts included) evicts the
+client it leased, so the next call reconnects with a fresh pool; the
+evicted client is closed once its last holder is done with it.  Only that
+flavour is evicted: the targeted review (sync client) runs next to the
+streamed main review (async client), and the two share no connections.
+
+stats() reports clients created/reused/discarded and, per connection seen
+by the response hook, how many requests went over an already-open
+connection.
+"""
+import sys
+import os
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+if script_dir not in sys.path:
+    sys.path.insert(0, script_dir)
+
+import contextlib
+import hashlib
+import importlib.util
+import logging
+import threading
+import weakref
+
+logger = logging.getLogger("report-check")
+
+PROVIDERS = ("claude", "openai", "gemini")
+
+
+def http2_available():
+    """True if httpx can speak HTTP/2 (the optional h2 package is installed)."""
+    return importlib.util.find_spec("h2") is not None
+
+
+def key_hash(api_key):
+    """Short, non-reversible id for an API key (pool keys and logs)."""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:12]
+
+
+class _Entry:
+    """One pooled client and its connection accounting.
+
+    Connections are told apart by their network stream object, held weakly
+    so closed connections drop out (and a recycled id() can't pass for an
+    old connection).  Response hooks run on several threads, so the
+    counters are updated under a lock.
+
+    ``holders`` and ``evicted`` are guarded by the pool's lock.
+    """
+
+    __slots__ = ("client", "uses", "holders", "evicted", "requests",
+                 "connections", "_seen", "_lock")
+
+    def __init__(self):
+        self.client = None
+        self.uses = 0
+        self.holders = 0      # leases currently using the client
+        self.evicted = False  # out of the registry; close on last release
+        self.requests = 0
+        self.connections = 0
+        self._seen = weakref.WeakSet()  # network streams (connections) seen
+        self._lock = threading.Lock()
+
+    def on_response(self, response):
+        """httpx response hook: count requests and new connections."""
+        stream = response.extensions.get("network_stream")
+        with self._lock:
+            self.requests += 1
+            if stream is None:
+                return
+            try:
+                if stream in self._seen:
+                    return
+                self._seen.add(stream)
+            except TypeError:
+                pass  # not weak-referenceable: count each as new
+            self.connections += 1
+
+    def counts(self):
+        with self._lock:
+            return self.requests, self.connections
+
+    async def on_response_async(self, response):
+        """httpx.AsyncClient flavour of on_response (hooks must be awaitable)."""
+        self.on_response(response)
+
+
+class ClientPool:
+    """Thread-safe registry of provider clients keyed by (provider, key hash, timeout).
+
+    Async clients are pooled under the provider name suffixed with ":async".
+    """
+
+    def __init__(self):
+        self.http2 = http2_available()
+        self.created = 0
+        self.reused = 0
+        self.discarded = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def lease(self, provider, api_key, timeout=None):
+        """Hold the pooled client for *provider* / *api_key* for one call.
+
+        A connection-level error raised inside the block evicts this client
+        (not its other flavour), so the next lease reconnects.
+        """
+        key = (provider, key_hash(api_key), timeout)
+        entry = self._acquire(key, provider, api_key, timeout)
+        try:
+            yield entry.client
+        except BaseException as e:
+            if is_connection_error(e):
+                self._evict(key, entry)
+            raise
+        finally:
+            self._release(entry)
+
+    def lease_async(self, provider, api_key, timeout=None):
+        """lease() for the asyncio client of *provider* / *api_key*."""
+        return self.lease(provider + ":async", api_key, timeout)
+
+    def close_all(self):
+        """Evict every client; each is closed once it has no holders."""
+        with self._lock:
+            entries, self._entries = list(self._entries.values()), {}
+            idle = []
+            for entry in entries:
+                entry.evicted = True
+                if not entry.holders:
+                    idle.append(entry)
+        for entry in idle:
+            _close(entry.client)
+
+    def stats(self):
+        with self._lock:
+            entries = list(self._entries.items())
+            stats = {"clients": len(entries), "created": self.created,
+                     "reused": self.reused, "discarded": self.discarded,
+                     "http2": self.http2}
+        counts = [e.counts() for _, e in entries]
+        requests = sum(r for r, _ in counts)
+        connections = sum(c for _, c in counts)
+        stats.update(requests=requests, connections=connections,
+                     connection_reuses=max(0, requests - connections))
+        return stats
+
+    # ------------------------------------------------------------------
+
+    def _acquire(self, key, provider, api_key, timeout):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.uses += 1
+                entry.holders += 1
+                self.reused += 1
+                return entry
+            entry = _Entry()
+            entry.client = self._create(provider, api_key, timeout, entry)
+            entry.uses = 1
+            entry.holders = 1
+            self._entries[key] = entry
+            self.created += 1
+        logger.info("API client created", extra={
+            "provider": provider, "key": key[1], "http2": self.http2,
+        })
+        return entry
+
+    def _evict(self, key, entry):
+        with self._lock:
+            if self._entries.get(key) is not entry:
+                return  # already evicted by another holder
+            del self._entries[key]
+            entry.evicted = True
+            self.discarded += 1
+        logger.info("API client discarded", extra={"provider": key[0], "key": key[1]})
+
+    def _release(self, entry):
+        with self._lock:
+            entry.holders -= 1
+            if not entry.evicted or entry.holders:
+                return
+        _close(entry.client)
+
+    def _create(self, provider, api_key, timeout, entry):
+        hooks = {"response": [entry.on_response]}
+        if provider == "claude":
+            import anthropic
+            kwargs = {} if timeout is None else {"timeout": timeout}
+            return anthropic.Anthropic(
+                api_key=api_key,
+                http_client=anthropic.DefaultHttpxClient(http2=self.http2,
+                                                         event_hooks=hooks),
+                **kwargs,
+            )
+        if provider == "openai":
+            import openai
+            kwargs = {} if timeout is None else {"timeout": timeout}
+            return openai.OpenAI(
+                api_key=api_key,
+                http_client=openai.DefaultHttpxClient(http2=self.http2,
+                                                      event_hooks=hooks),
+                **kwargs,
+            )
+        if provider == "gemini":
+            from google import genai
+            from google.genai import types
+            client_args = {"event_hooks": hooks}
+            if self.http2:
+                client_args["http2"] = True
+            options = types.HttpOptions(
+                client_args=client_args,
+                timeout=None if timeout is None else int(timeout * 1000),
+            )
+            return genai.Client(api_key=api_key, http_options=options)
+        if provider == "claude:async":
+            import anthropic
+            kwargs = {} if timeout is None else {"timeout": timeout}
+            return anthropic.AsyncAnthropic(
+                api_key=api_key,
+                http_client=anthropic.DefaultAsyncHttpxClient(
+                    http2=self.http2,
+                    event_hooks={"response": [entry.on_response_async]}),
+                **kwargs,
+            )
+        if provider == "openai:async":
+            import openai
+            kwargs = {} if timeout is None else {"timeout": timeout}
+            return openai.AsyncOpenAI(
+                api_key=api_key,
+                http_client=openai.DefaultAsyncHttpxClient(
+                    http2=self.http2,
+                    event_hooks={"response": [entry.on_response_async]}),
+                **kwargs,
+            )
+        if provider == "gemini:async":
+            from google import genai
+            from google.genai import types
+            client_args = {"event_hooks": {"response": [entry.on_response_async]}}
+            if self.http2:
+                client_args["http2"] = True
+            options = types.HttpOptions(
+                async_client_args=client_args,
+                timeout=None if timeout is None else int(timeout * 1000),
+            )
+            return genai.Client(api_key=api_key, http_options=options)
+        raise ValueError(f"Unknown provider: {provider}")
+
+
+def is_connection_error(error):
+    """True for transport-level failures (reset, DNS, TLS, timeouts)."""
+    try:
+        import httpx
+        if isinstance(error, httpx.TransportError):
+            return True
+    except ImportError:
+        pass
+    # anthropic/openai wrap transport errors as APIConnectionError (and
+    # APITimeoutError, a subclass)
+    return any(cls.__name__ == "APIConnectionError" for cls in type(error).__mro__)
+
+
+def _close(client):
+    try:
+        result = client.close()
+    except Exception:
+        return
+    # AsyncAnthropic / AsyncOpenAI return a coroutine; run it on async_api's loop
+    if hasattr(result, "__await__"):
+        try:
+            import async_api
+            async_api.run_soon(result)
+        except Exception:
+            result.close()
+
+
+_pool = ClientPool()
+
+
+def lease_client(provider, api_key, timeout=None):
+    """Hold the pooled client for *provider* for one call (see ClientPool.lease)."""
+    return _pool.lease(provider, api_key, timeout)
+
+
+def lease_async_client(provider, api_key, timeout=None):
+    """Hold the pooled asyncio client for *provider* (see ClientPool.lease_async)."""
+    return _pool.lease_async(provider, api_key, timeout)
+
+
+def stats():
+    return _pool.stats()
@@ -416,6 +416,7 @@ def _render_template(metadata_html, ai_html, original_html,
         html = html.replace("{{TARGETED_REVIEW_SECTION}}", targeted_html)
         html = html.replace("{{ANALYSIS_DEMOGRAPHICS}}", analysis_demo_html)
         html = html.replace("{{FOLLOW_UP_SECTION}}", follow_up_html)
+        html = html.replace("{{STREAM_EVENTS_SCRIPT}}", _read_stream_events_script())
         return html
 
     except (FileNotFoundError, OSError) as e:
@@ -426,6 +427,20 @@ def _render_template(metadata_html, ai_html, original_html,
         )
 
 
+def _read_stream_events_script():
+    """Shared SSE subscriber (templates/stream_events.js), inlined into the review.
+
+    Rendered reviews live outside templates/, so a <script src> can't reach it.
+    """
+    script_path = os.path.join(script_dir, "templates", "stream_events.js")
+    try:
+        with open(script_path, encoding="utf-8") as f:
+            return f.read()
+    except OSError as e:
+        logger.error(f"Stream events script unavailable: {e}")
+        return ""
+
+
 def _build_legacy_html(metadata_html, ai_html, original_html, targeted_html, version):
     """Fallback legacy HTML (matching BuildHTMLDocumentLegacy in AHK)."""
     return f"""<!DOCTYPE html><html><head><meta charset="UTF-8"><title>AI Report Check</title>
@@ -0,0 +1,139 @@
+"""
+Stream Hub for Report Check Python Backend
+
+In server mode (see backend_server) a streamed review or follow-up is also
+published here, so the review WebView can subscribe to it over the
+server's /events endpoint (Server-Sent Events) instead of AHK re-reading
+stream_file every STREAM_POLL_INTERVAL.
+
+Each stream has a StreamChannel keyed by the request's stream_id.  The
+channel buffers every event, so a subscriber that connects late (or
+reconnects with Last-Event-ID) gets the events it missed.  Events:
+
+    chunk    {"text": "..."}                    one text delta
+    status   same JSON as the status_file       last event; carries the
+                                                error, or html_file and
+                                                session_id on completion
+
+A channel is a sink for async_api.pump (write / close).  The stream_file
+and status_file are still written as before — they are the fallback when
+the WebView can't subscribe.
+"""
+import threading
+import time
+
+# Finished channels are kept this long for late subscribers
+FINISHED_TTL_SECONDS = 60.0
+# Channels nobody publishes to are dropped (and their subscribers
+# disconnected) after this long
+IDLE_TTL_SECONDS = 600.0
+
+
+class StreamChannel:
+    """Buffered event list for one stream.  Thread-safe."""
+
+    def __init__(self, stream_id, clock=time.monotonic):
+        self.stream_id = stream_id
+        self.clock = clock
+        self.events = []  # (event, data) in publish order; id = index + 1
+        self.finished = False
+        self.touched = clock()  # created, last published or finished
+        self._cond = threading.Condition()
+
+    def publish(self, event, data):
+        with self._cond:
+            if self.finished:
+                return
+            self.events.append((event, data))
+            self.touched = self.clock()
+            self._cond.notify_all()
+
+    # async_api sink protocol
+
+    def write(self, text):
+        self.publish("chunk", {"text": text})
+
+    def close(self, final=None):
+        """API stream ended; the status event follows from finish()."""
+
+    def finish(self, status):
+        """Publish the final status and end the stream."""
+        with self._cond:
+            if self.finished:
+                return
+            self.events.append(("status", status))
+            self.finished = True
+            self.touched = self.clock()
+            self._cond.notify_all()
+
+    def wait(self, after, timeout):
+        """Return ([(id, event, data), ...] after event id *after*, finished).
+
+        Blocks up to *timeout* seconds for new events.
+        """
+        with self._cond:
+            if len(self.events) <= after and not self.finished:
+                self._cond.wait(timeout)
+            new = [(i + 1, event, data)
+                   for i, (event, data) in enumerate(self.events[after:], after)]
+            return new, self.finished
+
+    def expired(self):
+        """True once the channel outlived its TTL (see the module constants)."""
+        with self._cond:
+            ttl = FINISHED_TTL_SECONDS if self.finished else IDLE_TTL_SECONDS
+            return self.clock() - self.touched > ttl
+
+
+class StreamHub:
+    """Channels by stream id, created by whichever side comes first."""
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.created = 0
+        self._channels = {}
+        self._lock = threading.Lock()
+
+    def channel(self, stream_id):
+        """Channel for *stream_id*, created if there is none (publishers)."""
+        with self._lock:
+            self._expire()
+            channel = self._channels.get(stream_id)
+            if channel is None:
+                channel = StreamChannel(stream_id, clock=self.clock)
+                self._channels[stream_id] = channel
+                self.created += 1
+            return channel
+
+    def get(self, stream_id):
+        """Existing, unexpired channel for *stream_id*, or None (subscribers)."""
+        with self._lock:
+            self._expire()
+            return self._channels.get(stream_id)
+
+    def stats(self):
+        with self._lock:
+            return {"channels": len(self._channels), "created": self.created}
+
+    def _expire(self):
+        for stream_id, channel in list(self._channels.items()):
+            if channel.expired():
+                del self._channels[stream_id]
+
+
+_hub = None
+
+
+def enable():
+    """Start publishing streams (called by backend_server when it starts)."""
+    global _hub
+    if _hub is None:
+        _hub = StreamHub()
+    return _hub
+
+
+def channel(stream_id):
+    """Channel to publish *stream_id* to, or None outside server mode."""
+    if _hub is None or not stream_id:
+        return None
+    return _hub.channel(str(stream_id))
@@ -0,0 +1,53 @@
+/* Review pages: direct stream from the backend server (Server-Sent Events).
+ *
+ * Shared by streaming_review.html (loaded with <script src>) and
+ * report_template.html (inlined by html_generator, since rendered reviews
+ * live outside templates/).  Both pages define appendStreamChunk, streamComplete and
+ * streamError; AHK registers the StreamStatus / StreamFallback callbacks.
+ */
+
+// Characters received over the event stream; AHK resumes reading the
+// stream file from here if the event stream fails
+var _eventSource = null;
+var _eventsReceived = 0;
+
+function subscribeStream(port, streamId, token) {
+    unsubscribeStream();
+    _eventsReceived = 0;
+    var source = new EventSource('http://127.0.0.1:' + port + '/events?stream='
+        + encodeURIComponent(streamId) + '&token=' + encodeURIComponent(token));
+    _eventSource = source;
+
+    source.addEventListener('chunk', function(e) {
+        var text = JSON.parse(e.data).text;
+        _eventsReceived += text.length;
+        appendStreamChunk(text);
+    });
+    source.addEventListener('status', function(e) {
+        unsubscribeStream();
+        var status = JSON.parse(e.data);
+        if (status.error) streamError(status.error);
+        else streamComplete();
+        try { ahk.StreamStatus(e.data); } catch (err) {}
+    });
+    // EventSource retries dropped connections itself (resuming via
+    // Last-Event-ID); CLOSED means it gave up
+    source.onerror = function() {
+        if (source.readyState !== EventSource.CLOSED) return;
+        fallBackFromStream();
+    };
+}
+
+// Stop listening and tell AHK how much arrived, so it reads the rest from
+// the stream file (also called by AHK when the in-band status is late)
+function fallBackFromStream() {
+    unsubscribeStream();
+    try { ahk.StreamFallback(_eventsReceived); } catch (err) {}
+}
+
+function unsubscribeStream() {
+    if (_eventSource) {
+        _eventSource.close();
+        _eventSource = null;
+    }
+}
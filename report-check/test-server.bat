@@ -82,6 +82,7 @@ echo Checking project modules...
 "%PYTHON%" -c "import sys, os; sys.path.insert(0, r'%SCRIPT_DIR%.'); import html_generator; print('[OK]   html_generator')" 2>&1 || echo [FAIL] html_generator.py
 "%PYTHON%" -c "import sys, os; sys.path.insert(0, r'%SCRIPT_DIR%.'); import targeted_review; print('[OK]   targeted_review')" 2>&1 || echo [FAIL] targeted_review.py
 "%PYTHON%" -c "import sys, os; sys.path.insert(0, r'%SCRIPT_DIR%.'); import backend; print('[OK]   backend')" 2>&1 || echo [FAIL] backend.py
+"%PYTHON%" -c "import sys, os; sys.path.insert(0, r'%SCRIPT_DIR%.'); import backend_server; print('[OK]   backend_server')" 2>&1 || echo [FAIL] backend_server.py
 echo.
 
 REM --- Check template file ---
@@ -0,0 +1,241 @@
+"""Tests for the asyncio streaming layer, driven by fake provider clients."""
+
+import asyncio
+import contextlib
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import unittest
+from types import SimpleNamespace as NS
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import async_api
+import api_handler
+
+
+async def _aiter(items, gate=None):
+    for item in items:
+        if gate is not None:
+            await gate.wait()
+        yield item
+
+
+class FakeClaudeStream:
+    def __init__(self, texts):
+        self.text_stream = _aiter(texts)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def get_final_message(self):
+        return NS(stop_reason="end_turn", usage=NS(input_tokens=11, output_tokens=3))
+
+
+class FakeClaude:
+    def __init__(self, texts):
+        self.messages = NS(stream=lambda **kwargs: FakeClaudeStream(texts))
+
+
+class FakeOpenAI:
+    def __init__(self, texts):
+        chunks = [NS(choices=[NS(delta=NS(content=t), finish_reason=None)], usage=None)
+                  for t in texts]
+        chunks.append(NS(choices=[NS(delta=NS(content=None), finish_reason="stop")],
+                         usage=None))
+        chunks.append(NS(choices=[], usage=NS(prompt_tokens=7, completion_tokens=2)))
+
+        async def create(**kwargs):
+            self.kwargs = kwargs
+            return _aiter(chunks)
+
+        self.chat = NS(completions=NS(create=create))
+
+
+class FakeGemini:
+    def __init__(self, texts):
+        chunks = [NS(text=t, candidates=None, usage_metadata=None) for t in texts]
+        chunks.append(NS(text="", candidates=[NS(finish_reason=NS(name="STOP"))],
+                         usage_metadata=NS(prompt_token_count=5, candidates_token_count=4)))
+
+        async def generate_content_stream(**kwargs):
+            return _aiter(chunks)
+
+        self.aio = NS(models=NS(generate_content_stream=generate_content_stream))
+
+
+class RecordingSink:
+    def __init__(self, log, name, fail_on=None):
+        self.log = log
+        self.name = name
+        self.fail_on = fail_on
+
+    def write(self, text):
+        if text == self.fail_on:
+            raise OSError("sink broke")
+        self.log.append((self.name, text))
+
+    def close(self, final=None):
+        self.log.append((self.name, "close", final is not None))
+
+
+def _events(provider, client):
+    with patch("client_pool.lease_async_client",
+               return_value=contextlib.nullcontext(client)):
+        async def collect():
+            return [e async for e in async_api.stream_chat(
+                provider, "key", "model", "system",
+                [{"role": "user", "content": "hi"}])]
+        return async_api.run(collect(), timeout=5)
+
+
+class TestStreamChat(unittest.TestCase):
+    """Test the unified event stream for each provider."""
+
+    def test_claude(self):
+        events = _events("claude", FakeClaude(["He", "llo"]))
+        self.assertEqual([e["text"] for e in events[:-1]], ["He", "llo"])
+        self.assertEqual(events[-1], {"type": "done", "stop_reason": "end_turn",
+                                      "usage": {"input_tokens": 11, "output_tokens": 3}})
+
+    def test_openai_usage_from_final_chunk(self):
+        client = FakeOpenAI(["a", "b"])
+        events = _events("openai", client)
+        self.assertEqual([e["type"] for e in events], ["text", "text", "done"])
+        self.assertEqual(events[-1]["stop_reason"], "stop")
+        self.assertEqual(events[-1]["usage"], {"input_tokens": 7, "output_tokens": 2})
+        self.assertEqual(client.kwargs["messages"][0], {"role": "system", "content": "system"})
+
+    def test_gemini(self):
+        with patch.object(api_handler, "_gemini_config"), \
+                patch.object(api_handler, "_build_gemini_contents"):
+            events = _events("gemini", FakeGemini(["x"]))
+        self.assertEqual(events[0], {"type": "text", "text": "x"})
+        self.assertEqual(events[-1]["stop_reason"], "STOP")
+        self.assertEqual(events[-1]["usage"], {"input_tokens": 5, "output_tokens": 4})
+
+    def test_unknown_provider(self):
+        with self.assertRaises(ValueError):
+            _events("nope", None)
+
+
+class TestPump(unittest.TestCase):
+    """Test fan-out ordering, sink failures and cancellation."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, True)
+
+    def _stream(self, texts, error=None):
+        async def events():
+            for text in texts:
+                yield {"type": "text", "text": text}
+            if error is not None:
+                raise error
+            yield async_api._done("end_turn", 1, 2)
+        return events()
+
+    def test_sinks_see_deltas_in_order_then_close(self):
+        log = []
+        final = async_api.run(async_api.pump(
+            self._stream(["a", "b"]), RecordingSink(log, "1"), RecordingSink(log, "2")))
+        self.assertEqual(log, [("1", "a"), ("2", "a"), ("1", "b"), ("2", "b"),
+                               ("1", "close", True), ("2", "close", True)])
+        self.assertEqual(final["response"], "ab")
+        self.assertEqual(final["stop_reason"], "end_turn")
+
+    def test_failing_sink_dropped_others_continue(self):
+        log = []
+        final = async_api.run(async_api.pump(
+            self._stream(["a", "b", "c"]),
+            RecordingSink(log, "bad", fail_on="b"), RecordingSink(log, "ok")))
+        self.assertEqual(final["response"], "abc")
+        self.assertEqual([e for e in log if e[0] == "ok"],
+                         [("ok", "a"), ("ok", "b"), ("ok", "c"), ("ok", "close", True)])
+        self.assertEqual([e for e in log if e[0] == "bad"],
+                         [("bad", "a"), ("bad", "close", False)])
+
+    def test_stream_error_closes_sinks_and_reraises(self):
+        log = []
+        path = os.path.join(self.tmp, "never.txt")
+        with self.assertRaises(RuntimeError):
+            async_api.run(async_api.pump(self._stream([], RuntimeError("boom")),
+                                         RecordingSink(log, "1"), async_api.FileSink(path)))
+        self.assertEqual(log, [("1", "close", False)])
+        self.assertFalse(os.path.exists(path))
+
+    def test_cancel_closes_sinks_and_stream(self):
+        log = []
+        closed = threading.Event()
+        started = threading.Event()
+
+        async def events():
+            try:
+                yield {"type": "text", "text": "a"}
+                started.set()
+                await asyncio.sleep(30)
+                yield {"type": "text", "text": "never"}
+            finally:
+                closed.set()
+
+        future = async_api.run_soon(async_api.pump(events(), RecordingSink(log, "1")))
+        self.assertTrue(started.wait(5))
+        future.cancel()
+        self.assertTrue(closed.wait(5))
+        self.assertEqual(log, [("1", "a"), ("1", "close", False)])
+
+    def test_run_timeout_cancels(self):
+        closed = threading.Event()
+
+        async def slow():
+            try:
+                await asyncio.sleep(30)
+            finally:
+                closed.set()
+
+        with self.assertRaises(TimeoutError):
+            async_api.run(slow(), timeout=0.05)
+        self.assertTrue(closed.wait(5))
+
+    def test_file_and_socket_sinks(self):
+        path = os.path.join(self.tmp, "out.txt")
+        reader, writer = socket.socketpair()
+        self.addCleanup(reader.close)
+        async_api.run(async_api.pump(self._stream(["hé", "llo"]),
+                                     async_api.FileSink(path), async_api.SocketSink(writer)))
+        with open(path, encoding="utf-8") as fh:
+            self.assertEqual(fh.read(), "héllo")
+        reader.settimeout(5)
+        received = b""
+        while True:
+            chunk = reader.recv(1024)
+            if not chunk:
+                break
+            received += chunk
+        self.assertEqual(received.decode("utf-8"), "héllo")
+
+    def test_slow_sink_does_not_stall_other_streams(self):
+        gate = threading.Event()
+        path = os.path.join(self.tmp, "slow.txt")
+        sink = async_api.FileSink(path)
+        real_write = sink._write
+        sink._write = lambda text: (gate.wait(5), real_write(text))
+
+        slow = async_api.run_soon(async_api.pump(self._stream(["x"]), sink))
+        fast = async_api.MemorySink()
+        async_api.run(async_api.pump(self._stream(["y"]), fast), timeout=2)
+        self.assertEqual(fast.text, "y")
+        self.assertFalse(slow.done())
+        gate.set()
+        self.assertEqual(slow.result(5)["response"], "x")
+
+
+if __name__ == "__main__":
+    unittest.main()
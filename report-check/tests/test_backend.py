@@ -0,0 +1,87 @@
+"""Tests for the review flow: main call and targeted review side by side."""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import backend
+
+
+class TestConcurrentReview(unittest.TestCase):
+    """Test handle_review with stubbed send_to_api and targeted review."""
+
+    def setUp(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp, True)
+        self.config_path = os.path.join(tmp, "config.json")
+        with open(self.config_path, "w", encoding="utf-8") as f:
+            json.dump({"api": {"provider": "claude", "claude_api_key": "sk-ant-test"},
+                       "settings": {"prompt_type": "comprehensive",
+                                    "comprehensive_claude_model": "model",
+                                    "targeted_review_enabled": True},
+                       "beta": {"demographic_extraction_enabled": True}}, f)
+
+        self.targeted_started = threading.Event()
+        self.targeted_release = threading.Event()
+        self.targeted_done = threading.Event()
+        for target, kwargs in (
+                (backend.targeted_review, {"get_targeted_review": self._targeted}),
+                (backend.config_reader, {"read_demographics": lambda d: {}}),
+                (backend.session_manager, {"create_session": lambda **kw: "s1",
+                                           "add_turn": lambda *a: None,
+                                           "cleanup_old_sessions": lambda: None}),
+                (backend.html_generator, {"generate_html_file": lambda **kw: "r.html"})):
+            patcher = patch.multiple(target, **kwargs)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(self.targeted_release.set)
+
+    def _targeted(self, report, config, config_dir):
+        self.targeted_started.set()
+        self.targeted_release.wait(5)
+        self.targeted_done.set()
+        return {"success": True, "areas": ["lungs"], "demographics_label": "M 45"}
+
+    def _review(self, send_to_api):
+        with patch.object(backend.api_handler, "send_to_api", side_effect=send_to_api):
+            return backend.handle_review({"config_path": self.config_path,
+                                          "report_text": "FINDINGS: normal."})
+
+    def test_targeted_runs_alongside_main_call(self):
+        def send_to_api(*args, **kwargs):
+            # The targeted call is already in flight while the main call runs
+            self.assertTrue(self.targeted_started.wait(5))
+            self.targeted_release.set()
+            return {"success": True, "response": "Looks fine.", "model": "model"}
+
+        result = self._review(send_to_api)
+        self.assertTrue(result["success"])
+        self.assertEqual(result["response"], "Looks fine.")
+        self.assertEqual(result["targeted_areas"], ["lungs"])
+        self.assertEqual(result["targeted_demographics_label"], "M 45")
+
+    def test_main_failure_returns_without_waiting_in_server_mode(self):
+        def send_to_api(*args, **kwargs):
+            self.assertTrue(self.targeted_started.wait(5))
+            return {"success": False, "error": "Overloaded", "provider": "Claude"}
+
+        with patch.object(backend, "_wait_for_discarded", False):
+            started = time.monotonic()
+            result = self._review(send_to_api)
+            self.assertLess(time.monotonic() - started, 2)
+        self.assertEqual(result["error"], "Overloaded")
+        self.assertFalse(self.targeted_done.is_set())
+        self.targeted_release.set()
+        self.assertTrue(self.targeted_done.wait(5))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+"""Tests for pooled provider clients and their connection accounting."""
+
+import gc
+import os
+import sys
+import threading
+import unittest
+from types import SimpleNamespace as NS
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from client_pool import ClientPool, _Entry, is_connection_error
+
+
+class Stream:
+    """Stand-in for an httpcore network stream (one per connection)."""
+
+
+def _response(stream):
+    return NS(extensions={"network_stream": stream})
+
+
+class APIConnectionError(Exception):
+    """Named like the SDKs' transport error wrapper."""
+
+
+class TestEntry(unittest.TestCase):
+    """Test request / connection counting."""
+
+    def test_reuse_counted_per_connection(self):
+        entry = _Entry()
+        first, second = Stream(), Stream()
+        for stream in (first, first, second, first):
+            entry.on_response(_response(stream))
+        self.assertEqual(entry.counts(), (4, 2))
+
+    def test_closed_connection_not_mistaken_for_reuse(self):
+        entry = _Entry()
+        for _ in range(3):
+            stream = Stream()
+            entry.on_response(_response(stream))
+            del stream
+            gc.collect()
+        self.assertEqual(entry.counts(), (3, 3))
+        self.assertEqual(len(entry._seen), 0)
+
+    def test_concurrent_hooks(self):
+        entry = _Entry()
+        stream = Stream()
+
+        def hit():
+            for _ in range(1000):
+                entry.on_response(_response(stream))
+
+        threads = [threading.Thread(target=hit) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(entry.counts(), (4000, 1))
+
+
+class TestClientPool(unittest.TestCase):
+    """Test client reuse and eviction."""
+
+    def setUp(self):
+        create = patch.object(ClientPool, "_create", autospec=True,
+                              side_effect=lambda pool, *args: MagicMock())
+        create.start()
+        self.addCleanup(create.stop)
+        self.pool = ClientPool()
+
+    def _lease(self, provider, key):
+        with self.pool.lease(provider, key) as client:
+            return client
+
+    def test_one_client_per_key(self):
+        a = self._lease("claude", "key-1")
+        self.assertIs(self._lease("claude", "key-1"), a)
+        self.assertIsNot(self._lease("claude", "key-2"), a)
+        with self.pool.lease_async("claude", "key-1") as async_client:
+            self.assertIsNot(async_client, a)
+        stats = self.pool.stats()
+        self.assertEqual((stats["clients"], stats["created"], stats["reused"]), (3, 3, 1))
+
+    def test_only_connection_errors_evict(self):
+        with self.assertRaises(ValueError):
+            with self.pool.lease("openai", "k") as client:
+                raise ValueError("bad request")
+        self.assertIs(self._lease("openai", "k"), client)
+        with self.assertRaises(APIConnectionError):
+            with self.pool.lease("openai", "k"):
+                raise APIConnectionError("reset")
+        client.close.assert_called_once()
+        self.assertEqual(self.pool.stats()["discarded"], 1)
+        self.assertIsNot(self._lease("openai", "k"), client)
+
+    def test_error_in_one_holder_spares_the_others(self):
+        with self.pool.lease_async("openai", "k") as streaming, \
+                self.pool.lease("openai", "k") as shared:
+            with self.assertRaises(APIConnectionError):
+                with self.pool.lease("openai", "k") as failing:
+                    self.assertIs(failing, shared)
+                    raise APIConnectionError("timed out")
+            # Evicted from the registry but still open for its other holder
+            shared.close.assert_not_called()
+            shared.messages.create()
+            self.assertIsNot(self._lease("openai", "k"), shared)
+            # The async flavour is untouched
+            with self.pool.lease_async("openai", "k") as again:
+                self.assertIs(again, streaming)
+        shared.close.assert_called_once()
+        streaming.close.assert_not_called()
+
+    def test_close_all_waits_for_holders(self):
+        idle = self._lease("claude", "k")
+        with self.pool.lease("gemini", "k") as busy:
+            self.pool.close_all()
+            idle.close.assert_called_once()
+            busy.close.assert_not_called()
+        busy.close.assert_called_once()
+
+    def test_is_connection_error(self):
+        self.assertTrue(is_connection_error(APIConnectionError()))
+        self.assertFalse(is_connection_error(RuntimeError()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,25 @@
+"""Tests for rendering the review template."""
+
+import os
+import re
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import html_generator
+
+
+class TestRenderTemplate(unittest.TestCase):
+    """Test placeholder substitution in report_template.html."""
+
+    def test_stream_events_script_inlined(self):
+        html = html_generator._render_template("meta", "ai", "orig", "", "", "1.0")
+        self.assertEqual(re.findall(r"\{\{\w+\}\}", html), [])
+        with open(os.path.join(html_generator.script_dir, "templates",
+                               "stream_events.js"), encoding="utf-8") as f:
+            self.assertIn(f.read(), html)
+
+
+if __name__ == "__main__":
+    unittest.main()
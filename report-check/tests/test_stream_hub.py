@@ -0,0 +1,128 @@
+"""Tests for stream channels and the backend server's /events endpoint."""
+
+import http.client
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import backend_server
+import stream_hub
+from stream_hub import StreamChannel, StreamHub
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestStreamChannel(unittest.TestCase):
+    """Test buffering, replay and expiry."""
+
+    def test_replay_after_last_event_id(self):
+        channel = StreamChannel("1")
+        for text in ("a", "b", "c"):
+            channel.write(text)
+        channel.finish({"done": True, "error": None})
+        events, finished = channel.wait(2, timeout=0)
+        self.assertTrue(finished)
+        self.assertEqual(events, [(3, "chunk", {"text": "c"}),
+                                  (4, "status", {"done": True, "error": None})])
+
+    def test_nothing_published_after_finish(self):
+        channel = StreamChannel("1")
+        channel.finish({"done": True, "error": "x"})
+        channel.write("late")
+        channel.finish({"done": True, "error": None})
+        events, _ = channel.wait(0, timeout=0)
+        self.assertEqual(events, [(1, "status", {"done": True, "error": "x"})])
+
+    def test_wait_wakes_on_publish(self):
+        channel = StreamChannel("1")
+        threading.Timer(0.05, channel.write, ("a",)).start()
+        events, finished = channel.wait(0, timeout=5)
+        self.assertEqual(events, [(1, "chunk", {"text": "a"})])
+        self.assertFalse(finished)
+
+    def test_hub_expires_finished_channels(self):
+        clock = FakeClock()
+        hub = StreamHub(clock=clock)
+        first = hub.channel("1")
+        self.assertIs(hub.channel("1"), first)
+        first.finish({"done": True})
+        clock.now += stream_hub.FINISHED_TTL_SECONDS + 1
+        self.assertIsNot(hub.channel("1"), first)
+        self.assertEqual(hub.stats()["created"], 2)
+
+
+class TestEventsEndpoint(unittest.TestCase):
+    """Test Server-Sent Events over a running BackendServer."""
+
+    def setUp(self):
+        state_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, state_dir, True)
+        self.server = backend_server.BackendServer(lambda request: {}, state_dir)
+        self.server.start()
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(thread.join, 5)
+        self.addCleanup(self.server.stop, "test")
+
+    def _get(self, path, headers=None):
+        conn = http.client.HTTPConnection("127.0.0.1", self.server.port, timeout=5)
+        self.addCleanup(conn.close)
+        conn.request("GET", path, headers=headers or {})
+        response = conn.getresponse()
+        return response.status, response.read().decode("utf-8")
+
+    def test_bad_token_rejected(self):
+        status, _ = self._get("/events?stream=1&token=wrong")
+        self.assertEqual(status, 403)
+
+    def test_resume_from_last_event_id(self):
+        channel = stream_hub.channel("7")
+        channel.write("a")
+        channel.write("b")
+        channel.finish({"done": True, "error": None})
+        status, body = self._get(f"/events?stream=7&token={self.server.token}",
+                                 {"Last-Event-ID": "1"})
+        self.assertEqual(status, 200)
+        self.assertEqual(body, 'id: 2\nevent: chunk\ndata: {"text": "b"}\n\n'
+                               'id: 3\nevent: status\n'
+                               'data: {"done": true, "error": null}\n\n')
+
+    def test_unknown_stream_not_found(self):
+        status, _ = self._get(f"/events?stream=nope&token={self.server.token}")
+        self.assertEqual(status, 404)
+        self.assertIsNone(stream_hub._hub.get("nope"))
+
+    def test_expired_stream_not_found(self):
+        channel = stream_hub.channel("8")
+        channel.finish({"done": True, "error": None})
+        channel.touched -= stream_hub.FINISHED_TTL_SECONDS + 1
+        status, _ = self._get(f"/events?stream=8&token={self.server.token}")
+        self.assertEqual(status, 404)
+
+    def test_submit_announces_stream(self):
+        self.server.handle("/submit", b'{"command": "x", "stream_id": 9}')
+        self.assertIsNotNone(stream_hub._hub.get("9"))
+
+    def test_idle_stream_closed(self):
+        stream_hub.channel("10")
+        with patch.object(backend_server, "EVENTS_KEEPALIVE_SECONDS", 0.05), \
+                patch.object(stream_hub, "IDLE_TTL_SECONDS", 0.2):
+            status, body = self._get(f"/events?stream=10&token={self.server.token}")
+        self.assertEqual(status, 200)
+        self.assertTrue(body.startswith(": keep-alive"))
+
+
+if __name__ == "__main__":
+    unittest.main()